@@ -0,0 +1,128 @@
+import copy
+import re
+from pathlib import Path
+
+import numpy as np
+
+# Model ids name a subdirectory of the model directory, so path separators are not allowed
+MODEL_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+class BlockedMDP:
+    """
+    Dense MDP whose validation and Bellman sweeps walk the states in blocks.
+
+    TPM and TRM are (n, n, A) arrays that may be np.memmap views of `.npy`
+    files. Each pass only touches block_size x n x A entries at a time, so
+    peak memory is O(block_size * n * A + n * A) on top of the mapped pages,
+    which the OS can drop under memory pressure. The expected one-step cost
+    is computed once per model in the same blocked fashion.
+    """
+
+    def __init__(self, TPM: np.ndarray, TRM: np.ndarray, block_size: int = 256):
+        if TPM.ndim != 3 or TPM.shape[0] != TPM.shape[1]:
+            raise ValueError(f"TPM must have shape (n, n, A). Got shape {TPM.shape}")
+        if TRM.shape != TPM.shape:
+            raise ValueError(f"TRM must have the same shape {TPM.shape} as TPM. Got shape {TRM.shape}")
+        if block_size < 1:
+            raise ValueError(f"block_size must be at least 1, got {block_size}")
+
+        self.TPM = TPM
+        self.TRM = TRM
+        self.n_states = TPM.shape[0]
+        self.n_actions = TPM.shape[2]
+        self.block_size = int(block_size)
+
+        self.expected_cost = np.empty((self.n_states, self.n_actions))
+        for block in self.blocks():
+            self.expected_cost[block] = np.einsum("ija,ija->ia", TPM[block], TRM[block])
+
+    @classmethod
+    def load(cls, directory, block_size: int = 256) -> "BlockedMDP":
+        """
+        Memory-map TPM.npy and TRM.npy from directory (read-only).
+
+        Raises:
+            FileNotFoundError: if either file is missing.
+            ValueError: if the arrays do not form an (n, n, A) model.
+        """
+        directory = Path(directory)
+        TPM = np.load(directory / "TPM.npy", mmap_mode="r")
+        TRM = np.load(directory / "TRM.npy", mmap_mode="r")
+        return cls(TPM, TRM, block_size)
+
+    def negated(self) -> "BlockedMDP":
+        """
+        Return the same model with rewards negated, used to turn rewards into costs.
+        Only the (n, A) expected cost is negated; the mapped tensors are shared.
+        """
+        mdp = copy.copy(self)
+        mdp.expected_cost = -self.expected_cost
+        return mdp
+
+    def blocks(self):
+        """Slices of consecutive states covering 0..n-1, block_size at a time."""
+        for start in range(0, self.n_states, self.block_size):
+            yield slice(start, min(start + self.block_size, self.n_states))
+
+    def validate_stochastic(self, tol: float = 1e-8) -> None:
+        """
+        Validate that every (state, action) row is a probability distribution
+        and every reward is finite.
+
+        Raises:
+            ValueError: if a value is NaN or infinite, a probability is
+            negative or a row does not sum to 1.
+        """
+        for block in self.blocks():
+            P = self.TPM[block]
+            for name, values in [("TPM", P), ("TRM", self.TRM[block])]:
+                if not np.isfinite(values).all():
+                    i, j, a = np.argwhere(~np.isfinite(values))[0]
+                    raise ValueError(f"{name} contains a non-finite value at index {(block.start + int(i), int(j), int(a))}")
+
+            if P.size and P.min() < 0:
+                i, j, a = np.unravel_index(np.argmin(P), P.shape)
+                raise ValueError(f"TPM contains negative probability at index {(block.start + int(i), int(j), int(a))}")
+
+            row_sums = P.sum(axis=1)
+            bad = np.argwhere(np.abs(row_sums - 1.0) > tol)
+            if bad.size:
+                i, a = bad[0]
+                raise ValueError(
+                    f"TPM row for state {block.start + i}, action {a} must sum to 1. Got {row_sums[i, a]}"
+                )
+
+    def bellman_q(self, h: np.ndarray, pool=None) -> np.ndarray:
+        """
+        Q(i, a) = C(i, a) + sum_j P(i, j, a) * h(j), shape (n, A), one block of states at a time.
+
+        With a concurrent.futures pool the blocks are computed concurrently;
+        NumPy releases the GIL inside the per-block matmul, so a thread pool
+        runs them on separate cores.
+        """
+        Q = np.empty((self.n_states, self.n_actions))
+
+        def update(block):
+            Q[block] = self.expected_cost[block] + h @ self.TPM[block]
+
+        if pool is None:
+            for block in self.blocks():
+                update(block)
+        else:
+            # list() waits for every block and re-raises the first worker exception
+            list(pool.map(update, self.blocks()))
+        return Q
+
+
+def model_path(model_dir, model_id: str) -> Path:
+    """
+    Directory of a stored model inside model_dir.
+
+    Raises:
+        ValueError: if model_id is not a plain name (e.g. contains a path separator).
+    """
+    # fullmatch: with match, $ would also accept a trailing newline
+    if not MODEL_ID_PATTERN.fullmatch(model_id):
+        raise ValueError(f"Invalid model id {model_id!r}")
+    return Path(model_dir) / model_id
@@ -0,0 +1,157 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+from app.markov_decisions import solve_average_reward
+
+# Minimum seconds between progress writes from a worker to the shared state
+PROGRESS_INTERVAL = 0.1
+
+
+def _run_job(job_id, shared, TPM, TRM, s_ref, epsilon, options):
+    """
+    Worker-process entry point: solve one model, publishing progress to the
+    shared dict and stopping when the job's cancel flag is set.
+    """
+    start = time.perf_counter()
+    last_report = 0.0
+
+    def callback(progress):
+        nonlocal last_report
+        now = time.perf_counter()
+        if now - last_report < PROGRESS_INTERVAL:
+            return False
+
+        last_report = now
+        shared[job_id] = {
+            "iteration": progress["iteration"],
+            "g": progress["g"],
+            "delta": progress["delta"],
+            "span": progress["span"],
+            "elapsed": now - start,
+        }
+        return shared.get(f"{job_id}:cancel", False)
+
+    solution = solve_average_reward(
+        TPM, TRM, s_ref, epsilon, validate=False, callback=callback, **options
+    )
+    return {
+        "h": solution.h.tolist(),
+        "g": float(solution.g),
+        "pi_star": solution.pi_star.tolist(),
+        "iterations": int(solution.iterations),
+        "converged": bool(solution.converged),
+        "g_lower": float(solution.g_lower),
+        "g_upper": float(solution.g_upper),
+        "policy_stable_iteration": solution.policy_stable_iteration,
+        "time_saved": solution.time_saved,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+class JobManager:
+    """
+    Runs long MDP solves in a process pool off the request path.
+
+    Jobs report iteration count, gain estimate, the change in h of the last
+    sweep (max |h_new - h| and its span) and elapsed time through a
+    multiprocessing manager, and can be cancelled while pending or running.
+    The pool and manager are started lazily on the first submission.
+    """
+
+    def __init__(self, max_workers: int = 2, max_finished_jobs: int = 1000):
+        self.max_workers = max_workers
+        self.max_finished_jobs = max_finished_jobs
+
+        self._executor = None
+        self._manager = None
+        self._shared = None
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, TPM, TRM, s_ref, epsilon, **options) -> str:
+        """Queue a solve and return its job id."""
+        with self._lock:
+            self._start()
+            job_id = uuid.uuid4().hex
+            future = self._executor.submit(_run_job, job_id, self._shared, TPM, TRM, s_ref, epsilon, options)
+            self._jobs[job_id] = {"future": future, "submitted": time.time(), "cancelled": False}
+            self._prune()
+            return job_id
+
+    def status(self, job_id: str) -> dict:
+        """
+        Current state of a job: pending, running, completed, cancelled or failed.
+
+        Raises:
+            KeyError: if the job id is unknown.
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            future = job["future"]
+            progress = dict(self._shared.get(job_id, {}))
+
+        status = {"job_id": job_id, "state": "pending", "progress": progress or None, "result": None, "error": None}
+
+        if future.cancelled():
+            status["state"] = "cancelled"
+        elif future.running():
+            status["state"] = "running"
+        elif future.done():
+            try:
+                result = future.result()
+            except CancelledError:
+                status["state"] = "cancelled"
+            except Exception as e:
+                status["state"] = "failed"
+                status["error"] = str(e)
+            else:
+                status["state"] = "cancelled" if job["cancelled"] else "completed"
+                status["result"] = result
+
+        return status
+
+    def cancel(self, job_id: str) -> dict:
+        """
+        Cancel a job. Pending jobs never start; running jobs stop at their next
+        progress report and keep the partial (not converged) result.
+
+        Raises:
+            KeyError: if the job id is unknown.
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            if not job["future"].done():
+                job["cancelled"] = True
+                self._shared[f"{job_id}:cancel"] = True
+                job["future"].cancel()
+
+        return self.status(job_id)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._manager.shutdown()
+            self._executor = None
+            self._manager = None
+            self._shared = None
+
+    def _start(self) -> None:
+        if self._executor is None:
+            # spawn avoids forking the threaded server process
+            context = multiprocessing.get_context("spawn")
+            self._manager = context.Manager()
+            self._shared = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    def _prune(self) -> None:
+        # Forget the oldest finished jobs once too many are retained
+        finished = [job_id for job_id, job in self._jobs.items() if job["future"].done()]
+        for job_id in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+            self._shared.pop(job_id, None)
+            self._shared.pop(f"{job_id}:cancel", None)
@@ -1,49 +1,700 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.concurrency import run_in_threadpool
+from typing import Annotated
 from logging import getLogger
+import asyncio
+import os
+import threading
+import time
 import numpy as np
 
 from app.models import(
     MDPRelativeValueIterationRequest,
-    MDPRelativeValueIterationResponse
+    MDPStreamingRelativeValueIterationRequest,
+    MDPRelativeValueIterationResponse,
+    MDPTimedRelativeValueIterationResponse,
+    MDPSparseRelativeValueIterationRequest,
+    MDPPolicyIterationRequest,
+    MDPBatchRelativeValueIterationRequest,
+    MDPBatchRelativeValueIterationResponse,
+    MDPJobStatusResponse,
+    MDPDiscountedRequest,
+    MDPDiscountedResponse,
+    MDPFiniteHorizonRequest,
+    MDPBinaryRelativeValueIterationParams,
+    MDPMappedRelativeValueIterationRequest,
+    MDPModelUploadRequest,
+    MDPModelInfoResponse,
+    MDPRegisteredRelativeValueIterationRequest,
+    validate_model_tensors
 )
 from app.markov_decisions import (
-    relative_value_iteration_average_reward
+    solve_average_reward,
+    relative_value_iteration_average_reward_sparse,
+    relative_value_iteration_average_reward_blocked,
+    policy_iteration_average_reward,
+    relative_value_iteration_average_reward_batch,
+    expected_immediate_cost,
+    initial_bias,
+    AverageRewardSolution,
+    value_iteration_discounted,
+    backward_induction_finite_horizon
 )
 
+from app.solution_cache import SolutionCache, solution_key
+from app.npy_buffer import read_npy_arrays
+from app.blocked_mdp import BlockedMDP, model_path
+from app.model_registry import ModelRegistry
+from app.sparse_mdp import SparseMDP
+from app.metrics import REQUEST_SECONDS, StageTimer, observe_solution
+from app.responses import CompressionMiddleware, NumpyJSONResponse, dumps
+from app.jobs import JobManager
+
 from app.logging_config import setup_logging
 
 setup_logging()
 logger = getLogger(__name__)
 
+# Repeat submissions of an identical model and parameters are served from here
+solution_cache = SolutionCache(max_entries=256, max_bytes=256 * 1024 * 1024, ttl_seconds=3600)
+
+# Long-running solves submitted as jobs run in worker processes with these budgets
+job_manager = JobManager(max_workers=2)
+JOB_MAX_ITERATIONS = 10_000_000
+JOB_MAX_TIME = 3600.0
+
+# Models too large for request bodies are stored as TPM.npy / TRM.npy under <MODEL_DIR>/<model_id>
+MODEL_DIR = os.environ.get("MDP_MODEL_DIR", "models")
+
+# Uploaded models are solved by id; least recently used ones spill to MDP_REGISTRY_SPILL_DIR when set
+model_registry = ModelRegistry(
+    max_bytes=int(os.environ.get("MDP_REGISTRY_MAX_BYTES", 1024 * 1024 * 1024)),
+    spill_dir=os.environ.get("MDP_REGISTRY_SPILL_DIR"),
+)
+
+# Thread pools for parallel sweeps never exceed the cores available to the server
+MAX_WORKERS = os.cpu_count() or 1
+
+# Budgets for batch groups whose models do not set their own
+DEFAULT_MAX_ITERATIONS = 10000
+DEFAULT_MAX_TIME = 2.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    job_manager.shutdown()
+
 
 app = FastAPI(
     title="Markov Decision Service",
     description="A microservice providing Markov Decision Process solutions.",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=NumpyJSONResponse,
 )
 
+# gzip (or zstd when available) for large complete responses, negotiated by Accept-Encoding
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    request.state.received = time.perf_counter()
+    response = await call_next(request)
+    finished = time.perf_counter()
+
+    # Label by route template so path parameters do not create new series
+    route = request.scope.get("route")
+    REQUEST_SECONDS.labels(route.path if route else "unmatched").observe(finished - request.state.received)
+
+    # Instrumented handlers leave their stage timer behind
+    timer = getattr(request.state, "timer", None)
+    if timer is not None:
+        response.headers["Server-Timing"] = timer.server_timing()
+
+    return response
+
+@app.exception_handler(RequestValidationError)
+async def request_validation_error(request: Request, exc: RequestValidationError):
+    # The default handler echoes the input with the standard json encoder, which
+    # cannot encode the NaN or inf that got the request rejected; orjson writes null
+    return NumpyJSONResponse({"detail": jsonable_encoder(exc.errors())}, status_code=422)
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
-@app.post( "/mdp/relative-value-iteration", response_model=MDPRelativeValueIterationResponse )
-def solve_mdp_average_reward_RVI(request: MDPRelativeValueIterationRequest):
-    TPM = np.array(request.TPM)
-    TRM = np.array(request.TRM)
+@app.get("/metrics")
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/mdp/cache/stats")
+def cache_stats():
+    return solution_cache.stats()
+
+def _solution_response(solution):
+    # Arrays are left as NumPy; NumpyJSONResponse serializes them without .tolist()
+    return {
+        "h": solution.h,
+        "g": float(solution.g),
+        "pi_star": solution.pi_star,
+        "iterations": int(solution.iterations),
+        "converged": bool(solution.converged),
+        "g_lower": float(solution.g_lower),
+        "g_upper": float(solution.g_upper),
+        "policy_stable_iteration": solution.policy_stable_iteration,
+        "time_saved": solution.time_saved,
+    }
+
+def _budget(request):
+    """Iteration/time budget overrides from the request; omitted fields keep the solver defaults."""
+    budget = {"max_iterations": request.max_iterations, "max_time": request.max_time}
+    return {name: value for name, value in budget.items() if value is not None}
+
+def _start_timer(http_request: Request, endpoint: str, validation_timings: dict) -> StageTimer:
+    """
+    Stage timer for one request. Time between receiving the request and
+    entering the handler, less the model validator's own stages, is the
+    body read, JSON decoding and field validation ("parse").
+    """
+    timer = StageTimer(endpoint)
+    elapsed = time.perf_counter() - http_request.state.received
+    timer.record("parse", max(elapsed - sum(validation_timings.values()), 0.0))
+    for stage, seconds in validation_timings.items():
+        timer.record(stage, seconds)
+
+    http_request.state.timer = timer
+    return timer
+
+def _solve_cached(key, solve, endpoint, method):
+    """
+    Return the cached solution for key, or run solve() and cache its result
+    when it converged (time-capped results depend on machine load).
+    """
+    result = solution_cache.get(key)
+    if result is None:
+        result = solve()
+        observe_solution(endpoint, method, result)
+        if result.converged:
+            solution_cache.put(key, result)
+    return result
+
+def _read_binary_model(body: bytes):
+    """
+    TPM and TRM from a body of two back-to-back `.npy` arrays, validated and
+    as float64. Rows of a lower-precision TPM can only sum to 1 within that
+    precision, so the row-sum tolerance grows to n times its machine epsilon.
+
+    Raises:
+        ValueError: if the arrays are malformed or do not form a valid model.
+    """
+    TPM, TRM = read_npy_arrays(body, 2)
+    tol = 1e-8
+    if TPM.dtype.kind == "f" and TPM.ndim == 3:
+        tol = max(tol, TPM.shape[1] * float(np.finfo(TPM.dtype).eps))
+
+    TPM, TRM = np.asarray(TPM, dtype=float), np.asarray(TRM, dtype=float)
+    validate_model_tensors(TPM, TRM, tol)
+    return TPM, TRM
+
+@app.post( "/mdp/relative-value-iteration", response_model=MDPTimedRelativeValueIterationResponse )
+def solve_mdp_average_reward_RVI(request: MDPRelativeValueIterationRequest, http_request: Request):
+    timer = _start_timer(http_request, "/mdp/relative-value-iteration", request.timings)
+    TPM, TRM = request.tensors
 
     logger.info(f"TPM shape: {TPM.shape}, TRM shape: {TRM.shape}")
 
     # Normalize reward vs cost semantics 
     if request.mode == "reward": TRM = -TRM
 
-    h, g, pi_star, last_iteration, converged = relative_value_iteration_average_reward(
-        TPM, TRM, request.s_ref, request.epsilon
+    # The worker count does not change the result, so it is not part of the key
+    key = solution_key(TPM, TRM, solver="average_reward", **request.model_dump(exclude={"TPM", "TRM", "mode", "workers", "include_timings"}))
+
+    try:
+        with timer.stage("solve"):
+            solution = _solve_cached(key, lambda: solve_average_reward(
+                TPM, TRM, request.s_ref, request.epsilon,
+                method=request.method,
+                evaluation_sweeps=request.evaluation_sweeps,
+                tau=request.tau,
+                workers=min(request.workers, MAX_WORKERS),
+                policy_window=request.policy_window,
+                validate=False,
+                h0=request.h0,
+                pi0=request.pi0,
+                stopping=request.stopping,
+                **_budget(request)
+            ), "/mdp/relative-value-iteration", request.method)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    response = _solution_response(solution)
+    if request.include_timings:
+        response["timings"] = dict(timer.timings)
+
+    # Returning the response directly skips response_model re-validation
+    with timer.stage("serialize"):
+        return NumpyJSONResponse(response)
+
+@app.post( "/mdp/relative-value-iteration/npy", response_model=MDPRelativeValueIterationResponse )
+async def solve_binary_mdp_average_reward_RVI(request: Request, params: Annotated[MDPBinaryRelativeValueIterationParams, Query()]):
+    """
+    RVI on a binary model: the body is the TPM followed by the TRM as `.npy`
+    arrays (application/octet-stream). The arrays are views into the request
+    body, so the model never passes through Python float objects.
+    """
+    if request.headers.get("content-type", "").split(";")[0].strip() != "application/octet-stream":
+        raise HTTPException(status_code=415, detail="Body must be application/octet-stream with TPM and TRM as .npy arrays")
+
+    body = await request.body()
+
+    def solve():
+        TPM, TRM = _read_binary_model(body)
+        if params.s_ref >= TPM.shape[0]:
+            raise ValueError(f"s_ref must be between 0 and {TPM.shape[0]-1}, got {params.s_ref}")
+
+        logger.info(f"TPM shape: {TPM.shape}, TRM shape: {TRM.shape} (binary)")
+
+        # Normalize reward vs cost semantics
+        if params.mode == "reward": TRM = -TRM
+
+        key = solution_key(TPM, TRM, solver="average_reward", h0=None, pi0=None, **params.model_dump(exclude={"mode", "workers"}))
+
+        return _solve_cached(key, lambda: solve_average_reward(
+            TPM, TRM, params.s_ref, params.epsilon,
+            method=params.method,
+            evaluation_sweeps=params.evaluation_sweeps,
+            tau=params.tau,
+            workers=min(params.workers, MAX_WORKERS),
+            policy_window=params.policy_window,
+            validate=False,
+            stopping=params.stopping,
+            **_budget(params)
+        ), "/mdp/relative-value-iteration/npy", params.method)
+
+    try:
+        # Validation, hashing the tensors and the solve all scale with the
+        # model, so none of them runs on the event loop
+        solution = await run_in_threadpool(solve)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return NumpyJSONResponse(_solution_response(solution))
+
+@app.post( "/mdp/relative-value-iteration/sparse", response_model=MDPRelativeValueIterationResponse )
+def solve_sparse_mdp_average_reward_RVI(request: MDPSparseRelativeValueIterationRequest):
+    mdp = request.mdp
+
+    logger.info(f"Sparse MDP: n={mdp.n_states}, A={mdp.n_actions}, nnz={mdp.nnz}")
+
+    # Normalize reward vs cost semantics
+    if request.mode == "reward": mdp = mdp.negated()
+
+    key = solution_key(
+        mdp.indptr, mdp.indices, mdp.probs, mdp.rewards, solver="sparse_rvi",
+        **request.model_dump(exclude={"state", "next_state", "action", "prob", "reward", "mode"})
     )
 
-    return {
-        "h": h.tolist(),
-        "g": g,
-        "pi_star": pi_star.tolist(),
-        "iterations":last_iteration ,
-        "converged": converged
-    }
+    solution = _solve_cached(key, lambda: relative_value_iteration_average_reward_sparse(
+        mdp, request.s_ref, request.epsilon, validate=False, h0=request.h0,
+        stopping=request.stopping, **_budget(request)
+    ), "/mdp/relative-value-iteration/sparse", "rvi")
+
+    return NumpyJSONResponse(_solution_response(solution))
+
+@app.post( "/mdp/relative-value-iteration/mapped", response_model=MDPRelativeValueIterationResponse )
+def solve_mapped_mdp_average_reward_RVI(request: MDPMappedRelativeValueIterationRequest):
+    try:
+        mdp = BlockedMDP.load(model_path(MODEL_DIR, request.model_id), block_size=request.block_size)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Model {request.model_id!r} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    logger.info(f"Mapped MDP {request.model_id}: n={mdp.n_states}, A={mdp.n_actions}, block_size={mdp.block_size}")
+
+    if request.s_ref >= mdp.n_states:
+        raise HTTPException(status_code=422, detail=f"s_ref must be between 0 and {mdp.n_states-1}, got {request.s_ref}")
+    if request.h0 is not None and len(request.h0) != mdp.n_states:
+        raise HTTPException(status_code=422, detail=f"h0 must have length n={mdp.n_states}, got {len(request.h0)}")
+
+    # Normalize reward vs cost semantics (negates the expected cost, not the mapped TRM)
+    if request.mode == "reward": mdp = mdp.negated()
+
+    try:
+        solution = relative_value_iteration_average_reward_blocked(
+            mdp, request.s_ref, request.epsilon, h0=request.h0,
+            stopping=request.stopping, workers=min(request.workers, MAX_WORKERS), **_budget(request)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    observe_solution("/mdp/relative-value-iteration/mapped", "rvi", solution)
+
+    return NumpyJSONResponse(_solution_response(solution))
+
+def _register_model(TPM, TRM):
+    try:
+        info = model_registry.register(TPM, TRM)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    logger.info(f"Registered MDP {info['model_id']}: n={info['n_states']}, A={info['n_actions']}, {info['storage']}")
+    return info
+
+@app.post( "/mdp/models", response_model=MDPModelInfoResponse, status_code=201 )
+def upload_mdp_model(request: MDPModelUploadRequest):
+    """
+    Validate a dense model once and store it in the model registry. Returns
+    the model_id that solve requests refer to; uploading the same tensors
+    again returns the same id.
+    """
+    TPM, TRM = request.tensors
+    return _register_model(TPM, TRM)
+
+@app.post( "/mdp/models/npy", response_model=MDPModelInfoResponse, status_code=201 )
+async def upload_binary_mdp_model(request: Request):
+    """Like /mdp/models with the TPM and TRM sent as back-to-back `.npy` arrays."""
+    if request.headers.get("content-type", "").split(";")[0].strip() != "application/octet-stream":
+        raise HTTPException(status_code=415, detail="Body must be application/octet-stream with TPM and TRM as .npy arrays")
+
+    body = await request.body()
+
+    def register():
+        try:
+            TPM, TRM = _read_binary_model(body)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return _register_model(TPM, TRM)
+
+    # Validation and the content hash scale with the model; keep them off the event loop
+    return await run_in_threadpool(register)
+
+@app.get( "/mdp/models" )
+def model_registry_stats():
+    return model_registry.stats()
+
+@app.get( "/mdp/models/{model_id}", response_model=MDPModelInfoResponse )
+def get_mdp_model(model_id: str):
+    try:
+        return model_registry.info(model_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Model {model_id!r} not found")
+
+@app.delete( "/mdp/models/{model_id}", status_code=204 )
+def delete_mdp_model(model_id: str):
+    if not model_registry.delete(model_id):
+        raise HTTPException(status_code=404, detail=f"Model {model_id!r} not found")
+    return Response(status_code=204)
+
+@app.post( "/mdp/models/{model_id}/relative-value-iteration", response_model=MDPRelativeValueIterationResponse )
+def solve_registered_mdp_average_reward_RVI(model_id: str, request: MDPRegisteredRelativeValueIterationRequest):
+    try:
+        mdp = model_registry.get(model_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Model {model_id!r} not found")
+
+    if request.s_ref >= mdp.n_states:
+        raise HTTPException(status_code=422, detail=f"s_ref must be between 0 and {mdp.n_states-1}, got {request.s_ref}")
+    if request.h0 is not None and len(request.h0) != mdp.n_states:
+        raise HTTPException(status_code=422, detail=f"h0 must have length n={mdp.n_states}, got {len(request.h0)}")
+
+    # Normalize reward vs cost semantics (negates the expected cost, not the stored TRM)
+    if request.mode == "reward": mdp = mdp.negated()
+
+    # The model id is a content hash, so it stands in for the tensors in the key
+    key = solution_key(solver="registered_rvi", model_id=model_id, **request.model_dump(exclude={"workers"}))
+
+    # Models were validated at upload
+    if isinstance(mdp, SparseMDP):
+        solve = lambda: relative_value_iteration_average_reward_sparse(
+            mdp, request.s_ref, request.epsilon, validate=False, h0=request.h0,
+            stopping=request.stopping, **_budget(request)
+        )
+    else:
+        solve = lambda: relative_value_iteration_average_reward_blocked(
+            mdp, request.s_ref, request.epsilon, validate=False, h0=request.h0,
+            stopping=request.stopping, workers=min(request.workers, MAX_WORKERS), **_budget(request)
+        )
+
+    try:
+        solution = _solve_cached(key, solve, "/mdp/models/{model_id}/relative-value-iteration", "rvi")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return NumpyJSONResponse(_solution_response(solution))
+
+@app.post( "/mdp/policy-iteration", response_model=MDPRelativeValueIterationResponse )
+def solve_mdp_average_reward_PI(request: MDPPolicyIterationRequest):
+    TPM, TRM = request.tensors
+
+    logger.info(f"TPM shape: {TPM.shape}, TRM shape: {TRM.shape}")
+
+    # Normalize reward vs cost semantics
+    if request.mode == "reward": TRM = -TRM
+
+    key = solution_key(TPM, TRM, solver="policy_iteration", **request.model_dump(exclude={"TPM", "TRM", "mode"}))
+
+    try:
+        solution = _solve_cached(key, lambda: policy_iteration_average_reward(
+            TPM, TRM, request.s_ref, request.epsilon, validate=False,
+            h0=request.h0, pi0=request.pi0, **_budget(request)
+        ), "/mdp/policy-iteration", "policy_iteration")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return NumpyJSONResponse(_solution_response(solution))
+
+@app.post( "/mdp/discounted/value-iteration", response_model=MDPDiscountedResponse )
+def solve_mdp_discounted_VI(request: MDPDiscountedRequest):
+    TPM, TRM = request.tensors
+
+    logger.info(f"TPM shape: {TPM.shape}, TRM shape: {TRM.shape}, discount: {request.discount}")
+
+    # Normalize reward vs cost semantics
+    if request.mode == "reward": TRM = -TRM
+
+    key = solution_key(TPM, TRM, solver="discounted_vi", **request.model_dump(exclude={"TPM", "TRM", "mode"}))
+
+    solution = _solve_cached(key, lambda: value_iteration_discounted(
+        TPM, TRM, request.discount, request.epsilon, validate=False, v0=request.v0, **_budget(request)
+    ), "/mdp/discounted/value-iteration", "value_iteration")
+
+    return NumpyJSONResponse({
+        "v": solution.v,
+        "pi_star": solution.pi_star,
+        "iterations": int(solution.iterations),
+        "converged": bool(solution.converged),
+        "v_lower": solution.v_lower,
+        "v_upper": solution.v_upper
+    })
+
+@app.post( "/mdp/finite-horizon" )
+def solve_mdp_finite_horizon(request: MDPFiniteHorizonRequest):
+    """
+    Backward induction streamed as newline-delimited JSON, one stage per line
+    from stage horizon - 1 down to 0, so the T x n policy table is never held in memory.
+    """
+    TPM, TRM = request.tensors
+
+    logger.info(f"TPM shape: {TPM.shape}, TRM shape: {TRM.shape}, horizon: {request.horizon}")
+
+    # Normalize reward vs cost semantics
+    if request.mode == "reward": TRM = -TRM
+
+    stages = backward_induction_finite_horizon(
+        TPM, TRM, request.horizon, terminal_cost=request.terminal_cost, validate=False
+    )
+
+    def lines():
+        for stage in stages:
+            line = {"stage": stage.stage, "pi_star": stage.pi_star}
+            if request.include_values:
+                line["v"] = stage.v
+            yield dumps(line) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.post( "/mdp/relative-value-iteration/batch", response_model=MDPBatchRelativeValueIterationResponse )
+def solve_mdp_average_reward_RVI_batch(request: MDPBatchRelativeValueIterationRequest):
+    # Group models by (n, n, A) so each group runs as one stacked RVI loop
+    groups = {}
+    for k, model in enumerate(request.models):
+        groups.setdefault(model.tensors[0].shape, []).append(k)
+
+    logger.info(f"Batch RVI: {len(request.models)} models in {len(groups)} shape groups")
+
+    results = [None] * len(request.models)
+    started = time.perf_counter()
+    for members in groups.values():
+        models = [request.models[k] for k in members]
+        TPM = np.stack([m.tensors[0] for m in models])
+        # Normalize reward vs cost semantics per model
+        TRM = np.stack([-m.tensors[1] if m.mode == "reward" else m.tensors[1] for m in models])
+
+        h0 = None
+        if any(m.h0 is not None or m.pi0 is not None for m in models):
+            try:
+                h0 = np.stack([
+                    initial_bias(TPM[b], expected_immediate_cost(TPM[b], TRM[b]), m.s_ref, m.h0, m.pi0)
+                    for b, m in enumerate(models)
+                ])
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+
+        # Groups run one after another, so each model's time budget counts from the
+        # start of the request; a model whose budget is already spent gets one sweep
+        elapsed = time.perf_counter() - started
+        solution = relative_value_iteration_average_reward_batch(
+            TPM, TRM,
+            [m.s_ref for m in models],
+            [m.epsilon for m in models],
+            max_iterations=[m.max_iterations or DEFAULT_MAX_ITERATIONS for m in models],
+            max_time=[max((m.max_time or DEFAULT_MAX_TIME) - elapsed, 0.0) for m in models],
+            validate=False,
+            h0=h0,
+            stopping=[m.stopping for m in models]
+        )
+
+        for b, k in enumerate(members):
+            model_solution = AverageRewardSolution(*(None if field is None else field[b] for field in solution))
+            observe_solution("/mdp/relative-value-iteration/batch", "rvi", model_solution)
+            results[k] = _solution_response(model_solution)
+
+    return NumpyJSONResponse({"results": results})
+
+@app.post( "/mdp/relative-value-iteration/stream" )
+async def stream_mdp_average_reward_RVI(request: MDPStreamingRelativeValueIterationRequest):
+    """
+    Server-sent events from a running solve: `progress` events (iteration, g,
+    delta, span, policy changes since the previous event, elapsed seconds) at
+    most every progress_interval seconds, then one `result` or `error` event.
+    A progress event the client has not read yet is replaced by the next one.
+    Closing the connection stops the solver at its next iteration.
+    """
+    TPM, TRM = request.tensors
+
+    logger.info(f"Streaming solve: TPM shape {TPM.shape}, method {request.method}")
+
+    # Normalize reward vs cost semantics
+    if request.mode == "reward": TRM = -TRM
+
+    loop = asyncio.get_running_loop()
+    # At most one undelivered progress event and the final event; a newer
+    # progress event replaces a stale one, so a slow client cannot make the
+    # server buffer every iteration
+    pending = {"progress": None, "final": None}
+    ready = asyncio.Event()
+    cancelled = threading.Event()
+    start = time.perf_counter()
+    tracker = {"reported": 0.0, "pi_star": None, "changes": 0}
+
+    def deliver(event, data):
+        # Runs on the event loop
+        if event != "progress":
+            pending["final"] = (event, data)
+        else:
+            stale = pending["progress"]
+            if stale is not None:
+                # Policy changes of a dropped event still count towards the next one
+                data["policy_changes"] += stale[1]["policy_changes"]
+            pending["progress"] = (event, data)
+        ready.set()
+
+    def publish(event, data):
+        loop.call_soon_threadsafe(deliver, event, data)
+
+    def callback(progress):
+        # Runs in the solver thread after every iteration
+        pi_star = progress["pi_star"]
+        if tracker["pi_star"] is not None:
+            tracker["changes"] += int(np.count_nonzero(pi_star != tracker["pi_star"]))
+        tracker["pi_star"] = pi_star
+
+        now = time.perf_counter()
+        if now - tracker["reported"] >= request.progress_interval:
+            tracker["reported"] = now
+            publish("progress", {
+                "iteration": progress["iteration"],
+                "g": progress["g"],
+                "delta": progress["delta"],
+                "span": progress["span"],
+                "policy_changes": tracker["changes"],
+                "elapsed": now - start,
+            })
+            tracker["changes"] = 0
+
+        return cancelled.is_set()
+
+    def solve():
+        # The stream ends on the final event, so one is published whatever happens
+        final = ("error", {"detail": "The solver stopped without a result"})
+        try:
+            solution = solve_average_reward(
+                TPM, TRM, request.s_ref, request.epsilon,
+                method=request.method,
+                evaluation_sweeps=request.evaluation_sweeps,
+                tau=request.tau,
+                workers=min(request.workers, MAX_WORKERS),
+                policy_window=request.policy_window,
+                validate=False,
+                h0=request.h0,
+                pi0=request.pi0,
+                callback=callback,
+                stopping=request.stopping,
+                **{"max_iterations": JOB_MAX_ITERATIONS, "max_time": JOB_MAX_TIME, **_budget(request)}
+            )
+            observe_solution("/mdp/relative-value-iteration/stream", request.method, solution)
+            final = ("result", _solution_response(solution))
+        except ValueError as e:
+            final = ("error", {"detail": str(e)})
+        except Exception as e:
+            logger.exception("Streaming solve failed")
+            final = ("error", {"detail": f"Solver failed: {type(e).__name__}: {e}"})
+        finally:
+            publish(*final)
+
+    loop.run_in_executor(None, solve)
+
+    def encode(event, data):
+        return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+    async def stream():
+        try:
+            while True:
+                await ready.wait()
+                ready.clear()
+                progress, final = pending["progress"], pending["final"]
+                pending["progress"] = None
+                if progress is not None:
+                    yield encode(*progress)
+                if final is not None:
+                    yield encode(*final)
+                    return
+        finally:
+            # Also reached when the client disconnects and the response task is cancelled
+            cancelled.set()
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.post( "/mdp/jobs", response_model=MDPJobStatusResponse, status_code=202 )
+def submit_mdp_job(request: MDPRelativeValueIterationRequest):
+    TPM, TRM = request.tensors
+
+    # Normalize reward vs cost semantics
+    if request.mode == "reward": TRM = -TRM
+
+    job_id = job_manager.submit(
+        TPM, TRM, request.s_ref, request.epsilon,
+        method=request.method,
+        evaluation_sweeps=request.evaluation_sweeps,
+        tau=request.tau,
+        workers=min(request.workers, MAX_WORKERS),
+        policy_window=request.policy_window,
+        h0=request.h0,
+        pi0=request.pi0,
+        stopping=request.stopping,
+        **{"max_iterations": JOB_MAX_ITERATIONS, "max_time": JOB_MAX_TIME, **_budget(request)}
+    )
+    logger.info(f"Submitted MDP job {job_id}: TPM shape {TPM.shape}, method {request.method}")
+
+    return job_manager.status(job_id)
+
+@app.get( "/mdp/jobs/{job_id}", response_model=MDPJobStatusResponse )
+def get_mdp_job(job_id: str):
+    try:
+        return job_manager.status(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+
+@app.delete( "/mdp/jobs/{job_id}", response_model=MDPJobStatusResponse )
+def cancel_mdp_job(job_id: str):
+    try:
+        return job_manager.cancel(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
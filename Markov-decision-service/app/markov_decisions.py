@@ -1,41 +1,762 @@
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
 import numpy as np
 
-def relative_value_iteration_average_reward(TPM, TRM, s_ref, epsilon, max_iterations=10000, max_time=2.0):
-    
-    validate_tpm_stochastic(TPM)
+from app.sparse_mdp import SparseMDP
+from app.blocked_mdp import BlockedMDP
+
+
+class AverageRewardSolution(NamedTuple):
+    """
+    Result of an average-reward solve.
+
+    g_lower and g_upper are the bounds min_i (T h - h)(i) <= g* <= max_i (T h - h)(i)
+    from the last Bellman sweep, which bracket the optimal gain of a unichain model.
+
+    policy_stable_iteration and time_saved are set only when relative value
+    iteration switched to evaluating a stable policy directly: the sweep from
+    which the greedy policy no longer changed, and the estimated seconds saved
+    over sweeping until the tolerance (negative when the linear solve cost
+    more than the sweeps it replaced, None when no estimate was possible).
+    """
+    h: np.ndarray
+    g: float
+    pi_star: np.ndarray
+    iterations: int
+    converged: bool
+    g_lower: float
+    g_upper: float
+    policy_stable_iteration: Optional[int] = None
+    time_saved: Optional[float] = None
+
+
+# "max_abs" stops on max|h_new - h| < epsilon; "span" stops on
+# max(h_new - h) - min(h_new - h) < epsilon, i.e. once g_upper - g_lower < epsilon
+STOPPING_RULES = ("max_abs", "span")
+
+def relative_value_iteration_average_reward(TPM, TRM, s_ref, epsilon, max_iterations=10000, max_time=2.0, validate=True, h0=None, pi0=None, callback=None, stopping="max_abs", workers=1, policy_window=None):
+    """
+    Relative value iteration for the average-cost criterion.
+
+    With policy_window set, once the greedy policy has not changed for
+    policy_window consecutive sweeps its evaluation equations are solved
+    directly; if the resulting bias passes the stopping rule the solve ends
+    there instead of sweeping until h itself converges.
+    """
+    # Callers that already validated the TPM (e.g. the request model) skip the second pass
+    if validate:
+        validate_tpm_stochastic(TPM)
 
     n, _, A = TPM.shape
 
+    if workers > 1:
+        # One contiguous block of states per worker thread
+        mdp = BlockedMDP(TPM, TRM, block_size=-(-n // workers))
+        h = initial_bias(TPM, mdp.expected_cost, s_ref, h0, pi0)
+        evaluate_policy = _dense_policy_evaluator(TPM, mdp.expected_cost, s_ref) if policy_window else None
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return _relative_value_iteration(
+                lambda h: mdp.bellman_q(h, pool), h, s_ref, epsilon, max_iterations, max_time, callback, stopping,
+                policy_window, evaluate_policy,
+            )
+
+    # Expected one-step cost is constant across sweeps, so only P·h is recomputed per iteration
+    C = expected_immediate_cost(TPM, TRM)
+
+    def bellman_q(h):
+        # Vectorized Bellman update: Q(i, a) = C(i, a) + sum_j P(i, j, a) * h(j)
+        return bellman_q_dense(TPM, C, h)
+
+    h = initial_bias(TPM, C, s_ref, h0, pi0)
+    evaluate_policy = _dense_policy_evaluator(TPM, C, s_ref) if policy_window else None
+
+    return _relative_value_iteration(
+        bellman_q, h, s_ref, epsilon, max_iterations, max_time, callback, stopping, policy_window, evaluate_policy
+    )
+
+def relative_value_iteration_average_reward_sparse(mdp: SparseMDP, s_ref, epsilon, max_iterations=10000, max_time=2.0, validate=True, h0=None, callback=None, stopping="max_abs"):
+    """
+    Relative value iteration over a SparseMDP. Produces the same h, g and pi_star
+    as relative_value_iteration_average_reward on the equivalent dense tensors,
+    with each sweep costing O(nnz) instead of O(n^2 A).
+    """
+    if validate:
+        mdp.validate_stochastic()
+
+    h = np.zeros(mdp.n_states) if h0 is None else _relative_bias(h0, s_ref)
+
+    return _relative_value_iteration(mdp.bellman_q, h, s_ref, epsilon, max_iterations, max_time, callback, stopping)
+
+def relative_value_iteration_average_reward_blocked(mdp: BlockedMDP, s_ref, epsilon, max_iterations=10000, max_time=2.0, validate=True, h0=None, callback=None, stopping="max_abs", workers=1):
+    """
+    Relative value iteration over a BlockedMDP, e.g. a memory-mapped model
+    that does not fit in memory. Produces the same h, g and pi_star as
+    relative_value_iteration_average_reward while touching only one block of
+    states of the TPM at a time (or one block per worker thread when workers > 1).
+    """
+    if validate:
+        mdp.validate_stochastic()
+
+    h = np.zeros(mdp.n_states) if h0 is None else _relative_bias(h0, s_ref)
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return _relative_value_iteration(
+                lambda h: mdp.bellman_q(h, pool), h, s_ref, epsilon, max_iterations, max_time, callback, stopping
+            )
+
+    return _relative_value_iteration(mdp.bellman_q, h, s_ref, epsilon, max_iterations, max_time, callback, stopping)
+
+def relative_value_iteration_average_reward_batch(TPM, TRM, s_ref, epsilon, max_iterations=10000, max_time=2.0, validate=True, h0=None, stopping="max_abs"):
+    """
+    Relative value iteration for a batch of same-shape models in one
+    vectorized loop over a leading batch axis.
+
+    TPM and TRM have shape (B, n, n, A); s_ref, epsilon, max_iterations,
+    max_time and stopping are scalars or length-B sequences; h0 is an
+    optional (B, n) warm start. Each model stops as soon as it meets its own
+    tolerance, iteration budget or time budget, and finished models are
+    dropped from the working set so later sweeps only touch the models still
+    iterating.
+
+    Returns an AverageRewardSolution whose fields are per-model arrays
+    (h (B, n), g (B,), pi_star (B, n), iterations (B,), converged (B,),
+    g_lower (B,), g_upper (B,)).
+    """
+    TPM = np.asarray(TPM, dtype=float)
+    TRM = np.asarray(TRM, dtype=float)
+    B, n, _, A = TPM.shape
+
+    if validate:
+        for b in range(B):
+            validate_tpm_stochastic(TPM[b])
+
+    s_ref = np.broadcast_to(np.asarray(s_ref, dtype=int), (B,))
+    epsilon = np.broadcast_to(np.asarray(epsilon, dtype=float), (B,))
+    max_iterations = np.broadcast_to(np.asarray(max_iterations, dtype=int), (B,))
+    max_time = np.broadcast_to(np.asarray(max_time, dtype=float), (B,))
+    stopping = np.broadcast_to(np.asarray(stopping), (B,))
+    for rule in np.unique(stopping):
+        _check_stopping(rule)
+    use_span = stopping == "span"
+
+    h_out = np.zeros((B, n)) if h0 is None else np.array(h0, dtype=float)
+    h_out -= h_out[np.arange(B), s_ref][:, None]
+    g_out = np.zeros(B)
+    pi_out = np.zeros((B, n), dtype=int)
+    iterations = np.zeros(B, dtype=int)
+    converged = np.zeros(B, dtype=bool)
+    g_lower = np.zeros(B)
+    g_upper = np.zeros(B)
+
+    # Working set of models that have not converged yet
+    active = np.arange(B)
+    P = TPM
+    C = np.einsum("bija,bija->bia", TPM, TRM)
+    h = h_out.copy()
+    iter_count = 0
+    start = time.perf_counter()
+
+    while active.size:
+        iter_count += 1
+        # Q(b, i, a) = C(b, i, a) + sum_j P(b, i, j, a) h(b, j)
+        Q = C + (h[:, None, None, :] @ P)[:, :, 0, :]
+
+        pi_star = np.argmin(Q, axis=2)
+        h_new = np.take_along_axis(Q, pi_star[:, :, None], axis=2)[:, :, 0]
+
+        g_new = h_new[np.arange(active.size), s_ref[active]]
+        h_new = h_new - g_new[:, None]
+
+        diff = h_new - h
+        diff_min, diff_max = diff.min(axis=1), diff.max(axis=1)
+        metric = np.where(use_span[active], diff_max - diff_min, np.max(np.abs(diff), axis=1))
+        done = metric < epsilon[active]
+
+        elapsed = time.perf_counter() - start
+        finished = done | (iter_count >= max_iterations[active]) | (elapsed > max_time[active])
+
+        if finished.any():
+            ids = active[finished]
+            h_out[ids] = h_new[finished]
+            g_out[ids] = g_new[finished]
+            pi_out[ids] = pi_star[finished]
+            iterations[ids] = iter_count
+            converged[ids] = done[finished]
+            g_lower[ids] = g_new[finished] + diff_min[finished]
+            g_upper[ids] = g_new[finished] + diff_max[finished]
+
+            keep = ~finished
+            active = active[keep]
+            P, C, h_new = P[keep], C[keep], h_new[keep]
+
+        h = h_new
+
+    return AverageRewardSolution(h_out, g_out, pi_out, iterations, converged, g_lower, g_upper)
+
+def policy_iteration_average_reward(TPM, TRM, s_ref, epsilon, max_iterations=1000, max_time=2.0, validate=True, h0=None, pi0=None, callback=None):
+    """
+    Howard policy iteration for the average-cost criterion.
+
+    Each iteration evaluates the current policy exactly with a linear solve of
+    h + g = c_pi + P_pi h (h[s_ref] = 0) and then improves it greedily. The
+    current action is kept unless another action is better by more than
+    epsilon, which prevents cycling between tied actions. Stops once the policy
+    no longer changes, typically after a handful of iterations.
+
+    Starts from pi0 when given, otherwise from the policy that is greedy with
+    respect to h0 (or to the one-step cost when neither is given).
+
+    Returns an AverageRewardSolution like relative_value_iteration_average_reward.
+
+    Raises:
+        ValueError: if a policy's evaluation equations are singular (multichain model).
+    """
+    if validate:
+        validate_tpm_stochastic(TPM)
+
+    n = TPM.shape[0]
+    states = np.arange(n)
+    C = expected_immediate_cost(TPM, TRM)
+
+    if pi0 is not None:
+        pi_star = np.asarray(pi0, dtype=int)
+    elif h0 is not None:
+        pi_star = np.argmin(bellman_q_dense(TPM, C, _relative_bias(h0, s_ref)), axis=1)
+    else:
+        pi_star = np.argmin(C, axis=1)
     h = np.zeros(n)
+    iter_count = 0
+    start = time.perf_counter()
+
+    while True:
+        iter_count += 1
+        h_prev = h
+        h, g = evaluate_policy_average_reward(TPM[states, :, pi_star], C[states, pi_star], s_ref)
+
+        Q = bellman_q_dense(TPM, C, h)
+        pi_new = np.argmin(Q, axis=1)
+
+        # Only switch where the improvement is larger than the tie tolerance
+        keep = Q[states, pi_star] <= Q[states, pi_new] + epsilon
+        pi_new[keep] = pi_star[keep]
+
+        # h is the exact bias of pi_star, so T h - h gives the gain bounds directly
+        gain_gap = Q.min(axis=1) - h
+        solution = AverageRewardSolution(h, g, pi_star, iter_count, False, gain_gap.min(), gain_gap.max())
+
+        if np.array_equal(pi_new, pi_star):
+            return solution._replace(converged=True)
+
+        if _report_progress(callback, iter_count, g, h - h_prev, pi_star):
+            return solution
+
+        if time.perf_counter() - start > max_time or iter_count >= max_iterations:
+            return solution
+
+        pi_star = pi_new
+
+def evaluate_policy_average_reward(P_pi: np.ndarray, c_pi: np.ndarray, s_ref: int):
+    """
+    Solve the average-cost evaluation equations of a fixed policy,
+
+        h(i) + g = c_pi(i) + sum_j P_pi(i, j) h(j),    h(s_ref) = 0,
+
+    for the bias vector h and the gain g.
+
+    Since h(s_ref) is pinned to 0, its column of (I - P_pi) is replaced with
+    ones and the corresponding unknown becomes g.
+
+    Raises:
+        ValueError: if the system is singular (the policy's chain is multichain).
+    """
+    n = P_pi.shape[0]
+    M = np.eye(n) - P_pi
+    M[:, s_ref] = 1.0
+
+    try:
+        x = np.linalg.solve(M, c_pi)
+    except np.linalg.LinAlgError:
+        raise ValueError(
+            "Policy evaluation equations are singular; the model must be unichain "
+            "for average-cost policy iteration"
+        )
+
+    g = x[s_ref]
+    x[s_ref] = 0.0
+    return x, g
+
+def gauss_seidel_relative_value_iteration_average_reward(TPM, TRM, s_ref, epsilon, block_size=16, max_iterations=10000, max_time=2.0, validate=True, h0=None, pi0=None, callback=None, stopping="max_abs"):
+    """
+    Relative value iteration with Gauss-Seidel sweeps.
+
+    States are updated in blocks of block_size, and each block already uses
+    the values updated earlier in the same sweep. When states are numbered
+    along the main flow of the chain this cuts the number of sweeps compared
+    with the Jacobi-style update of relative_value_iteration_average_reward.
+    block_size=1 is classical Gauss-Seidel; larger blocks trade some of that
+    gain for vectorization.
+
+    Each sweep first evaluates the Bellman update of s_ref, whose value is the
+    fresh gain estimate g = min_a Q(h)[s_ref], and subtracts that g in every
+    block; the remaining drift at s_ref is folded into g and removed from h
+    after the sweep, so a fixed point satisfies h + g = min_a Q(h) with
+    h[s_ref] = 0. The blocks keep their natural order so that a numbering along
+    the flow is not broken. A Gauss-Seidel sweep is not T h, so the reported
+    gain bounds come from one extra Jacobi sweep of the returned h.
+    """
+    _check_stopping(stopping)
+
+    if validate:
+        validate_tpm_stochastic(TPM)
+
+    n = TPM.shape[0]
+    C = expected_immediate_cost(TPM, TRM)
+    blocks = [slice(b, min(b + block_size, n)) for b in range(0, n, block_size)]
+
+    h = initial_bias(TPM, C, s_ref, h0, pi0)
     pi_star = np.zeros(n, dtype=int)
     iter_count = 0
     start = time.perf_counter()
-    converged = False
 
     while True:
         iter_count += 1
-        # Vectorized Bellman update
-        R_plus_h = TRM + h[:, None, None]
-        Q = np.sum(TPM * R_plus_h, axis=1)
+        # Gain estimate from this sweep's update of s_ref, before any other state moves
+        g = float(np.min(bellman_q_dense(TPM[s_ref:s_ref + 1], C[s_ref:s_ref + 1], h)))
+        v = h.copy()
+
+        for block in blocks:
+            Q = bellman_q_dense(TPM[block], C[block], v)
+            pi_star[block] = np.argmin(Q, axis=1)
+            v[block] = Q[np.arange(Q.shape[0]), pi_star[block]] - g
+
+        drift = v[s_ref]
+        g_new = g + drift
+        h_new = v - drift
+
+        converged = bool(_stopping_metric(h_new - h, stopping) < epsilon)
+        if (
+            converged
+            or _report_progress(callback, iter_count, g_new, h_new - h, pi_star)
+            or time.perf_counter() - start > max_time
+            or iter_count >= max_iterations
+        ):
+            gain_gap = bellman_q_dense(TPM, C, h_new).min(axis=1) - h_new
+            return AverageRewardSolution(h_new, g_new, pi_star, iter_count, converged, gain_gap.min(), gain_gap.max())
+
+        h = h_new
+
+def modified_policy_iteration_average_reward(TPM, TRM, s_ref, epsilon, evaluation_sweeps=5, max_iterations=10000, max_time=2.0, validate=True, h0=None, pi0=None, callback=None, stopping="max_abs"):
+    """
+    Modified policy iteration for the average-cost criterion.
+
+    Each iteration performs one greedy Bellman sweep (improvement) followed by
+    evaluation_sweeps relative sweeps of the fixed greedy policy, which cost
+    O(n^2) instead of O(n^2 A). evaluation_sweeps=0 is plain RVI; large values
+    approach policy iteration without its linear solve.
+    """
+    _check_stopping(stopping)
+
+    if validate:
+        validate_tpm_stochastic(TPM)
+
+    n = TPM.shape[0]
+    states = np.arange(n)
+    C = expected_immediate_cost(TPM, TRM)
+
+    h = initial_bias(TPM, C, s_ref, h0, pi0)
+    iter_count = 0
+    start = time.perf_counter()
+
+    while True:
+        iter_count += 1
+        Q = bellman_q_dense(TPM, C, h)
 
         pi_star = np.argmin(Q, axis=1)
+        h_new = Q[states, pi_star]
+
+        g_new = h_new[s_ref]
+        h_new = h_new - g_new
+
+        diff = h_new - h
+        converged = bool(_stopping_metric(diff, stopping) < epsilon)
+        if (
+            converged
+            or _report_progress(callback, iter_count, g_new, diff, pi_star)
+            or time.perf_counter() - start > max_time
+            or iter_count >= max_iterations
+        ):
+            return AverageRewardSolution(h_new, g_new, pi_star, iter_count, converged, g_new + diff.min(), g_new + diff.max())
+
+        # Partial evaluation of the greedy policy
+        P_pi = TPM[states, :, pi_star]
+        c_pi = C[states, pi_star]
+        for _ in range(evaluation_sweeps):
+            v = c_pi + P_pi @ h_new
+            h_new = v - v[s_ref]
+
+        h = h_new
+
+def aperiodic_relative_value_iteration_average_reward(TPM, TRM, s_ref, epsilon, tau=0.5, max_iterations=10000, max_time=2.0, validate=True, h0=None, pi0=None, callback=None, stopping="max_abs"):
+    """
+    Relative value iteration on the aperiodicity-transformed chain
+    P_tau = tau * P + (1 - tau) * I, 0 < tau < 1.
+
+    Plain RVI can oscillate forever on periodic chains. The transformed chain
+    is aperiodic with the same optimal policy and gain, and its bias is h / tau,
+    so the returned h is rescaled to the bias of the original model. Since
+    T_tau h' - h' = T h - h for h = tau * h', the gain bounds carry over unchanged.
+    """
+    if validate:
+        validate_tpm_stochastic(TPM)
+
+    if not (0 < tau < 1):
+        raise ValueError(f"tau must be between 0 and 1 (exclusive), got {tau}")
+
+    n = TPM.shape[0]
+    C = expected_immediate_cost(TPM, TRM)
+
+    def bellman_q(h):
+        # Q_tau(i, a) = C(i, a) + tau * sum_j P(i, j, a) h(j) + (1 - tau) * h(i)
+        return C + tau * (h @ TPM) + (1 - tau) * h[:, None]
+
+    # The transformed chain's bias is h / tau
+    h = initial_bias(TPM, C, s_ref, h0, pi0) / tau
+
+    # The span of the transformed update is already g_upper - g_lower; only a
+    # max_abs bound on the transformed bias has to be scaled to the original h
+    tolerance = epsilon if stopping == "span" else epsilon / tau
+    solution = _relative_value_iteration(
+        bellman_q, h, s_ref, tolerance, max_iterations, max_time, callback, stopping
+    )
+    return solution._replace(h=tau * solution.h)
+
+AVERAGE_REWARD_METHODS = ("rvi", "gauss_seidel", "modified_policy_iteration", "aperiodic_rvi", "policy_iteration")
+
+def solve_average_reward(TPM, TRM, s_ref, epsilon, method="rvi", evaluation_sweeps=5, tau=0.5, workers=1, policy_window=None, validate=True, **kwargs):
+    """
+    Solve an average-cost MDP with the selected algorithm. workers > 1 runs
+    the rvi sweeps on a thread pool; the other methods are single-threaded.
+    policy_window enables the stable-policy switch of rvi and is ignored by
+    the other methods.
+    Extra keyword arguments (max_iterations, max_time, h0, pi0, callback,
+    stopping) are passed through to the solver.
+
+    Returns the AverageRewardSolution shared by all solvers.
+    """
+    if method == "rvi":
+        return relative_value_iteration_average_reward(
+            TPM, TRM, s_ref, epsilon, validate=validate, workers=workers, policy_window=policy_window, **kwargs
+        )
+    if method == "gauss_seidel":
+        return gauss_seidel_relative_value_iteration_average_reward(TPM, TRM, s_ref, epsilon, validate=validate, **kwargs)
+    if method == "modified_policy_iteration":
+        return modified_policy_iteration_average_reward(
+            TPM, TRM, s_ref, epsilon, evaluation_sweeps=evaluation_sweeps, validate=validate, **kwargs
+        )
+    if method == "aperiodic_rvi":
+        return aperiodic_relative_value_iteration_average_reward(TPM, TRM, s_ref, epsilon, tau=tau, validate=validate, **kwargs)
+    if method == "policy_iteration":
+        # Policy iteration stops on a stable policy, so the stopping rule does not apply
+        kwargs.pop("stopping", None)
+        return policy_iteration_average_reward(TPM, TRM, s_ref, epsilon, validate=validate, **kwargs)
+
+    raise ValueError(f"method must be one of {AVERAGE_REWARD_METHODS}, got {method!r}")
+
+class DiscountedSolution(NamedTuple):
+    """
+    Result of a discounted-cost solve.
+
+    v_lower and v_upper are the MacQueen bounds
+    T v + b * min(T v - v) <= v* <= T v + b * max(T v - v), b = discount / (1 - discount),
+    from the last Bellman sweep; v is their midpoint.
+    """
+    v: np.ndarray
+    pi_star: np.ndarray
+    iterations: int
+    converged: bool
+    v_lower: np.ndarray
+    v_upper: np.ndarray
+
+
+def value_iteration_discounted(TPM, TRM, discount, epsilon, max_iterations=10000, max_time=2.0, validate=True, v0=None):
+    """
+    Value iteration for a discounted-cost MDP, minimizing E[sum_t discount^t * cost_t].
+
+    Stops as soon as the MacQueen bounds on v* are less than epsilon apart,
+    i.e. discount / (1 - discount) * span(T v - v) < epsilon. The span of the
+    change shrinks much faster than its max norm once the values move in
+    parallel, so this stops well before the classical
+    ||T v - v|| < epsilon (1 - discount) / (2 discount) test at high discount factors.
+    """
+    if validate:
+        validate_tpm_stochastic(TPM)
+
+    C = expected_immediate_cost(TPM, TRM)
+
+    def bellman_q(v):
+        # Same kernel as the average-reward solvers with the discount folded into v
+        return bellman_q_dense(TPM, C, discount * v)
+
+    v = np.zeros(TPM.shape[0]) if v0 is None else np.array(v0, dtype=float)
+
+    return _discounted_value_iteration(bellman_q, v, discount, epsilon, max_iterations, max_time)
+
+def value_iteration_discounted_sparse(mdp: SparseMDP, discount, epsilon, max_iterations=10000, max_time=2.0, validate=True, v0=None):
+    """
+    Discounted value iteration over a SparseMDP, with each sweep costing O(nnz).
+    """
+    if validate:
+        mdp.validate_stochastic()
+
+    v = np.zeros(mdp.n_states) if v0 is None else np.array(v0, dtype=float)
+
+    return _discounted_value_iteration(
+        lambda v: mdp.bellman_q(discount * v), v, discount, epsilon, max_iterations, max_time
+    )
+
+class FiniteHorizonStage(NamedTuple):
+    """
+    Optimal cost-to-go v and decision rule pi_star at one decision epoch.
+    """
+    stage: int
+    v: np.ndarray
+    pi_star: np.ndarray
+
+
+def backward_induction_finite_horizon(TPM, TRM, horizon, terminal_cost=None, validate=True):
+    """
+    Backward induction for a finite-horizon MDP with stationary TPM/TRM.
+
+    Returns a generator of FiniteHorizonStage for stages horizon - 1 down to 0,
+    where v_t(i) = min_a [C(i, a) + sum_j P(i, j, a) * v_{t+1}(j)] and
+    v_horizon = terminal_cost (zeros by default). Only the current cost-to-go
+    vector is held, so memory is O(nA) for any horizon; callers that need the
+    full T x n policy table collect it from the stream.
+
+    The model is validated when the function is called, before the first stage
+    is computed.
+
+    Raises:
+        ValueError: if horizon < 1 or terminal_cost does not have length n.
+    """
+    if validate:
+        validate_tpm_stochastic(TPM)
+
+    if horizon < 1:
+        raise ValueError(f"horizon must be at least 1, got {horizon}")
+
+    n = TPM.shape[0]
+    v = np.zeros(n) if terminal_cost is None else np.array(terminal_cost, dtype=float)
+    if v.shape != (n,):
+        raise ValueError(f"terminal_cost must have length n={n}, got {v.shape[0]}")
+
+    C = expected_immediate_cost(TPM, TRM)
+
+    def stages(v):
+        states = np.arange(n)
+        for t in range(horizon - 1, -1, -1):
+            Q = bellman_q_dense(TPM, C, v)
+            pi_star = np.argmin(Q, axis=1)
+            v = Q[states, pi_star]
+            yield FiniteHorizonStage(t, v, pi_star)
+
+    return stages(v)
+
+def expected_immediate_cost(TPM: np.ndarray, TRM: np.ndarray) -> np.ndarray:
+    """
+    Expected one-step cost C(i, a) = sum_j P(i, j, a) * R(i, j, a), shape (n, A).
+    """
+    return np.einsum("ija,ija->ia", TPM, TRM)
+
+def bellman_q_dense(TPM: np.ndarray, C: np.ndarray, h: np.ndarray) -> np.ndarray:
+    """
+    Q(i, a) = C(i, a) + sum_j P(i, j, a) * h(j), shape (n, A).
+
+    h @ TPM treats TPM as a stack of n (n, A) matrices, so the product is
+    computed without any n x n x A temporaries.
+    """
+    return C + h @ TPM
+
+def initial_bias(TPM: np.ndarray, C: np.ndarray, s_ref: int, h0=None, pi0=None) -> np.ndarray:
+    """
+    Starting bias vector for a warm-started solve.
+
+    Uses h0 (shifted so that h0[s_ref] = 0) when given, otherwise the exact
+    bias of the policy pi0, otherwise zeros (a cold start).
+    """
+    if h0 is not None:
+        return _relative_bias(h0, s_ref)
+
+    n = TPM.shape[0]
+    if pi0 is not None:
+        states = np.arange(n)
+        pi0 = np.asarray(pi0, dtype=int)
+        h, _ = evaluate_policy_average_reward(TPM[states, :, pi0], C[states, pi0], s_ref)
+        return h
+
+    return np.zeros(n)
+
+def _relative_bias(h0, s_ref: int) -> np.ndarray:
+    h = np.array(h0, dtype=float)
+    return h - h[s_ref]
+
+def _report_progress(callback, iteration, g, diff, pi_star) -> bool:
+    """
+    Send one progress update to callback. A truthy return value from the
+    callback asks the solver to stop early (reported as not converged).
+    """
+    if callback is None:
+        return False
+
+    return bool(callback({
+        "iteration": iteration,
+        "g": float(g),
+        "delta": float(np.max(np.abs(diff))),
+        "span": float(np.max(diff) - np.min(diff)),
+        "pi_star": pi_star,
+    }))
+
+def _check_stopping(stopping: str) -> None:
+    if stopping not in STOPPING_RULES:
+        raise ValueError(f"stopping must be one of {STOPPING_RULES}, got {stopping!r}")
+
+def _stopping_metric(diff: np.ndarray, stopping: str) -> float:
+    if stopping == "span":
+        return np.max(diff) - np.min(diff)
+    return np.max(np.abs(diff))
+
+def _dense_policy_evaluator(TPM: np.ndarray, C: np.ndarray, s_ref: int):
+    """Return pi -> (h_pi, g_pi), the exact evaluation of a policy of the dense model."""
+    states = np.arange(TPM.shape[0])
+
+    def evaluate(pi):
+        return evaluate_policy_average_reward(TPM[states, :, pi], C[states, pi], s_ref)
+
+    return evaluate
+
+def _remaining_sweeps(metrics, epsilon: float) -> Optional[float]:
+    """
+    Sweeps plain RVI would still need to bring the stopping metric below
+    epsilon, extrapolating the geometric rate of the recent metrics. None
+    when the metrics are not contracting.
+    """
+    if len(metrics) < 2 or metrics[0] <= 0:
+        return None
+    rate = (metrics[-1] / metrics[0]) ** (1 / (len(metrics) - 1))
+    if not 0 < rate < 1:
+        return None
+    return max(np.log(epsilon / metrics[-1]) / np.log(rate), 0.0)
+
+def _relative_value_iteration(bellman_q, h, s_ref, epsilon, max_iterations, max_time, callback=None, stopping="max_abs", policy_window=None, evaluate_policy=None):
+
+    _check_stopping(stopping)
+
+    n = h.shape[0]
+    pi_star = np.zeros(n, dtype=int)
+    iter_count = 0
+    start = time.perf_counter()
+    converged = False
+
+    # Stable-policy switch: sweeps the greedy policy has stayed unchanged, the
+    # recent stopping metrics (for the convergence rate) and, after a switch,
+    # (iteration the policy stabilized at, switch start, estimated sweeps saved)
+    stable = 0
+    recent_metrics = deque(maxlen=max(policy_window or 0, 2))
+    sweep_seconds = 0.0
+    switch = None
+
+    while True:
+        iter_count += 1
+        sweep_start = time.perf_counter()
+        Q = bellman_q(h)
+
+        pi_new = np.argmin(Q, axis=1)
+        stable = stable + 1 if iter_count > 1 and np.array_equal(pi_new, pi_star) else 1
+        pi_star = pi_new
         h_new = Q[np.arange(n), pi_star]
 
         g_new = h_new[s_ref]
         h_new = h_new - g_new
 
-        if np.max(np.abs(h_new - h)) < epsilon:
-            converged = True
-            return h_new, g_new, pi_star, iter_count, converged
+        # (T h - h)(i) = g_new + diff(i) brackets the optimal gain
+        diff = h_new - h
+        solution = AverageRewardSolution(h_new, g_new, pi_star, iter_count, converged, g_new + diff.min(), g_new + diff.max())
+        sweep_seconds += time.perf_counter() - sweep_start
+        metric = _stopping_metric(diff, stopping)
+
+        if metric < epsilon:
+            solution = solution._replace(converged=True)
+            if switch is not None:
+                stable_iteration, switch_start, sweeps_saved = switch
+                time_saved = None
+                if sweeps_saved is not None:
+                    # Sweeps RVI would still have run, minus the linear solve and this checking sweep
+                    time_saved = sweeps_saved * sweep_seconds / iter_count - (time.perf_counter() - switch_start)
+                solution = solution._replace(policy_stable_iteration=stable_iteration, time_saved=time_saved)
+            return solution
+        switch = None
+
+        if _report_progress(callback, iter_count, g_new, diff, pi_star):
+            return solution
         
         if time.perf_counter() - start > max_time:
-            return h, g_new, pi_star, iter_count, converged
+            return solution
         
         if iter_count >= max_iterations:
-            return h, g_new, pi_star, iter_count, converged
+            return solution
 
         h = h_new
+        recent_metrics.append(metric)
+
+        if evaluate_policy is not None and policy_window and stable >= policy_window:
+            switch_start = time.perf_counter()
+            try:
+                h_pi, _ = evaluate_policy(pi_star)
+            except ValueError:
+                # Multichain policy: the evaluation equations have no unique solution, keep sweeping
+                evaluate_policy = None
+            else:
+                # The next sweep checks h_pi against the stopping rule; if the
+                # policy was not optimal after all, RVI simply continues from h_pi
+                switch = (iter_count - stable + 1, switch_start, _remaining_sweeps(recent_metrics, epsilon))
+                h = h_pi
+                stable = 0
+
+def _discounted_value_iteration(bellman_q, v, discount, epsilon, max_iterations, max_time):
+
+    if not 0 < discount < 1:
+        raise ValueError(f"discount must be between 0 and 1 (exclusive), got {discount}")
+
+    n = v.shape[0]
+    weight = discount / (1 - discount)
+    iter_count = 0
+    start = time.perf_counter()
+
+    while True:
+        iter_count += 1
+        Q = bellman_q(v)
+
+        pi_star = np.argmin(Q, axis=1)
+        v_new = Q[np.arange(n), pi_star]
+
+        diff = v_new - v
+        v_lower = v_new + weight * diff.min()
+        v_upper = v_new + weight * diff.max()
+        solution = DiscountedSolution((v_lower + v_upper) / 2, pi_star, iter_count, False, v_lower, v_upper)
+
+        if weight * (diff.max() - diff.min()) < epsilon:
+            return solution._replace(converged=True)
+
+        if time.perf_counter() - start > max_time:
+            return solution
+
+        if iter_count >= max_iterations:
+            return solution
+
+        v = v_new
 
 def validate_tpm_stochastic(TPM: np.ndarray, tol: float = 1e-8) -> None:
     """
@@ -45,7 +766,7 @@ def validate_tpm_stochastic(TPM: np.ndarray, tol: float = 1e-8) -> None:
     Checks:
     - TPM is 3D
     - TPM is square in the first two dimensions
-    - All probabilities are non-negative
+    - All probabilities are finite and non-negative
     - Each row for each action sums to 1 (within tolerance)
 
     Raises:
@@ -60,6 +781,11 @@ def validate_tpm_stochastic(TPM: np.ndarray, tol: float = 1e-8) -> None:
     if n != n2:
         raise ValueError(f"TPM must be square in the first two dimensions. Got {n}x{n2}")
 
+    # NaN compares false against every bound below, so reject non-finite entries first
+    if not np.isfinite(TPM).all():
+        idx = tuple(int(k) for k in np.argwhere(~np.isfinite(TPM))[0])
+        raise ValueError(f"TPM contains a non-finite value at index {idx}")
+
     # Check non-negativity
     if np.any(TPM < 0):
         idx = np.unravel_index(np.argmin(TPM), TPM.shape)
@@ -68,10 +794,10 @@ def validate_tpm_stochastic(TPM: np.ndarray, tol: float = 1e-8) -> None:
     # Check row sums for each state i and action a
     row_sums = TPM.sum(axis=1)  # shape (n, A)
 
-    for i in range(n):
-        for a in range(A):
-            if abs(row_sums[i, a] - 1.0) > tol:
-                raise ValueError(
-                    f"TPM row for state {i}, action {a} must sum to 1. "
-                    f"Got {row_sums[i, a]}"
-                )
+    bad = np.argwhere(np.abs(row_sums - 1.0) > tol)
+    if bad.size:
+        i, a = bad[0]
+        raise ValueError(
+            f"TPM row for state {i}, action {a} must sum to 1. "
+            f"Got {row_sums[i, a]}"
+        )
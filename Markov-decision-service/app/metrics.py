@@ -0,0 +1,56 @@
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 3600.0)
+ITERATION_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+REQUEST_SECONDS = Histogram(
+    "mdp_request_seconds", "End-to-end request latency", ["endpoint"], buckets=LATENCY_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "mdp_request_stage_seconds",
+    "Latency of one request-processing stage (parse, convert, validate_tpm, solve, serialize)",
+    ["endpoint", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+SOLVE_ITERATIONS = Histogram(
+    "mdp_solve_iterations", "Iterations per solve", ["endpoint", "method"], buckets=ITERATION_BUCKETS
+)
+SOLVES = Counter(
+    "mdp_solves", "Finished solves; converged/total is the convergence rate", ["endpoint", "method", "converged"]
+)
+
+
+class StageTimer:
+    """
+    Times the stages of one request into mdp_request_stage_seconds and keeps
+    the per-stage durations for the response and the Server-Timing header.
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        STAGE_SECONDS.labels(self.endpoint, name).observe(seconds)
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.timings.items())
+
+
+def observe_solution(endpoint: str, method: str, solution) -> None:
+    """Record the iteration count and convergence of a finished (not cached) solve."""
+    SOLVE_ITERATIONS.labels(endpoint, method).observe(int(solution.iterations))
+    SOLVES.labels(endpoint, method, "true" if solution.converged else "false").inc()
@@ -0,0 +1,269 @@
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from app.blocked_mdp import BlockedMDP, model_path
+from app.solution_cache import solution_key
+from app.sparse_mdp import SparseMDP
+
+# Models whose TPM has at most this fraction of non-zero entries are stored as a
+# SparseMDP (24 bytes per transition instead of 16 bytes per dense entry)
+SPARSE_MAX_DENSITY = 0.5
+
+
+def compact_model(TPM: np.ndarray, TRM: np.ndarray):
+    """
+    Compact in-memory form of a validated dense model: a SparseMDP when the
+    TPM is sparse enough, otherwise a BlockedMDP over contiguous float64
+    tensors. Both carry the precomputed expected one-step cost.
+    """
+    if np.count_nonzero(TPM) <= SPARSE_MAX_DENSITY * TPM.size:
+        return SparseMDP.from_dense(TPM, TRM)
+    return BlockedMDP(np.ascontiguousarray(TPM, dtype=float), np.ascontiguousarray(TRM, dtype=float))
+
+
+def model_nbytes(mdp) -> int:
+    """Bytes held in memory by the arrays of a compact model; memory-mapped arrays do not count."""
+    if isinstance(mdp, SparseMDP):
+        arrays = (mdp.indptr, mdp.indices, mdp.probs, mdp.rewards, mdp.expected_cost)
+    else:
+        arrays = (mdp.TPM, mdp.TRM, mdp.expected_cost)
+    return sum(array.nbytes for array in arrays if not isinstance(array, np.memmap))
+
+
+class ModelRegistry:
+    """
+    Thread-safe store of uploaded MDPs, so that a model is transferred and
+    validated once and then solved by id.
+
+    Models are kept in their compact form (see compact_model) in an LRU
+    bounded by max_bytes. When spill_dir is set, least recently used models
+    are written there instead of being dropped and are loaded back on their
+    next use; dense models use the TPM.npy / TRM.npy layout of the model
+    directory and are memory-mapped back as a BlockedMDP, so only their
+    expected cost counts against max_bytes, while sparse models are read
+    back whole from a sparse.npz file. Without spill_dir an evicted model is
+    forgotten and has to be uploaded again.
+
+    Disk reads and writes happen outside the lock; models being written are
+    kept in memory until their files are complete, so they stay available.
+
+    Model ids are content hashes of the tensors, so uploading the same model
+    twice returns the same id.
+    """
+
+    def __init__(self, max_bytes: int = 1024 * 1024 * 1024, spill_dir=None):
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+
+        # model_id -> (bytes, compact model) for the models held in memory
+        self._memory: OrderedDict[str, tuple[int, object]] = OrderedDict()
+        # model_id -> compact model for evicted models whose files are still being written
+        self._spilling: dict[str, object] = {}
+        self._info: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.evictions = 0
+        self.spills = 0
+        self.reloads = 0
+
+    def register(self, TPM: np.ndarray, TRM: np.ndarray) -> dict:
+        """
+        Store a validated dense model and return its info (model_id, n_states,
+        n_actions, storage, bytes, location).
+
+        Raises:
+            ValueError: if the model alone exceeds max_bytes and cannot be spilled.
+        """
+        model_id = solution_key(TPM, TRM)
+        with self._lock:
+            if model_id in self._info:
+                if model_id in self._memory:
+                    self._memory.move_to_end(model_id)
+                return dict(self._info[model_id], location=self._location(model_id))
+
+        mdp = compact_model(TPM, TRM)
+        size = model_nbytes(mdp)
+        if size > self.max_bytes and self.spill_dir is None:
+            raise ValueError(f"Model needs {size} bytes, more than the registry limit of {self.max_bytes}")
+
+        info = {
+            "model_id": model_id,
+            "n_states": mdp.n_states,
+            "n_actions": mdp.n_actions,
+            "storage": "sparse" if isinstance(mdp, SparseMDP) else "dense",
+            "bytes": size,
+        }
+        with self._lock:
+            # A concurrent upload of the same model may have registered it meanwhile
+            if model_id not in self._info:
+                self._info[model_id] = info
+                evicted = self._insert(model_id, mdp, size)
+            else:
+                evicted = []
+            result = dict(self._info[model_id], location=self._location(model_id))
+
+        self._spill_all(evicted)
+        return result
+
+    def get(self, model_id: str):
+        """
+        Return the compact model (SparseMDP or BlockedMDP) stored under model_id,
+        loading it back from the spill directory if it was spilled. Spilled
+        dense models come back memory-mapped.
+
+        Raises:
+            KeyError: if no model is registered under model_id.
+        """
+        with self._lock:
+            if model_id not in self._info:
+                raise KeyError(model_id)
+
+            entry = self._memory.get(model_id)
+            if entry is not None:
+                self._memory.move_to_end(model_id)
+                return entry[1]
+            if model_id in self._spilling:
+                return self._spilling[model_id]
+            storage = self._info[model_id]["storage"]
+
+        try:
+            mdp = self._load(model_id, storage)
+        except FileNotFoundError:
+            # Deleted while it was being read
+            raise KeyError(model_id)
+
+        with self._lock:
+            if model_id not in self._info:
+                raise KeyError(model_id)
+            # Another request may have loaded it meanwhile; keep a single copy
+            entry = self._memory.get(model_id)
+            if entry is not None:
+                self._memory.move_to_end(model_id)
+                return entry[1]
+            self.reloads += 1
+            evicted = self._insert(model_id, mdp, model_nbytes(mdp))
+
+        self._spill_all(evicted)
+        return mdp
+
+    def info(self, model_id: str) -> dict:
+        """
+        Raises:
+            KeyError: if no model is registered under model_id.
+        """
+        with self._lock:
+            return dict(self._info[model_id], location=self._location(model_id))
+
+    def delete(self, model_id: str) -> bool:
+        """Remove a model from memory and disk; returns whether it was registered."""
+        with self._lock:
+            if self._info.pop(model_id, None) is None:
+                return False
+            if model_id in self._memory:
+                self._remove(model_id)
+        if self.spill_dir is not None:
+            shutil.rmtree(model_path(self.spill_dir, model_id), ignore_errors=True)
+        return True
+
+    def clear(self) -> None:
+        for model_id in list(self._info):
+            self.delete(model_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "models": len(self._info),
+                "in_memory": len(self._memory),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "spill_dir": str(self.spill_dir) if self.spill_dir is not None else None,
+                "evictions": self.evictions,
+                "spills": self.spills,
+                "reloads": self.reloads,
+            }
+
+    def _location(self, model_id: str) -> str:
+        entry = self._memory.get(model_id)
+        if entry is None or _is_mapped(entry[1]):
+            return "disk"
+        return "memory"
+
+    def _insert(self, model_id: str, mdp, size: int) -> list[tuple[str, object]]:
+        """
+        Add a model to the LRU and evict down to max_bytes. Returns the evicted
+        models that still have to be written to the spill directory.
+        """
+        self._memory[model_id] = (size, mdp)
+        self._bytes += size
+
+        # The newest model is evicted last, so a model larger than max_bytes goes straight to disk
+        evicted = []
+        while self._bytes > self.max_bytes and self._memory:
+            model = next(iter(self._memory))
+            _, evicted_mdp = self._memory[model]
+            if self.spill_dir is None:
+                del self._info[model]
+            elif not _is_mapped(evicted_mdp):
+                self._spilling[model] = evicted_mdp
+                evicted.append((model, evicted_mdp))
+            self._remove(model)
+            self.evictions += 1
+        return evicted
+
+    def _remove(self, model_id: str) -> None:
+        size, _ = self._memory.pop(model_id)
+        self._bytes -= size
+
+    def _spill_all(self, evicted: list[tuple[str, object]]) -> None:
+        for model_id, mdp in evicted:
+            try:
+                self._spill(model_id, mdp)
+            finally:
+                with self._lock:
+                    self._spilling.pop(model_id, None)
+                    deleted = model_id not in self._info
+            if deleted:
+                shutil.rmtree(model_path(self.spill_dir, model_id), ignore_errors=True)
+
+    def _spill(self, model_id: str, mdp) -> None:
+        directory = model_path(self.spill_dir, model_id)
+        # Models are immutable, so a copy written by an earlier spill is still valid
+        if directory.exists():
+            return
+
+        # Written under a temporary name and renamed, so a reader never sees a partial model
+        partial = directory.with_name(f"{directory.name}.{threading.get_ident()}.partial")
+        partial.mkdir(parents=True)
+        if isinstance(mdp, SparseMDP):
+            np.savez(
+                partial / "sparse.npz", shape=np.array([mdp.n_states, mdp.n_actions]),
+                indptr=mdp.indptr, indices=mdp.indices, probs=mdp.probs, rewards=mdp.rewards,
+            )
+        else:
+            np.save(partial / "TPM.npy", mdp.TPM)
+            np.save(partial / "TRM.npy", mdp.TRM)
+        try:
+            partial.rename(directory)
+        except OSError:
+            # Another thread finished spilling the same model first
+            shutil.rmtree(partial, ignore_errors=True)
+            return
+        with self._lock:
+            self.spills += 1
+
+    def _load(self, model_id: str, storage: str):
+        directory = model_path(self.spill_dir, model_id)
+        if storage == "sparse":
+            with np.load(directory / "sparse.npz") as data:
+                n, A = data["shape"]
+                return SparseMDP(n, A, data["indptr"], data["indices"], data["probs"], data["rewards"])
+        # Mapped read-only, so solves stream the tensors from disk instead of reading them into memory
+        return BlockedMDP.load(directory)
+
+
+def _is_mapped(mdp) -> bool:
+    return isinstance(mdp, BlockedMDP) and isinstance(mdp.TPM, np.memmap)
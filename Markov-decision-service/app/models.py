@@ -1,80 +1,365 @@
-from pydantic import BaseModel, Field, model_validator
-from typing import List, Literal
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+from typing import Dict, List, Literal, Optional
+import time
+import numpy as np
 
+from app.markov_decisions import validate_tpm_stochastic
+from app.sparse_mdp import SparseMDP
+from app.blocked_mdp import MODEL_ID_PATTERN
 
-class MDPRelativeValueIterationRequest(BaseModel):
-    TPM: List[List[List[float]]]
-    TRM: List[List[List[float]]]
-    s_ref: int = Field(..., description="Reference state index (0 ≤ s_ref < n)")
+# The sparse solver keeps a few n x A arrays (row offsets, Q, expected cost) regardless of nnz
+SPARSE_MAX_STATE_ACTIONS = 10_000_000
+
+# Models per batch request, bounding what one request stacks into memory and solves
+BATCH_MAX_MODELS = 1000
+
+
+class MDPSolverParams(BaseModel):
+    """
+    Solver parameters shared by every average-reward request, whatever form
+    the model is sent in.
+    """
+    s_ref: int = Field(..., ge=0, description="Reference state index (0 ≤ s_ref < n)")
     epsilon: float = Field(..., gt=1e-12, description="Convergence tolerance (must be > 1e-12)")
     mode: Literal["cost", "reward"] = "cost"
+    max_iterations: Optional[int] = Field(None, gt=0, description="Iteration budget (solver default when omitted)")
+    max_time: Optional[float] = Field(None, gt=0, le=3600, description="Wall-clock budget in seconds (solver default when omitted)")
+    stopping: Literal["max_abs", "span"] = Field(
+        "max_abs",
+        description="Stop on max|h_new - h| < epsilon, or on span(h_new - h) < epsilon which "
+                    "guarantees g_upper - g_lower < epsilon (ignored by policy iteration)"
+    )
+
+
+class MDPMethodParams(BaseModel):
+    """
+    Choice of average-reward solver and its tuning, for the endpoints that
+    take a dense model.
+    """
+    method: Literal["rvi", "gauss_seidel", "modified_policy_iteration", "aperiodic_rvi", "policy_iteration"] = Field(
+        "rvi", description="Solver used for the average-reward problem"
+    )
+    evaluation_sweeps: int = Field(
+        5, ge=0, description="Partial evaluation sweeps per iteration (modified_policy_iteration only)"
+    )
+    tau: float = Field(
+        0.5, gt=0, lt=1, description="Aperiodicity transform weight, 0 < tau < 1 (aperiodic_rvi only)"
+    )
+    workers: int = Field(
+        1, ge=1, le=64, description="Threads sharing each Bellman sweep, capped at the server's CPU count (rvi only)"
+    )
+    policy_window: Optional[int] = Field(
+        None, ge=1, description="Solve the evaluation equations of the greedy policy once it has been unchanged "
+                                "for this many sweeps, instead of sweeping to the tolerance (rvi only)"
+    )
+
+
+class MDPAverageRewardRequest(MDPSolverParams):
+    TPM: List[List[List[float]]]
+    TRM: List[List[List[float]]]
+    h0: Optional[List[float]] = Field(None, description="Initial bias vector for a warm start (length n)")
+    pi0: Optional[List[int]] = Field(None, description="Initial policy for a warm start (length n, 0 ≤ action < A)")
+
+    _TPM: np.ndarray = PrivateAttr()
+    _TRM: np.ndarray = PrivateAttr()
+    _timings: Dict[str, float] = PrivateAttr(default_factory=dict)
 
     @model_validator(mode="after")
     def validate_dimensions_and_indices(self):
-        tpm = self.TPM
-        trm = self.TRM
-
         # --- Basic structural validation ---
-        if len(tpm) == 0:
+        if len(self.TPM) == 0:
             raise ValueError("TPM must have at least one state")
 
-        n = len(tpm)
+        n = len(self.TPM)
 
         # Validate s_ref bounds
         if not (0 <= self.s_ref < n):
             raise ValueError(f"s_ref must be between 0 and {n-1}, got {self.s_ref}")
 
-        # Validate TPM and TRM shapes (n, n, A)
-        for name, tensor in [("TPM", tpm), ("TRM", trm)]:
-            if len(tensor) != n:
-                raise ValueError(f"{name} must have shape (n, n, A) with n={n}")
-
-            for row in tensor:
-                if len(row) != n:
-                    raise ValueError(f"{name} must have shape (n, n, A) with n={n}")
-
-        # Determine number of actions A
-        A = len(tpm[0][0])
-
-        # Validate consistent action dimension across TPM
-        for i in range(n):
-            for j in range(n):
-                if len(tpm[i][j]) != A:
-                    raise ValueError(
-                        f"TPM has inconsistent action dimension at (i={i}, j={j}). "
-                        f"Expected A={A}, got {len(tpm[i][j])}"
-                    )
-
-        # Validate TRM matches TPM action dimension
-        for i in range(n):
-            for j in range(n):
-                if len(trm[i][j]) != A:
-                    raise ValueError(
-                        f"TRM must have the same action dimension A={A} as TPM. "
-                        f"Mismatch at (i={i}, j={j})"
-                    )
-
-        # --- Validate TPM stochasticity and non-negativity ---
-        for i in range(n):
-            for a in range(A):
-                row = [tpm[i][j][a] for j in range(n)]
-
-                # Non-negativity
-                if any(p < 0 for p in row):
-                    raise ValueError(
-                        f"TPM contains negative probability at state {i}, action {a}. "
-                        f"Row: {row}"
-                    )
-
-                # Row must sum to 1
-                row_sum = sum(row)
-                if abs(row_sum - 1.0) > 1e-8:
-                    raise ValueError(
-                        f"TPM row for state {i}, action {a} must sum to 1. Got {row_sum}"
-                    )
+        # Convert once to (n, n, A) arrays; the solver reuses these instead of the nested lists
+        started = time.perf_counter()
+        tpm = _as_tensor("TPM", self.TPM, n)
+        trm = _as_tensor("TRM", self.TRM, n)
+        converted = time.perf_counter()
+
+        validate_model_tensors(tpm, trm)
+        self._timings = {"convert": converted - started, "validate_tpm": time.perf_counter() - converted}
+
+        # --- Validate warm start ---
+        if self.h0 is not None and len(self.h0) != n:
+            raise ValueError(f"h0 must have length n={n}, got {len(self.h0)}")
+
+        if self.pi0 is not None:
+            if len(self.pi0) != n:
+                raise ValueError(f"pi0 must have length n={n}, got {len(self.pi0)}")
+            if any(a < 0 or a >= tpm.shape[2] for a in self.pi0):
+                raise ValueError(f"pi0 actions must be between 0 and {tpm.shape[2]-1}")
+
+        self._TPM = tpm
+        self._TRM = trm
+
+        return self
+
+    @property
+    def tensors(self) -> tuple[np.ndarray, np.ndarray]:
+        """The validated (TPM, TRM) arrays of shape (n, n, A)."""
+        return self._TPM, self._TRM
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Seconds spent converting the nested lists and validating the TPM."""
+        return self._timings
+
+
+class MDPRelativeValueIterationRequest(MDPAverageRewardRequest, MDPMethodParams):
+    include_timings: bool = Field(False, description="Return per-stage latencies in the response")
+
+
+class MDPStreamingRelativeValueIterationRequest(MDPRelativeValueIterationRequest):
+    progress_interval: float = Field(
+        0.25, ge=0, le=60, description="Minimum seconds between progress events (0 reports every iteration)"
+    )
+
+
+class MDPPolicyIterationRequest(MDPAverageRewardRequest):
+    """
+    Policy iteration takes the same dense model as relative value iteration;
+    epsilon is the improvement tolerance below which the current action is kept.
+    """
+
+
+class MDPBinaryRelativeValueIterationParams(MDPSolverParams, MDPMethodParams):
+    """
+    Solver parameters of the binary RVI endpoint, passed as query parameters;
+    the request body carries the TPM and TRM as back-to-back `.npy` arrays.
+    """
+
+
+class MDPDiscountedRequest(BaseModel):
+    TPM: List[List[List[float]]]
+    TRM: List[List[List[float]]]
+    discount: float = Field(..., gt=0, lt=1, description="Discount factor per step, 0 < discount < 1")
+    epsilon: float = Field(..., gt=1e-12, description="Stop once the bounds on v* are closer than epsilon")
+    mode: Literal["cost", "reward"] = "cost"
+    v0: Optional[List[float]] = Field(None, description="Initial value vector for a warm start (length n)")
+    max_iterations: Optional[int] = Field(None, gt=0, description="Iteration budget (solver default when omitted)")
+    max_time: Optional[float] = Field(None, gt=0, le=3600, description="Wall-clock budget in seconds (solver default when omitted)")
+
+    _TPM: np.ndarray = PrivateAttr()
+    _TRM: np.ndarray = PrivateAttr()
+
+    @model_validator(mode="after")
+    def validate_model(self):
+        self._TPM, self._TRM = _as_model(self.TPM, self.TRM)
+
+        n = len(self.TPM)
+        if self.v0 is not None and len(self.v0) != n:
+            raise ValueError(f"v0 must have length n={n}, got {len(self.v0)}")
+
+        return self
+
+    @property
+    def tensors(self) -> tuple[np.ndarray, np.ndarray]:
+        """The validated (TPM, TRM) arrays of shape (n, n, A)."""
+        return self._TPM, self._TRM
+
+
+class MDPDiscountedResponse(BaseModel):
+    v: List[float] = Field(description="Midpoint of the bounds on the optimal discounted cost")
+    pi_star: List[int]
+    iterations: int
+    converged: bool
+    v_lower: List[float] = Field(description="Per-state lower bound on the optimal discounted cost")
+    v_upper: List[float] = Field(description="Per-state upper bound on the optimal discounted cost")
+
+
+class MDPFiniteHorizonRequest(BaseModel):
+    """
+    Finite-horizon model with stationary TPM/TRM. The response streams one
+    stage per line from stage horizon - 1 down to 0.
+    """
+    TPM: List[List[List[float]]]
+    TRM: List[List[List[float]]]
+    horizon: int = Field(..., gt=0, le=10_000_000, description="Number of decision epochs T")
+    mode: Literal["cost", "reward"] = "cost"
+    terminal_cost: Optional[List[float]] = Field(None, description="Cost-to-go after the last epoch (length n, zeros when omitted)")
+    include_values: bool = Field(True, description="Include the cost-to-go vector v in every streamed stage")
+
+    _TPM: np.ndarray = PrivateAttr()
+    _TRM: np.ndarray = PrivateAttr()
+
+    @model_validator(mode="after")
+    def validate_model(self):
+        self._TPM, self._TRM = _as_model(self.TPM, self.TRM)
+
+        n = len(self.TPM)
+        if self.terminal_cost is not None and len(self.terminal_cost) != n:
+            raise ValueError(f"terminal_cost must have length n={n}, got {len(self.terminal_cost)}")
 
         return self
 
+    @property
+    def tensors(self) -> tuple[np.ndarray, np.ndarray]:
+        """The validated (TPM, TRM) arrays of shape (n, n, A)."""
+        return self._TPM, self._TRM
+
+
+def _as_model(TPM: List[List[List[float]]], TRM: List[List[List[float]]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert a dense model to (n, n, A) TPM and TRM arrays and validate that the
+    TPM is stochastic and the TRM has the same shape.
+    """
+    if len(TPM) == 0:
+        raise ValueError("TPM must have at least one state")
+
+    n = len(TPM)
+    tpm = _as_tensor("TPM", TPM, n)
+    trm = _as_tensor("TRM", TRM, n)
+
+    validate_model_tensors(tpm, trm)
+
+    return tpm, trm
+
+
+def validate_model_tensors(tpm: np.ndarray, trm: np.ndarray, tol: float = 1e-8) -> None:
+    """
+    Validate dense TPM and TRM arrays: the TPM is a stochastic (n, n, A)
+    kernel with at least one action, its rows summing to 1 within tol, and
+    the TRM has the same shape and only finite rewards.
+
+    Raises:
+        ValueError: if any validation rule is violated.
+    """
+    if tpm.ndim != 3 or tpm.shape[0] == 0:
+        raise ValueError(f"TPM must have shape (n, n, A) with at least one state. Got shape {tpm.shape}")
+
+    if tpm.shape[2] == 0:
+        raise ValueError("TPM must have at least one action")
+
+    if trm.shape != tpm.shape:
+        raise ValueError(f"TRM must have the same shape {tpm.shape} as TPM. Got shape {trm.shape}")
+
+    if not np.isfinite(trm).all():
+        idx = tuple(int(k) for k in np.argwhere(~np.isfinite(trm))[0])
+        raise ValueError(f"TRM contains a non-finite value at index {idx}")
+
+    # --- Validate TPM stochasticity and non-negativity ---
+    validate_tpm_stochastic(tpm, tol)
+
+
+def _as_tensor(name: str, tensor: List[List[List[float]]], n: int) -> np.ndarray:
+    """
+    Convert a nested list to an (n, n, A) float array, rejecting ragged input.
+    """
+    try:
+        array = np.array(tensor, dtype=float)
+    except ValueError:
+        raise ValueError(f"{name} must have shape (n, n, A) with n={n} and a consistent action dimension")
+
+    if array.ndim != 3 or array.shape[:2] != (n, n):
+        raise ValueError(f"{name} must have shape (n, n, A) with n={n}. Got shape {array.shape}")
+
+    return array
+
+
+class MDPSparseRelativeValueIterationRequest(MDPSolverParams):
+    """
+    Sparse (COO) form of an MDP: entry k describes the transition
+    state[k] -> next_state[k] under action[k] with probability prob[k] and
+    reward reward[k]. Transitions that are not listed have probability 0.
+    """
+    n_states: int = Field(..., gt=0, description="Number of states n")
+    n_actions: int = Field(..., gt=0, description="Number of actions A")
+    state: List[int]
+    next_state: List[int]
+    action: List[int]
+    prob: List[float]
+    reward: List[float]
+    h0: Optional[List[float]] = Field(None, description="Initial bias vector for a warm start (length n)")
+
+    _mdp: SparseMDP = PrivateAttr()
+
+    @model_validator(mode="after")
+    def validate_transitions(self):
+        if self.n_states * self.n_actions > SPARSE_MAX_STATE_ACTIONS:
+            raise ValueError(
+                f"n_states * n_actions must be at most {SPARSE_MAX_STATE_ACTIONS}, "
+                f"got {self.n_states} * {self.n_actions}"
+            )
+
+        if not (0 <= self.s_ref < self.n_states):
+            raise ValueError(f"s_ref must be between 0 and {self.n_states-1}, got {self.s_ref}")
+
+        if self.h0 is not None and len(self.h0) != self.n_states:
+            raise ValueError(f"h0 must have length n={self.n_states}, got {len(self.h0)}")
+
+        mdp = SparseMDP.from_coo(
+            self.n_states, self.n_actions,
+            self.state, self.next_state, self.action, self.prob, self.reward
+        )
+        mdp.validate_stochastic()
+        self._mdp = mdp
+
+        return self
+
+    @property
+    def mdp(self) -> SparseMDP:
+        """The validated SparseMDP built from the request arrays."""
+        return self._mdp
+
+
+class MDPMappedRelativeValueIterationRequest(MDPSolverParams):
+    """
+    RVI on a model stored as TPM.npy / TRM.npy under <model directory>/<model_id>.
+    The tensors are memory-mapped and swept block_size states at a time.
+    """
+    model_id: str = Field(..., pattern=MODEL_ID_PATTERN.pattern, description="Name of the model's subdirectory")
+    h0: Optional[List[float]] = Field(None, description="Initial bias vector for a warm start (length n)")
+    block_size: int = Field(256, ge=1, description="States per block of the Bellman update")
+    workers: int = Field(1, ge=1, le=64, description="Threads computing blocks concurrently, capped at the server's CPU count")
+
+
+class MDPModelUploadRequest(BaseModel):
+    """
+    Dense model stored in the model registry, validated once at upload and
+    then solved by id.
+    """
+    TPM: List[List[List[float]]]
+    TRM: List[List[List[float]]]
+
+    _TPM: np.ndarray = PrivateAttr()
+    _TRM: np.ndarray = PrivateAttr()
+
+    @model_validator(mode="after")
+    def validate_model(self):
+        self._TPM, self._TRM = _as_model(self.TPM, self.TRM)
+        return self
+
+    @property
+    def tensors(self) -> tuple[np.ndarray, np.ndarray]:
+        """The validated (TPM, TRM) arrays of shape (n, n, A)."""
+        return self._TPM, self._TRM
+
+
+class MDPModelInfoResponse(BaseModel):
+    model_id: str = Field(description="Content hash of the model, used to refer to it in solve requests")
+    n_states: int
+    n_actions: int
+    storage: Literal["dense", "sparse"] = Field(description="Compact form the model is kept in")
+    bytes: int = Field(description="Memory held by the model in its compact form")
+    location: Literal["memory", "disk"] = Field(description="Whether the model is in memory or spilled to disk (a memory-mapped spilled model counts as disk)")
+
+
+class MDPRegisteredRelativeValueIterationRequest(MDPSolverParams):
+    """
+    RVI on a model from the registry; the model is referenced by the id
+    returned at upload, so only the solver parameters are sent.
+    """
+    h0: Optional[List[float]] = Field(None, description="Initial bias vector for a warm start (length n)")
+    workers: int = Field(
+        1, ge=1, le=64, description="Threads sharing each Bellman sweep, capped at the server's CPU count (dense models only)"
+    )
+
 
 class MDPRelativeValueIterationResponse(BaseModel):
     h: List[float]
@@ -82,3 +367,55 @@ class MDPRelativeValueIterationResponse(BaseModel):
     pi_star: List[int]
     iterations: int
     converged: bool
+    g_lower: float = Field(description="Lower bound on the optimal gain from the last sweep")
+    g_upper: float = Field(description="Upper bound on the optimal gain from the last sweep")
+    policy_stable_iteration: Optional[int] = Field(
+        None, description="Sweep from which the greedy policy stayed unchanged, when the solve ended on its evaluation; null otherwise"
+    )
+    time_saved: Optional[float] = Field(
+        None, description="Estimated seconds saved by evaluating the stable policy instead of sweeping to the tolerance; null otherwise"
+    )
+
+
+class MDPTimedRelativeValueIterationResponse(MDPRelativeValueIterationResponse):
+    timings: Optional[Dict[str, float]] = Field(
+        None,
+        description=(
+            "Seconds per stage (parse, convert, validate_tpm, solve) when requested; serialize runs "
+            "while this body is encoded, so it is only reported in the Server-Timing header"
+        ),
+    )
+
+
+class MDPBatchRelativeValueIterationRequest(BaseModel):
+    """
+    Many independent average-reward models solved in one request. Models with
+    the same (n, A) shape are stacked and solved together in one vectorized loop.
+    """
+    models: List[MDPAverageRewardRequest] = Field(
+        ..., min_length=1, max_length=BATCH_MAX_MODELS, description=f"Models to solve (at most {BATCH_MAX_MODELS})"
+    )
+
+
+class MDPBatchRelativeValueIterationResponse(BaseModel):
+    results: List[MDPRelativeValueIterationResponse]
+
+
+class MDPJobProgress(BaseModel):
+    iteration: int
+    g: float
+    delta: float = Field(description="max |h_new - h| of the latest sweep")
+    span: float = Field(description="max(h_new - h) - min(h_new - h) of the latest sweep")
+    elapsed: float = Field(description="Seconds since the solve started")
+
+
+class MDPJobResult(MDPRelativeValueIterationResponse):
+    elapsed: float
+
+
+class MDPJobStatusResponse(BaseModel):
+    job_id: str
+    state: Literal["pending", "running", "completed", "cancelled", "failed"]
+    progress: Optional[MDPJobProgress] = None
+    result: Optional[MDPJobResult] = None
+    error: Optional[str] = None
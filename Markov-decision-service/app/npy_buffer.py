@@ -0,0 +1,71 @@
+import ast
+
+import numpy as np
+
+NPY_MAGIC = b"\x93NUMPY"
+
+
+def read_npy(buffer, offset: int = 0) -> tuple[np.ndarray, int]:
+    """
+    Read one `.npy` array stored in buffer at offset without copying its data.
+
+    The returned array is a read-only np.frombuffer view into buffer, so it
+    stays valid only as long as buffer does. Returns the array and the offset
+    just past its data, where the next array (if any) starts.
+
+    Raises:
+        ValueError: if the bytes are not a valid `.npy` array of a numeric dtype.
+    """
+    view = memoryview(buffer)
+    if bytes(view[offset:offset + 6]) != NPY_MAGIC:
+        raise ValueError(f"Expected a .npy array at byte {offset}")
+
+    major = view[offset + 6]
+    if major == 1:
+        header_size, length_bytes = 2, int.from_bytes(view[offset + 8:offset + 10], "little")
+    elif major in (2, 3):
+        header_size, length_bytes = 4, int.from_bytes(view[offset + 8:offset + 12], "little")
+    else:
+        raise ValueError(f"Unsupported .npy format version {major}")
+
+    start = offset + 8 + header_size
+    try:
+        header = ast.literal_eval(bytes(view[start:start + length_bytes]).decode("latin1"))
+        dtype = np.lib.format.descr_to_dtype(header["descr"])
+        shape = tuple(int(d) for d in header["shape"])
+        fortran_order = bool(header["fortran_order"])
+    except (ValueError, SyntaxError, KeyError, TypeError):
+        raise ValueError(f"Malformed .npy header at byte {offset}")
+
+    if dtype.kind not in "biuf":
+        raise ValueError(f".npy arrays must have a numeric dtype, got {dtype}")
+
+    data_start = start + length_bytes
+    count = int(np.prod(shape))
+    data_end = data_start + count * dtype.itemsize
+    if data_end > len(view):
+        raise ValueError(f".npy array at byte {offset} is truncated")
+
+    array = np.frombuffer(buffer, dtype=dtype, count=count, offset=data_start)
+    array = array.reshape(shape, order="F" if fortran_order else "C")
+    return array, data_end
+
+
+def read_npy_arrays(buffer, count: int) -> list[np.ndarray]:
+    """
+    Read exactly count `.npy` arrays written back to back into buffer
+    (e.g. np.save(f, TPM); np.save(f, TRM)).
+
+    Raises:
+        ValueError: if an array is malformed or bytes remain after the last one.
+    """
+    arrays = []
+    offset = 0
+    for _ in range(count):
+        array, offset = read_npy(buffer, offset)
+        arrays.append(array)
+
+    if offset != len(buffer):
+        raise ValueError(f"Expected {count} .npy arrays, found {len(buffer) - offset} trailing bytes")
+
+    return arrays
@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def solution_key(*arrays: np.ndarray, **params) -> str:
+    """
+    Content hash of the model tensors and solver parameters.
+
+    Arrays are normalized to contiguous float64/int64 buffers and hashed
+    together with their shapes, so byte-identical models map to the same key
+    regardless of how they were submitted.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    for array in arrays:
+        array = np.asarray(array)
+        array = np.ascontiguousarray(array, dtype=np.int64 if array.dtype.kind in "iub" else np.float64)
+        digest.update(repr(array.shape).encode())
+        digest.update(array.tobytes())
+    for name in sorted(params):
+        value = params[name]
+        if value is not None and not isinstance(value, (str, int, float, bool)):
+            value = np.asarray(value).tolist()
+        digest.update(f"{name}={value!r};".encode())
+    return digest.hexdigest()
+
+
+class SolutionCache:
+    """
+    Thread-safe LRU cache of MDP solutions bounded by entry count, total
+    array memory and entry age.
+
+    Values are tuples whose NumPy arrays are counted towards max_bytes.
+    Entries older than ttl_seconds are treated as misses and dropped.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: OrderedDict[str, tuple[float, int, tuple]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: str, value: tuple) -> None:
+        """Store value under key, evicting least recently used entries to stay within bounds."""
+        size = sum(v.nbytes for v in value if isinstance(v, np.ndarray))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic(), size, value)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
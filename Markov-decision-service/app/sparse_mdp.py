@@ -0,0 +1,164 @@
+import numpy as np
+
+
+class SparseMDP:
+    """
+    Sparse storage of an MDP's transition probabilities and transition rewards.
+
+    Transitions are kept as one CSR (compressed sparse row) block per action,
+    stacked action-major into a single set of arrays so that a Bellman sweep is
+    one vectorized pass over the stored entries. Row r = a * n + i holds the
+    successors of state i under action a at positions indptr[r]:indptr[r + 1]
+    of `indices` (next states), `probs` and `rewards`.
+
+    Memory and per-sweep cost are O(nnz) instead of the O(n^2 A) of the dense
+    (n, n, A) TPM/TRM tensors.
+    """
+
+    def __init__(self, n_states: int, n_actions: int, indptr, indices, probs, rewards):
+        self.n_states = int(n_states)
+        self.n_actions = int(n_actions)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.probs = np.asarray(probs, dtype=float)
+        self.rewards = np.asarray(rewards, dtype=float)
+
+        n_rows = self.n_states * self.n_actions
+        if self.indptr.shape != (n_rows + 1,):
+            raise ValueError(
+                f"indptr must have length n_states * n_actions + 1 = {n_rows + 1}. "
+                f"Got {self.indptr.shape[0]}"
+            )
+        nnz = self.indptr[-1]
+        if not (self.indices.shape == self.probs.shape == self.rewards.shape == (nnz,)):
+            raise ValueError(f"indices, probs and rewards must all have length nnz={nnz}")
+
+        # reduceat cannot express empty rows; they are zeroed afterwards
+        self._empty_rows = self.indptr[:-1] == self.indptr[1:]
+
+        # Expected one-step cost sum_j P(i, j, a) * R(i, j, a) is constant across sweeps
+        self.expected_cost = self._row_sum(self.probs * self.rewards)
+
+    @classmethod
+    def from_dense(cls, TPM: np.ndarray, TRM: np.ndarray) -> "SparseMDP":
+        """
+        Build a SparseMDP from dense (n, n, A) TPM and TRM tensors, keeping only
+        the transitions with non-zero probability.
+        """
+        TPM = np.asarray(TPM, dtype=float)
+        TRM = np.asarray(TRM, dtype=float)
+        n, _, A = TPM.shape
+
+        # (A, n, n) ordering makes np.nonzero return entries in (action, state, next_state) order
+        P = TPM.transpose(2, 0, 1)
+        a, i, j = np.nonzero(P)
+        counts = np.bincount(a * n + i, minlength=n * A)
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+
+        return cls(n, A, indptr, j, P[a, i, j], TRM.transpose(2, 0, 1)[a, i, j])
+
+    @classmethod
+    def from_coo(cls, n_states: int, n_actions: int, state, next_state, action, prob, reward) -> "SparseMDP":
+        """
+        Build a SparseMDP from coordinate (COO) arrays, one entry per
+        (state, next_state, action) transition with its probability and reward.
+
+        Raises:
+            ValueError: if the arrays differ in length, an index is out of range,
+            a probability or reward is NaN or infinite, or the same transition
+            is listed more than once.
+        """
+        state = np.asarray(state, dtype=np.int64)
+        next_state = np.asarray(next_state, dtype=np.int64)
+        action = np.asarray(action, dtype=np.int64)
+        prob = np.asarray(prob, dtype=float)
+        reward = np.asarray(reward, dtype=float)
+
+        nnz = state.shape[0]
+        for name, values in [("next_state", next_state), ("action", action), ("prob", prob), ("reward", reward)]:
+            if values.shape != (nnz,):
+                raise ValueError(f"{name} must have the same length as state ({nnz}). Got {values.shape[0]}")
+
+        for name, values, bound in [("state", state, n_states), ("next_state", next_state, n_states), ("action", action, n_actions)]:
+            if np.any((values < 0) | (values >= bound)):
+                raise ValueError(f"{name} indices must be between 0 and {bound - 1}")
+
+        for name, values in [("prob", prob), ("reward", reward)]:
+            if not np.isfinite(values).all():
+                k = int(np.argmin(np.isfinite(values)))
+                raise ValueError(f"{name} contains a non-finite value at entry {k}")
+
+        rows = action * n_states + state
+        order = np.lexsort((next_state, rows))
+        rows, next_state = rows[order], next_state[order]
+
+        duplicate = np.flatnonzero((rows[1:] == rows[:-1]) & (next_state[1:] == next_state[:-1]))
+        if duplicate.size:
+            a, i = divmod(int(rows[duplicate[0]]), n_states)
+            raise ValueError(
+                f"Transition (state={i}, next_state={next_state[duplicate[0]]}, action={a}) is listed more than once"
+            )
+
+        counts = np.bincount(rows, minlength=n_states * n_actions)
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+
+        return cls(n_states, n_actions, indptr, next_state, prob[order], reward[order])
+
+    def negated(self) -> "SparseMDP":
+        """
+        Return the same model with rewards negated, used to turn rewards into costs.
+        """
+        return SparseMDP(self.n_states, self.n_actions, self.indptr, self.indices, self.probs, -self.rewards)
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indptr[-1])
+
+    def to_dense(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Expand back into dense (n, n, A) TPM and TRM tensors.
+        """
+        n, A = self.n_states, self.n_actions
+        rows = np.repeat(np.arange(n * A), np.diff(self.indptr))
+        a, i = np.divmod(rows, n)
+
+        TPM = np.zeros((n, n, A))
+        TRM = np.zeros((n, n, A))
+        TPM[i, self.indices, a] = self.probs
+        TRM[i, self.indices, a] = self.rewards
+        return TPM, TRM
+
+    def validate_stochastic(self, tol: float = 1e-8) -> None:
+        """
+        Validate that every (state, action) row is a probability distribution.
+
+        Raises:
+            ValueError: if a probability is negative or a row does not sum to 1.
+        """
+        if np.any((self.indices < 0) | (self.indices >= self.n_states)):
+            raise ValueError(f"Next-state indices must be between 0 and {self.n_states - 1}")
+
+        if np.any(self.probs < 0):
+            k = int(np.argmin(self.probs))
+            raise ValueError(f"TPM contains negative probability at entry {k}")
+
+        row_sums = self._row_sum(self.probs)
+        bad = np.argwhere(np.abs(row_sums - 1.0) > tol)
+        if bad.size:
+            i, a = bad[0]
+            raise ValueError(
+                f"TPM row for state {i}, action {a} must sum to 1. Got {row_sums[i, a]}"
+            )
+
+    def bellman_q(self, h: np.ndarray) -> np.ndarray:
+        """
+        Q(i, a) = sum_j P(i, j, a) * (R(i, j, a) + h(j)), shape (n, A).
+        """
+        return self.expected_cost + self._row_sum(self.probs * h[self.indices])
+
+    def _row_sum(self, values: np.ndarray) -> np.ndarray:
+        # A trailing zero gives empty rows at the end (start == nnz) a valid
+        # index, so no row start has to be moved into a neighbouring row
+        sums = np.add.reduceat(np.append(values, 0.0), self.indptr[:-1])
+        sums[self._empty_rows] = 0.0
+        return sums.reshape(self.n_actions, self.n_states).T
@@ -0,0 +1,57 @@
+"""
+Benchmark of the dense RVI Bellman update: iterations per second of the
+original full-tensor update versus the precomputed-cost + P·h update.
+
+Run from the service root:
+    python -m benchmarks.bellman_update --states 200 500 1000 --actions 5
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.markov_decisions import bellman_q_dense, expected_immediate_cost
+
+
+def full_tensor_bellman_q(TPM, TRM, h):
+    # Original update: allocates two n x n x A temporaries per sweep
+    R_plus_h = TRM + h[None, :, None]
+    return np.sum(TPM * R_plus_h, axis=1)
+
+
+def iterations_per_second(sweep, n, min_time=1.0):
+    h = np.zeros(n)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        Q = sweep(h)
+        h = Q.min(axis=1)
+        h -= h[0]
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--states", type=int, nargs="+", default=[100, 250, 500, 1000])
+    parser.add_argument("--actions", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to run each kernel")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'n':>6} {'A':>3} {'full tensor it/s':>17} {'P·h it/s':>10} {'speedup':>8}")
+
+    for n in args.states:
+        TPM = rng.random((n, n, args.actions))
+        TPM /= TPM.sum(axis=1, keepdims=True)
+        TRM = rng.random((n, n, args.actions))
+        C = expected_immediate_cost(TPM, TRM)
+
+        before = iterations_per_second(lambda h: full_tensor_bellman_q(TPM, TRM, h), n, args.min_time)
+        after = iterations_per_second(lambda h: bellman_q_dense(TPM, C, h), n, args.min_time)
+        print(f"{n:>6} {args.actions:>3} {before:>17.1f} {after:>10.1f} {after / before:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
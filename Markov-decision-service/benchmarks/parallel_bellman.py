@@ -0,0 +1,62 @@
+"""
+Benchmark of multi-threaded dense RVI sweeps: Bellman sweeps per second with
+the states split across 1, 2, 4 and 8 worker threads, and the speedup over
+one worker. Use it to size pod CPU requests.
+
+NumPy's BLAS may already use several threads per call; set
+OPENBLAS_NUM_THREADS=1 (or MKL_NUM_THREADS=1) to measure the thread pool alone.
+
+Run from the service root:
+    python -m benchmarks.parallel_bellman --states 500 1000 2000 --actions 5
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.blocked_mdp import BlockedMDP
+
+
+def sweeps_per_second(bellman_q, n, min_time=1.0):
+    h = np.zeros(n)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        Q = bellman_q(h)
+        h = Q.min(axis=1)
+        h -= h[0]
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--states", type=int, nargs="+", default=[500, 1000, 2000])
+    parser.add_argument("--actions", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to run each configuration")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"CPUs available: {os.cpu_count()}")
+    print(f"{'n':>6} {'A':>3} {'workers':>8} {'sweeps/s':>10} {'speedup':>8}")
+
+    for n in args.states:
+        TPM = rng.random((n, n, args.actions))
+        TPM /= TPM.sum(axis=1, keepdims=True)
+        TRM = rng.random((n, n, args.actions))
+
+        baseline = None
+        for workers in args.workers:
+            mdp = BlockedMDP(TPM, TRM, block_size=-(-n // workers))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                rate = sweeps_per_second(lambda h: mdp.bellman_q(h, pool if workers > 1 else None), n, args.min_time)
+            baseline = baseline or rate
+            print(f"{n:>6} {args.actions:>3} {workers:>8} {rate:>10.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
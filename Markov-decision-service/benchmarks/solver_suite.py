@@ -0,0 +1,192 @@
+"""
+Reproducible benchmark suite for relative_value_iteration_average_reward.
+
+Generates random dense, random sparse and structured (maintenance chain)
+MDPs over a grid of n, A and density, and records for each case the TPM
+validation time, the solve time, the number of iterations, convergence and
+the peak memory allocated during the solve (via tracemalloc, which tracks
+NumPy buffers). Results are written as JSON together with the environment
+they were measured in.
+
+Two result files can be compared to catch regressions: cases whose solve
+time or peak memory grew by more than --threshold are listed and the
+script exits with status 1.
+
+Run from the service root:
+    python -m benchmarks.solver_suite --output results.json
+    python -m benchmarks.solver_suite --quick --output new.json --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.markov_decisions import relative_value_iteration_average_reward, validate_tpm_stochastic
+
+FULL_GRID = {"states": [50, 200, 500], "actions": [2, 5], "densities": [1.0, 0.05]}
+QUICK_GRID = {"states": [50, 200], "actions": [2], "densities": [1.0, 0.1]}
+
+
+def random_model(n, A, density, rng):
+    """Random costs; each (state, action) row keeps about density * n successors."""
+    TPM = rng.random((n, n, A))
+    if density < 1.0:
+        successors = max(1, int(round(density * n)))
+        # Keep the `successors` largest entries of every row
+        cutoff = -np.partition(-TPM, successors - 1, axis=1)[:, successors - 1:successors, :]
+        TPM[TPM < cutoff] = 0.0
+    TPM /= TPM.sum(axis=1, keepdims=True)
+    return TPM, rng.random((n, n, A))
+
+
+def maintenance_model(n, A, rng):
+    """
+    Degradation chain: action 0 operates (degrades one state with a random
+    probability, cost growing with the state), actions 1..A-1 are repairs of
+    increasing cost and strength that move the system back towards state 0.
+    """
+    TPM = np.zeros((n, n, A))
+    TRM = np.zeros((n, n, A))
+    p = rng.uniform(0.05, 0.3, size=n)
+    states = np.arange(n)
+
+    TPM[states, np.minimum(states + 1, n - 1), 0] += p
+    TPM[states, states, 0] += 1 - p
+    TRM[:, :, 0] = (0.1 * states)[:, None]
+
+    for a in range(1, A):
+        target = states * (A - 1 - a) // A
+        TPM[states, target, a] = 1.0
+        TRM[:, :, a] = 1.0 + a
+    return TPM, TRM
+
+
+def cases(grid, seed):
+    for n in grid["states"]:
+        for A in grid["actions"]:
+            for density in grid["densities"]:
+                rng = np.random.default_rng([seed, n, A, int(density * 1000)])
+                yield f"random-n{n}-A{A}-d{density}", "random", n, A, density, random_model(n, A, density, rng)
+            rng = np.random.default_rng([seed, n, A])
+            yield f"maintenance-n{n}-A{A}", "maintenance", n, A, None, maintenance_model(n, A, rng)
+
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, times
+
+
+def run_case(TPM, TRM, epsilon, repeats):
+    _, validate_times = best_of(lambda: validate_tpm_stochastic(TPM), repeats)
+    solution, solve_times = best_of(
+        lambda: relative_value_iteration_average_reward(
+            TPM, TRM, 0, epsilon, max_iterations=1_000_000, max_time=600.0, validate=False
+        ),
+        repeats,
+    )
+
+    tracemalloc.start()
+    relative_value_iteration_average_reward(TPM, TRM, 0, epsilon, max_iterations=1_000_000, max_time=600.0, validate=False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "validate_seconds": min(validate_times),
+        "solve_seconds": min(solve_times),
+        "solve_seconds_median": statistics.median(solve_times),
+        "iterations": int(solution.iterations),
+        "converged": bool(solution.converged),
+        "g": float(solution.g),
+        "peak_bytes": int(peak),
+        "model_bytes": int(TPM.nbytes + TRM.nbytes),
+    }
+
+
+def environment(args):
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "epsilon": args.epsilon,
+        "repeats": args.repeats,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Print per-case ratios against baseline; return the names of regressed cases."""
+    previous = {result["case"]: result for result in baseline["results"]}
+    regressions = []
+
+    print(f"\n{'case':<28} {'solve x':>8} {'peak x':>8} {'iters':>12}")
+    for result in current["results"]:
+        before = previous.get(result["case"])
+        if before is None:
+            continue
+
+        time_ratio = result["solve_seconds"] / max(before["solve_seconds"], 1e-12)
+        memory_ratio = result["peak_bytes"] / max(before["peak_bytes"], 1)
+        flag = ""
+        if time_ratio > threshold or memory_ratio > threshold:
+            regressions.append(result["case"])
+            flag = "  REGRESSION"
+        print(
+            f"{result['case']:<28} {time_ratio:>7.2f}x {memory_ratio:>7.2f}x "
+            f"{before['iterations']:>5} -> {result['iterations']:<5}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="solver_suite_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Ratio above which a case counts as a regression")
+    parser.add_argument("--quick", action="store_true", help="Run a reduced grid (e.g. for CI)")
+    parser.add_argument("--epsilon", type=float, default=1e-8)
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per case; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    grid = QUICK_GRID if args.quick else FULL_GRID
+    report = {"environment": environment(args), "grid": grid, "results": []}
+
+    print(f"{'case':<28} {'validate s':>10} {'solve s':>10} {'iters':>7} {'peak MiB':>9}")
+    for name, generator, n, A, density, (TPM, TRM) in cases(grid, args.seed):
+        result = {"case": name, "generator": generator, "n": n, "A": A, "density": density}
+        result.update(run_case(TPM, TRM, args.epsilon, args.repeats))
+        report["results"].append(result)
+        print(
+            f"{name:<28} {result['validate_seconds']:>10.4f} {result['solve_seconds']:>10.4f} "
+            f"{result['iterations']:>7} {result['peak_bytes'] / 2**20:>9.2f}"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(report['results'])} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.2f}x")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -81,4 +81,903 @@ class TestKofNSystemAPI:
             "/reliability/kofn",
             json={"component_reliabilities": [0.9, 0.9, 0.9], "min_required": 0}
         )
-        assert response.status_code == 422
\ No newline at end of file
+        assert response.status_code == 422
+
+# Two-state, two-action maintenance MDP: action 0 = operate, action 1 = repair
+MDP_TPM = [
+    [[0.8, 1.0], [0.2, 0.0]],
+    [[0.0, 0.9], [1.0, 0.1]],
+]
+MDP_TRM = [
+    [[1.0, 5.0], [1.0, 5.0]],
+    [[10.0, 5.0], [10.0, 5.0]],
+]
+
+def mdp_to_coo(tpm, trm):
+    coo = {"state": [], "next_state": [], "action": [], "prob": [], "reward": []}
+    for i, row in enumerate(tpm):
+        for j, probs in enumerate(row):
+            for a, p in enumerate(probs):
+                if p > 0:
+                    coo["state"].append(i)
+                    coo["next_state"].append(j)
+                    coo["action"].append(a)
+                    coo["prob"].append(p)
+                    coo["reward"].append(trm[i][j][a])
+    return coo
+
+class TestRelativeValueIterationAPI:
+    """
+    Test suite for the Relative Value Iteration API endpoint.
+    """
+    def test_rvi_api_nominal(self):
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["converged"]
+        assert len(data["h"]) == 2
+
+    def test_rvi_api_parallel_workers(self):
+        serial = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 1, "epsilon": 1e-9}
+        )
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 1, "epsilon": 1e-9, "workers": 2}
+        )
+        assert response.status_code == 200
+        assert response.json() == serial.json()
+
+    def test_rvi_api_span_stopping_bounds(self):
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-6, "stopping": "span"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["converged"]
+        assert data["g_lower"] <= data["g"] <= data["g_upper"]
+        assert data["g_upper"] - data["g_lower"] < 1e-6
+
+    def test_rvi_api_stable_policy_switch(self):
+        plain = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-11}
+        ).json()
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-11, "policy_window": 2}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["converged"]
+        assert data["iterations"] < plain["iterations"]
+        assert abs(data["g"] - plain["g"]) < 1e-9
+        assert data["policy_stable_iteration"] >= 1
+        assert "time_saved" in data
+        assert plain["policy_stable_iteration"] is None
+
+    def test_rvi_api_invalid_policy_window(self):
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9, "policy_window": 0}
+        )
+        assert response.status_code == 422
+
+    def test_rvi_api_iteration_budget(self):
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-11, "max_iterations": 2}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["iterations"] == 2
+        assert not data["converged"]
+
+    def test_rvi_api_non_finite_values(self):
+        import copy
+        import json
+        for key, value in [("TPM", float("nan")), ("TRM", float("inf")), ("TRM", float("nan"))]:
+            body = copy.deepcopy({"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9})
+            body[key][0][1][0] = value
+            response = client.post(
+                "/mdp/relative-value-iteration",
+                content=json.dumps(body),
+                headers={"content-type": "application/json"}
+            )
+            assert response.status_code == 422
+
+    def test_rvi_api_invalid_budget(self):
+        for budget in [{"max_iterations": 0}, {"max_time": -1.0}, {"stopping": "relative"}]:
+            response = client.post(
+                "/mdp/relative-value-iteration",
+                json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9, **budget}
+            )
+            assert response.status_code == 422
+
+    def test_rvi_api_method_selection(self):
+        for method in ["gauss_seidel", "modified_policy_iteration", "aperiodic_rvi", "policy_iteration"]:
+            response = client.post(
+                "/mdp/relative-value-iteration",
+                json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9, "method": method}
+            )
+            assert response.status_code == 200
+            assert response.json()["converged"]
+
+    def test_rvi_api_unknown_method(self):
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9, "method": "simplex"}
+        )
+        assert response.status_code == 422
+
+    def test_rvi_api_warm_start(self):
+        cold = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        ).json()
+        warm = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9, "h0": cold["h"]}
+        )
+        assert warm.status_code == 200
+        assert warm.json()["iterations"] <= 2
+        assert warm.json()["pi_star"] == cold["pi_star"]
+
+    def test_rvi_api_warm_start_wrong_length(self):
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9, "pi0": [0, 1, 0]}
+        )
+        assert response.status_code == 422
+
+    def test_rvi_api_warm_start_invalid_action(self):
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9, "pi0": [0, 2]}
+        )
+        assert response.status_code == 422
+
+    def test_rvi_api_ragged_action_dimension(self):
+        tpm = [[[0.8, 1.0], [0.2]], [[0.0, 0.9], [1.0, 0.1]]]
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": tpm, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 422
+
+    def test_rvi_api_trm_shape_mismatch(self):
+        trm = [[[1.0], [1.0]], [[10.0], [10.0]]]
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": trm, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 422
+
+    def test_rvi_api_non_stochastic_row(self):
+        tpm = [[[0.8, 1.0], [0.1, 0.0]], [[0.0, 0.9], [1.0, 0.1]]]
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": tpm, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 422
+
+class TestMetricsAPI:
+    """
+    Test suite for the per-stage timings and the Prometheus metrics endpoint.
+    """
+    def test_rvi_api_stage_timings(self):
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-7, "include_timings": True}
+        )
+        assert response.status_code == 200
+        timings = response.json()["timings"]
+        assert set(timings) == {"parse", "convert", "validate_tpm", "solve"}
+        assert all(seconds >= 0 for seconds in timings.values())
+        assert "serialize;dur=" in response.headers["server-timing"]
+
+    def test_rvi_api_timings_omitted_by_default(self):
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert "timings" not in response.json()
+
+    def test_rvi_api_gzip_response(self):
+        import numpy as np
+        rng = np.random.default_rng(0)
+        tpm = rng.random((100, 100, 2))
+        tpm /= tpm.sum(axis=1, keepdims=True)
+        response = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": tpm.tolist(), "TRM": rng.random((100, 100, 2)).tolist(), "s_ref": 0, "epsilon": 1e-6},
+            headers={"accept-encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["h"]) == 100
+
+    def test_metrics_endpoint(self):
+        client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 1, "epsilon": 1e-7, "max_iterations": 1}
+        )
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        text = response.text
+        assert 'mdp_request_stage_seconds_count{endpoint="/mdp/relative-value-iteration",stage="solve"}' in text
+        assert 'mdp_solve_iterations_bucket{endpoint="/mdp/relative-value-iteration",le="1.0",method="rvi"}' in text
+        assert 'mdp_solves_total{converged="false",endpoint="/mdp/relative-value-iteration",method="rvi"}' in text
+        assert 'mdp_request_seconds_count{endpoint="/mdp/relative-value-iteration"}' in text
+
+
+class TestSparseRelativeValueIterationAPI:
+    """
+    Test suite for the sparse (COO) Relative Value Iteration API endpoint.
+    """
+    def test_sparse_rvi_api_matches_dense(self):
+        dense = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        )
+        sparse = client.post(
+            "/mdp/relative-value-iteration/sparse",
+            json={"n_states": 2, "n_actions": 2, **mdp_to_coo(MDP_TPM, MDP_TRM), "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert dense.status_code == 200
+        assert sparse.status_code == 200
+        assert sparse.json()["pi_star"] == dense.json()["pi_star"]
+        assert round(sparse.json()["g"], 6) == round(dense.json()["g"], 6)
+
+    def test_sparse_rvi_api_non_stochastic_row(self):
+        coo = mdp_to_coo(MDP_TPM, MDP_TRM)
+        coo["prob"][0] = 0.5
+        response = client.post(
+            "/mdp/relative-value-iteration/sparse",
+            json={"n_states": 2, "n_actions": 2, **coo, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 422
+
+    def test_sparse_rvi_api_duplicate_transition(self):
+        coo = mdp_to_coo(MDP_TPM, MDP_TRM)
+        for key in coo:
+            coo[key].append(coo[key][0])
+        response = client.post(
+            "/mdp/relative-value-iteration/sparse",
+            json={"n_states": 2, "n_actions": 2, **coo, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 422
+
+    def test_sparse_rvi_api_non_finite_values(self):
+        import json
+        for field in ["prob", "reward"]:
+            coo = mdp_to_coo(MDP_TPM, MDP_TRM)
+            coo[field][0] = float("nan")
+            response = client.post(
+                "/mdp/relative-value-iteration/sparse",
+                content=json.dumps({"n_states": 2, "n_actions": 2, **coo, "s_ref": 0, "epsilon": 1e-9}),
+                headers={"content-type": "application/json"}
+            )
+            assert response.status_code == 422
+
+    def test_sparse_rvi_api_too_many_state_actions(self):
+        from app.models import SPARSE_MAX_STATE_ACTIONS
+        for n_states, n_actions in [(SPARSE_MAX_STATE_ACTIONS + 1, 1), (10**9, 10**9)]:
+            response = client.post(
+                "/mdp/relative-value-iteration/sparse",
+                json={"n_states": n_states, "n_actions": n_actions, **mdp_to_coo(MDP_TPM, MDP_TRM), "s_ref": 0, "epsilon": 1e-9}
+            )
+            assert response.status_code == 422
+            assert "n_states * n_actions" in response.text
+
+    def test_sparse_rvi_api_index_out_of_range(self):
+        coo = mdp_to_coo(MDP_TPM, MDP_TRM)
+        coo["next_state"][0] = 2
+        response = client.post(
+            "/mdp/relative-value-iteration/sparse",
+            json={"n_states": 2, "n_actions": 2, **coo, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 422
+
+class TestBinaryRelativeValueIterationAPI:
+    """
+    Test suite for the binary (.npy) Relative Value Iteration API endpoint.
+    """
+    @staticmethod
+    def npy_body(*arrays):
+        import io
+        import numpy as np
+        buffer = io.BytesIO()
+        for array in arrays:
+            np.save(buffer, np.asarray(array, dtype=float))
+        return buffer.getvalue()
+
+    def test_binary_rvi_api_matches_json(self):
+        dense = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9, "mode": "reward"}
+        )
+        response = client.post(
+            "/mdp/relative-value-iteration/npy",
+            params={"s_ref": 0, "epsilon": 1e-9, "mode": "reward"},
+            content=self.npy_body(MDP_TPM, MDP_TRM),
+            headers={"content-type": "application/octet-stream"}
+        )
+        assert response.status_code == 200
+        assert response.json() == dense.json()
+
+    def test_binary_rvi_api_float32_model(self):
+        import io
+        import numpy as np
+        rng = np.random.default_rng(0)
+        TPM = rng.random((30, 30, 2))
+        TPM /= TPM.sum(axis=1, keepdims=True)
+        TRM = rng.random((30, 30, 2))
+
+        bodies = {}
+        for dtype in [np.float64, np.float32]:
+            buffer = io.BytesIO()
+            np.save(buffer, TPM.astype(dtype))
+            np.save(buffer, TRM.astype(dtype))
+            bodies[dtype] = buffer.getvalue()
+
+        results = [
+            client.post(
+                "/mdp/relative-value-iteration/npy",
+                params={"s_ref": 0, "epsilon": 1e-9},
+                content=body,
+                headers={"content-type": "application/octet-stream"}
+            )
+            for body in bodies.values()
+        ]
+        assert all(response.status_code == 200 for response in results)
+        exact, single = (response.json() for response in results)
+        # float32 rounds the rows to within 1e-7 of summing to 1, so the gain moves by about as much
+        assert abs(single["g"] - exact["g"]) < 1e-5
+        assert single["pi_star"] == exact["pi_star"]
+
+    def test_binary_rvi_api_wrong_content_type(self):
+        response = client.post(
+            "/mdp/relative-value-iteration/npy",
+            params={"s_ref": 0, "epsilon": 1e-9},
+            content=self.npy_body(MDP_TPM, MDP_TRM),
+            headers={"content-type": "application/json"}
+        )
+        assert response.status_code == 415
+
+    def test_binary_rvi_api_invalid_model(self):
+        tpm = [[[0.8, 1.0], [0.1, 0.0]], [[0.0, 0.9], [1.0, 0.1]]]
+        for body, s_ref in [(self.npy_body(tpm, MDP_TRM), 0), (self.npy_body(MDP_TPM), 0), (self.npy_body(MDP_TPM, MDP_TRM), 5)]:
+            response = client.post(
+                "/mdp/relative-value-iteration/npy",
+                params={"s_ref": s_ref, "epsilon": 1e-9},
+                content=body,
+                headers={"content-type": "application/octet-stream"}
+            )
+            assert response.status_code == 422
+
+
+    def test_binary_rvi_api_non_finite_values(self):
+        import numpy as np
+        for value in [np.nan, np.inf]:
+            tpm, trm = np.array(MDP_TPM), np.array(MDP_TRM)
+            tpm[0, 1, 0] = trm[0, 1, 0] = value
+            for body in [self.npy_body(tpm, MDP_TRM), self.npy_body(MDP_TPM, trm)]:
+                response = client.post(
+                    "/mdp/relative-value-iteration/npy",
+                    params={"s_ref": 0, "epsilon": 1e-9},
+                    content=body,
+                    headers={"content-type": "application/octet-stream"}
+                )
+                assert response.status_code == 422
+
+    def test_binary_rvi_api_validates_off_event_loop(self, monkeypatch):
+        import asyncio
+        import app.main
+        validate_model_tensors = app.main.validate_model_tensors
+        on_loop = []
+
+        def validate(*args):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return validate_model_tensors(*args)
+
+        monkeypatch.setattr(app.main, "validate_model_tensors", validate)
+        body = self.npy_body(MDP_TPM, MDP_TRM)
+        headers = {"content-type": "application/octet-stream"}
+
+        assert client.post("/mdp/relative-value-iteration/npy", params={"s_ref": 0, "epsilon": 1e-9}, content=body, headers=headers).status_code == 200
+        assert on_loop == [False]
+
+
+class TestMappedRelativeValueIterationAPI:
+    """
+    Test suite for the memory-mapped Relative Value Iteration API endpoint.
+    """
+    def test_mapped_rvi_api_matches_dense(self, tmp_path, monkeypatch):
+        import numpy as np
+        import app.main
+        monkeypatch.setattr(app.main, "MODEL_DIR", str(tmp_path))
+        (tmp_path / "fleet").mkdir()
+        np.save(tmp_path / "fleet" / "TPM.npy", np.array(MDP_TPM))
+        np.save(tmp_path / "fleet" / "TRM.npy", np.array(MDP_TRM))
+
+        dense = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        )
+        response = client.post(
+            "/mdp/relative-value-iteration/mapped",
+            json={"model_id": "fleet", "s_ref": 0, "epsilon": 1e-9, "block_size": 1}
+        )
+        assert response.status_code == 200
+        assert response.json()["pi_star"] == dense.json()["pi_star"]
+        assert abs(response.json()["g"] - dense.json()["g"]) < 1e-9
+
+    def test_mapped_rvi_api_unknown_model(self, tmp_path, monkeypatch):
+        import app.main
+        monkeypatch.setattr(app.main, "MODEL_DIR", str(tmp_path))
+        response = client.post(
+            "/mdp/relative-value-iteration/mapped",
+            json={"model_id": "missing", "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 404
+
+    def test_mapped_rvi_api_invalid_model_id(self):
+        response = client.post(
+            "/mdp/relative-value-iteration/mapped",
+            json={"model_id": "../etc", "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 422
+
+    def test_mapped_rvi_api_model_id_trailing_newline(self, tmp_path, monkeypatch):
+        import numpy as np
+        import app.main
+        monkeypatch.setattr(app.main, "MODEL_DIR", str(tmp_path))
+        (tmp_path / "fleet").mkdir()
+        np.save(tmp_path / "fleet" / "TPM.npy", np.array(MDP_TPM))
+        np.save(tmp_path / "fleet" / "TRM.npy", np.array(MDP_TRM))
+
+        response = client.post(
+            "/mdp/relative-value-iteration/mapped",
+            json={"model_id": "fleet\n", "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 422
+
+
+class TestModelRegistryAPI:
+    """
+    Test suite for uploading models to the registry and solving them by id.
+    """
+    def test_registry_api_upload_and_solve(self):
+        upload = client.post("/mdp/models", json={"TPM": MDP_TPM, "TRM": MDP_TRM})
+        assert upload.status_code == 201
+        info = upload.json()
+        assert info["n_states"] == 2 and info["n_actions"] == 2
+        assert info["location"] == "memory"
+
+        for mode in ["cost", "reward"]:
+            dense = client.post(
+                "/mdp/relative-value-iteration",
+                json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9, "mode": mode}
+            ).json()
+            response = client.post(
+                f"/mdp/models/{info['model_id']}/relative-value-iteration",
+                json={"s_ref": 0, "epsilon": 1e-9, "mode": mode}
+            )
+            assert response.status_code == 200
+            assert response.json()["pi_star"] == dense["pi_star"]
+            assert abs(response.json()["g"] - dense["g"]) < 1e-9
+
+    def test_registry_api_binary_upload(self):
+        json_upload = client.post("/mdp/models", json={"TPM": MDP_TPM, "TRM": MDP_TRM}).json()
+        response = client.post(
+            "/mdp/models/npy",
+            content=TestBinaryRelativeValueIterationAPI.npy_body(MDP_TPM, MDP_TRM),
+            headers={"content-type": "application/octet-stream"}
+        )
+        assert response.status_code == 201
+        assert response.json()["model_id"] == json_upload["model_id"]
+
+    def test_registry_api_binary_upload_float32(self):
+        import io
+        import numpy as np
+        rng = np.random.default_rng(1)
+        TPM = rng.random((30, 30, 2))
+        TPM /= TPM.sum(axis=1, keepdims=True)
+        buffer = io.BytesIO()
+        np.save(buffer, TPM.astype(np.float32))
+        np.save(buffer, rng.random((30, 30, 2)).astype(np.float32))
+        response = client.post(
+            "/mdp/models/npy",
+            content=buffer.getvalue(),
+            headers={"content-type": "application/octet-stream"}
+        )
+        assert response.status_code == 201
+        assert response.json()["n_states"] == 30
+
+    def test_registry_api_binary_upload_validates_off_event_loop(self, monkeypatch):
+        import asyncio
+        import app.main
+        validate_model_tensors = app.main.validate_model_tensors
+        on_loop = []
+
+        def validate(*args):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return validate_model_tensors(*args)
+
+        monkeypatch.setattr(app.main, "validate_model_tensors", validate)
+        response = client.post(
+            "/mdp/models/npy",
+            content=TestBinaryRelativeValueIterationAPI.npy_body(MDP_TPM, MDP_TRM),
+            headers={"content-type": "application/octet-stream"}
+        )
+        assert response.status_code == 201
+        assert on_loop == [False]
+
+    def test_registry_api_info_and_delete(self):
+        model_id = client.post("/mdp/models", json={"TPM": MDP_TPM, "TRM": MDP_TRM}).json()["model_id"]
+        assert client.get(f"/mdp/models/{model_id}").status_code == 200
+        assert client.get("/mdp/models").json()["models"] >= 1
+
+        assert client.delete(f"/mdp/models/{model_id}").status_code == 204
+        assert client.get(f"/mdp/models/{model_id}").status_code == 404
+        assert client.delete(f"/mdp/models/{model_id}").status_code == 404
+
+    def test_registry_api_unknown_model(self):
+        response = client.post(
+            "/mdp/models/missing/relative-value-iteration",
+            json={"s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 404
+
+    def test_registry_api_invalid_requests(self):
+        tpm = [[[0.8, 1.0], [0.1, 0.0]], [[0.0, 0.9], [1.0, 0.1]]]
+        assert client.post("/mdp/models", json={"TPM": tpm, "TRM": MDP_TRM}).status_code == 422
+
+        model_id = client.post("/mdp/models", json={"TPM": MDP_TPM, "TRM": MDP_TRM}).json()["model_id"]
+        for params in [{"s_ref": 2}, {"s_ref": 0, "h0": [0.0]}]:
+            response = client.post(
+                f"/mdp/models/{model_id}/relative-value-iteration",
+                json={"epsilon": 1e-9, **params}
+            )
+            assert response.status_code == 422
+
+
+class TestStreamingRelativeValueIterationAPI:
+    """
+    Test suite for the server-sent events RVI endpoint.
+    """
+    @staticmethod
+    def read_events(response):
+        import json
+        events = []
+        for block in response.text.strip().split("\n\n"):
+            fields = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((fields["event"], json.loads(fields["data"])))
+        return events
+
+    def test_stream_progress_then_result(self):
+        response = client.post(
+            "/mdp/relative-value-iteration/stream",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9, "progress_interval": 0}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = self.read_events(response)
+        progress = [data for event, data in events[:-1]]
+        assert all(event == "progress" for event, _ in events[:-1])
+        # Progress events a slow reader has not picked up are replaced by newer ones
+        iterations = [p["iteration"] for p in progress]
+        assert iterations == sorted(set(iterations))
+        assert {"g", "delta", "span", "policy_changes", "elapsed"} <= set(progress[0])
+
+        event, result = events[-1]
+        assert event == "result"
+        assert result["converged"]
+
+    def test_stream_solver_failure_ends_with_error(self, monkeypatch):
+        import app.main
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("out of memory")
+
+        monkeypatch.setattr(app.main, "solve_average_reward", fail)
+        response = client.post(
+            "/mdp/relative-value-iteration/stream",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 200
+        event, data = self.read_events(response)[-1]
+        assert event == "error"
+        assert "out of memory" in data["detail"]
+
+    def test_stream_disconnect_stops_solver(self, monkeypatch):
+        import asyncio
+        import json
+        import threading
+        import time
+        import numpy as np
+        import app.main
+
+        disconnected = threading.Event()
+        finished = threading.Event()
+        after_disconnect = []
+
+        def slow_solver(*args, callback, **kwargs):
+            # Stands in for a long solve: reports every iteration until the callback asks it to stop
+            try:
+                for iteration in range(1, 100_000):
+                    if disconnected.is_set():
+                        after_disconnect.append(iteration)
+                    progress = {"iteration": iteration, "g": 0.0, "delta": 1.0, "span": 1.0, "pi_star": np.zeros(2, dtype=int)}
+                    if callback(progress):
+                        return None
+                    time.sleep(0.001)
+                raise AssertionError("the solver was not stopped")
+            finally:
+                finished.set()
+
+        monkeypatch.setattr(app.main, "solve_average_reward", slow_solver)
+        body = json.dumps({"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9, "progress_interval": 0}).encode()
+
+        async def run():
+            first_event = asyncio.Event()
+            requested = False
+
+            async def receive():
+                nonlocal requested
+                if not requested:
+                    requested = True
+                    return {"type": "http.request", "body": body, "more_body": False}
+                # The client goes away once it has read the first progress event
+                await first_event.wait()
+                disconnected.set()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.body" and message.get("body"):
+                    first_event.set()
+
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+                "scheme": "http", "path": "/mdp/relative-value-iteration/stream", "raw_path": b"/mdp/relative-value-iteration/stream",
+                "query_string": b"", "root_path": "", "headers": [(b"content-type", b"application/json")],
+                "client": ("testclient", 50000), "server": ("testserver", 80),
+            }
+            await asyncio.wait_for(app.main.app(scope, receive, send), timeout=10)
+
+        asyncio.run(run())
+        assert finished.wait(timeout=10)
+        # The solver notices the closed stream at the next callback, allowing for the cancellation to propagate
+        assert len(after_disconnect) < 100
+
+    def test_stream_invalid_model(self):
+        tpm = [[[0.8, 1.0], [0.1, 0.0]], [[0.0, 0.9], [1.0, 0.1]]]
+        response = client.post(
+            "/mdp/relative-value-iteration/stream",
+            json={"TPM": tpm, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 422
+
+
+class TestPolicyIterationAPI:
+    """
+    Test suite for the Policy Iteration API endpoint.
+    """
+    def test_policy_iteration_api_matches_rvi(self):
+        rvi = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        )
+        pi = client.post(
+            "/mdp/policy-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert pi.status_code == 200
+        data = pi.json()
+        assert data["converged"]
+        assert data["pi_star"] == rvi.json()["pi_star"]
+        assert round(data["g"], 6) == round(rvi.json()["g"], 6)
+
+    def test_policy_iteration_api_multichain(self):
+        tpm = [[[1.0], [0.0]], [[0.0], [1.0]]]
+        trm = [[[1.0], [1.0]], [[2.0], [2.0]]]
+        response = client.post(
+            "/mdp/policy-iteration",
+            json={"TPM": tpm, "TRM": trm, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 422
+
+class TestSolutionCacheAPI:
+    """
+    Test suite for solution caching on the MDP endpoints.
+    """
+    def test_repeat_request_is_served_from_cache(self):
+        payload = {"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 1, "epsilon": 1e-7, "method": "gauss_seidel"}
+        before = client.get("/mdp/cache/stats").json()
+        first = client.post("/mdp/relative-value-iteration", json=payload)
+        second = client.post("/mdp/relative-value-iteration", json=payload)
+        after = client.get("/mdp/cache/stats").json()
+
+        assert first.json() == second.json()
+        assert after["misses"] == before["misses"] + 1
+        assert after["hits"] == before["hits"] + 1
+
+    def test_reward_mode_shares_cost_entry(self):
+        negated = [[[-r for r in row] for row in plane] for plane in MDP_TRM]
+        payload = {"TPM": MDP_TPM, "s_ref": 1, "epsilon": 1e-7, "method": "modified_policy_iteration"}
+        client.post("/mdp/relative-value-iteration", json={**payload, "TRM": MDP_TRM})
+        before = client.get("/mdp/cache/stats").json()
+        client.post("/mdp/relative-value-iteration", json={**payload, "TRM": negated, "mode": "reward"})
+        after = client.get("/mdp/cache/stats").json()
+
+        assert after["hits"] == before["hits"] + 1
+
+class TestBatchRelativeValueIterationAPI:
+    """
+    Test suite for the batch Relative Value Iteration API endpoint.
+    """
+    def test_batch_rvi_api_mixed_shapes(self):
+        small_tpm = [[[1.0]]]
+        small_trm = [[[2.0]]]
+        payload = {"models": [
+            {"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9},
+            {"TPM": small_tpm, "TRM": small_trm, "s_ref": 0, "epsilon": 1e-9},
+            {"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 1, "epsilon": 1e-9, "mode": "reward"},
+        ]}
+        response = client.post("/mdp/relative-value-iteration/batch", json=payload)
+        assert response.status_code == 200
+        results = response.json()["results"]
+        single = client.post(
+            "/mdp/relative-value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        ).json()
+
+        assert len(results) == 3
+        assert results[0]["pi_star"] == single["pi_star"]
+        assert round(results[0]["g"], 6) == round(single["g"], 6)
+        assert results[1]["g"] == 2.0
+        assert all(r["converged"] for r in results)
+
+    def test_batch_rvi_api_empty(self):
+        response = client.post("/mdp/relative-value-iteration/batch", json={"models": []})
+        assert response.status_code == 422
+
+    def test_batch_rvi_api_per_model_time_budget(self):
+        n = 20
+        tpm = [[[0.0, 0.0] for _ in range(n)] for _ in range(n)]
+        trm = [[[0.1 * i, 3.0] for _ in range(n)] for i in range(n)]
+        for i in range(n):
+            tpm[i][min(i + 1, n - 1)][0] += 0.2
+            tpm[i][i][0] += 0.8
+            tpm[i][0][1] = 1.0
+        payload = {"models": [
+            {"TPM": tpm, "TRM": trm, "s_ref": 0, "epsilon": 1e-10, "max_time": 1e-9},
+            {"TPM": tpm, "TRM": trm, "s_ref": 0, "epsilon": 1e-10, "max_time": 10},
+        ]}
+        response = client.post("/mdp/relative-value-iteration/batch", json=payload)
+        assert response.status_code == 200
+        short, long = response.json()["results"]
+        assert short["iterations"] == 1 and not short["converged"]
+        assert long["converged"] and long["iterations"] > 1
+
+    def test_batch_rvi_api_too_many_models(self):
+        from app.models import BATCH_MAX_MODELS
+        model = {"TPM": [[[1.0]]], "TRM": [[[2.0]]], "s_ref": 0, "epsilon": 1e-9}
+        response = client.post("/mdp/relative-value-iteration/batch", json={"models": [model] * (BATCH_MAX_MODELS + 1)})
+        assert response.status_code == 422
+
+    def test_batch_rvi_api_invalid_model(self):
+        tpm = [[[0.8, 1.0], [0.1, 0.0]], [[0.0, 0.9], [1.0, 0.1]]]
+        payload = {"models": [
+            {"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9},
+            {"TPM": tpm, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9},
+        ]}
+        response = client.post("/mdp/relative-value-iteration/batch", json=payload)
+        assert response.status_code == 422
+
+class TestMDPJobsAPI:
+    """
+    Test suite for the asynchronous MDP job API endpoints.
+    """
+    def test_job_submit_and_poll(self):
+        import time
+        response = client.post(
+            "/mdp/jobs",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        deadline = time.time() + 30
+        status = client.get(f"/mdp/jobs/{job_id}").json()
+        while status["state"] in ("pending", "running"):
+            assert time.time() < deadline
+            time.sleep(0.05)
+            status = client.get(f"/mdp/jobs/{job_id}").json()
+
+        assert status["state"] == "completed"
+        assert status["result"]["converged"]
+        assert len(status["result"]["pi_star"]) == 2
+
+    def test_job_unknown_id(self):
+        assert client.get("/mdp/jobs/missing").status_code == 404
+        assert client.delete("/mdp/jobs/missing").status_code == 404
+
+    def test_job_invalid_model(self):
+        tpm = [[[0.8, 1.0], [0.1, 0.0]], [[0.0, 0.9], [1.0, 0.1]]]
+        response = client.post(
+            "/mdp/jobs",
+            json={"TPM": tpm, "TRM": MDP_TRM, "s_ref": 0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 422
+
+
+class TestDiscountedValueIterationAPI:
+    """
+    Test suite for the discounted value iteration API endpoint.
+    """
+    def test_discounted_api_nominal(self):
+        response = client.post(
+            "/mdp/discounted/value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "discount": 0.9, "epsilon": 1e-9}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["converged"]
+        assert len(data["v"]) == 2
+        assert all(lo <= v <= hi for lo, v, hi in zip(data["v_lower"], data["v"], data["v_upper"]))
+
+    def test_discounted_api_invalid_discount(self):
+        response = client.post(
+            "/mdp/discounted/value-iteration",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "discount": 1.0, "epsilon": 1e-9}
+        )
+        assert response.status_code == 422
+
+
+class TestFiniteHorizonAPI:
+    """
+    Test suite for the streaming finite-horizon API endpoint.
+    """
+    def test_finite_horizon_api_streams_stages(self):
+        import json
+        response = client.post(
+            "/mdp/finite-horizon",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "horizon": 5}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        stages = [json.loads(line) for line in response.text.splitlines()]
+        assert [stage["stage"] for stage in stages] == [4, 3, 2, 1, 0]
+        assert all(len(stage["pi_star"]) == 2 and len(stage["v"]) == 2 for stage in stages)
+
+    def test_finite_horizon_api_policies_only(self):
+        response = client.post(
+            "/mdp/finite-horizon",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "horizon": 3, "include_values": False}
+        )
+        assert response.status_code == 200
+        assert all("v" not in line for line in response.text.splitlines())
+
+    def test_finite_horizon_api_terminal_cost_wrong_length(self):
+        response = client.post(
+            "/mdp/finite-horizon",
+            json={"TPM": MDP_TPM, "TRM": MDP_TRM, "horizon": 3, "terminal_cost": [0.0]}
+        )
+        assert response.status_code == 422
@@ -0,0 +1,85 @@
+import time
+import numpy as np
+import pytest
+from app.jobs import JobManager
+
+
+def periodic_chain(n):
+    """
+    Deterministic cycle on which plain RVI never converges, used as a long-running solve.
+    """
+    TPM = np.zeros((n, n, 1))
+    TPM[np.arange(n), (np.arange(n) + 1) % n, 0] = 1.0
+    TRM = np.zeros((n, n, 1))
+    TRM[0, 1, 0] = 1.0
+    return TPM, TRM
+
+
+def wait_for(manager, job_id, states, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = manager.status(job_id)
+        if status["state"] in states:
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not reach {states}")
+
+
+@pytest.fixture(scope="module")
+def manager():
+    manager = JobManager(max_workers=1)
+    yield manager
+    manager.shutdown()
+
+
+class TestJobManager:
+    """
+    Test suite for the JobManager class.
+    """
+    def test_job_runs_to_completion(self, manager):
+        """
+        Tests that a submitted job completes and returns the solver result.
+        """
+        TPM = np.array([[[0.9], [0.1]], [[0.5], [0.5]]])
+        TRM = np.array([[[1.0], [1.0]], [[4.0], [4.0]]])
+        job_id = manager.submit(TPM, TRM, 0, 1e-12)
+        status = wait_for(manager, job_id, {"completed", "failed"})
+
+        assert status["state"] == "completed"
+        assert status["result"]["converged"]
+        assert status["result"]["g"] == pytest.approx(1.5)
+
+    def test_running_job_reports_progress_and_cancels(self, manager):
+        """
+        Tests that a long-running job publishes progress and stops when cancelled.
+        """
+        TPM, TRM = periodic_chain(50)
+        job_id = manager.submit(TPM, TRM, 0, 1e-9, max_iterations=10**9, max_time=60.0)
+
+        deadline = time.time() + 30
+        while not manager.status(job_id)["progress"]:
+            assert time.time() < deadline
+            time.sleep(0.05)
+
+        progress = manager.status(job_id)["progress"]
+        assert progress["iteration"] > 0
+        assert progress["elapsed"] > 0
+
+        manager.cancel(job_id)
+        status = wait_for(manager, job_id, {"cancelled"})
+        assert status["result"] is None or not status["result"]["converged"]
+
+    def test_failed_job_reports_error(self, manager):
+        """
+        Tests that a solver error is reported as a failed job.
+        """
+        TPM, TRM = periodic_chain(3)
+        job_id = manager.submit(TPM, TRM, 0, 1e-9, method="no-such-method")
+        status = wait_for(manager, job_id, {"completed", "failed"})
+
+        assert status["state"] == "failed"
+        assert "method" in status["error"]
+
+    def test_unknown_job(self, manager):
+        with pytest.raises(KeyError):
+            manager.status("missing")
@@ -0,0 +1,809 @@
+import numpy as np
+import pytest
+from app.markov_decisions import (
+    relative_value_iteration_average_reward,
+    relative_value_iteration_average_reward_sparse,
+    relative_value_iteration_average_reward_blocked,
+    relative_value_iteration_average_reward_batch,
+    policy_iteration_average_reward,
+    evaluate_policy_average_reward,
+    gauss_seidel_relative_value_iteration_average_reward,
+    modified_policy_iteration_average_reward,
+    aperiodic_relative_value_iteration_average_reward,
+    solve_average_reward,
+    AVERAGE_REWARD_METHODS,
+    AverageRewardSolution,
+    value_iteration_discounted,
+    value_iteration_discounted_sparse,
+    backward_induction_finite_horizon,
+    validate_tpm_stochastic
+)
+from app.sparse_mdp import SparseMDP
+from app.blocked_mdp import BlockedMDP, model_path
+
+
+def random_mdp(n, A, successors=None, seed=0):
+    """
+    Build a random (n, n, A) TPM/TRM pair. When successors is given, each
+    (state, action) row only transitions to that many next states.
+    """
+    rng = np.random.default_rng(seed)
+    TPM = rng.random((n, n, A))
+    if successors is not None:
+        for i in range(n):
+            for a in range(A):
+                keep = rng.choice(n, size=successors, replace=False)
+                mask = np.ones(n, dtype=bool)
+                mask[keep] = False
+                TPM[i, mask, a] = 0.0
+    TPM /= TPM.sum(axis=1, keepdims=True)
+    TRM = rng.random((n, n, A))
+    return TPM, TRM
+
+
+class TestRelativeValueIteration:
+    """
+    Test suite for the relative_value_iteration_average_reward function.
+    """
+    def test_rvi_satisfies_optimality_equation(self):
+        """
+        Tests that the converged bias and gain satisfy h + g = min_a Q(h).
+        """
+        TPM, TRM = random_mdp(6, 3)
+        h, g, pi_star, _, converged, *_ = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10)
+
+        Q = np.sum(TPM * (TRM + h[None, :, None]), axis=1)
+        assert converged
+        assert h[0] == 0
+        assert np.allclose(h + g, Q.min(axis=1), atol=1e-8)
+        assert np.array_equal(pi_star, Q.argmin(axis=1))
+
+    def test_rvi_two_state_known_gain(self):
+        """
+        Tests the gain of a two-state chain with a single action against its stationary distribution.
+        """
+        TPM = np.array([[[0.9], [0.1]], [[0.5], [0.5]]])
+        TRM = np.array([[[1.0], [1.0]], [[4.0], [4.0]]])
+        _, g, _, _, converged, *_ = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-12)
+
+        # Stationary distribution is (5/6, 1/6)
+        assert converged
+        assert g == pytest.approx(5 / 6 * 1.0 + 1 / 6 * 4.0)
+
+
+    def test_rvi_matches_exact_policy_evaluation(self):
+        """
+        Tests the dense Bellman update against an exact solve of the optimal policy's evaluation equations.
+        The bias is added over the next-state axis; adding it over the current state gives a different gain.
+        """
+        TPM, TRM = random_mdp(5, 2, seed=11)
+        h, g, pi_star, _, converged, *_ = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-12)
+
+        states = np.arange(5)
+        P_pi = TPM[states, :, pi_star]
+        c_pi = np.sum(TPM * TRM, axis=1)[states, pi_star]
+        h_exact, g_exact = evaluate_policy_average_reward(P_pi, c_pi, 0)
+
+        assert converged
+        assert g == pytest.approx(g_exact)
+        assert np.allclose(h, h_exact, atol=1e-9)
+
+class TestSparseRelativeValueIteration:
+    """
+    Test suite for the SparseMDP representation and sparse relative value iteration.
+    """
+    def test_sparse_matches_dense(self):
+        """
+        Tests that the sparse solver produces the same h, g and pi_star as the dense solver.
+        """
+        TPM, TRM = random_mdp(30, 4, successors=3, seed=1)
+        dense = relative_value_iteration_average_reward(TPM, TRM, 2, 1e-10)
+        sparse = relative_value_iteration_average_reward_sparse(SparseMDP.from_dense(TPM, TRM), 2, 1e-10)
+
+        assert np.allclose(sparse[0], dense[0], atol=1e-9)
+        assert sparse[1] == pytest.approx(dense[1])
+        assert np.array_equal(sparse[2], dense[2])
+        assert sparse[3] == dense[3]
+        assert sparse[4] == dense[4]
+
+    def test_sparse_stores_only_nonzeros(self):
+        """
+        Tests that from_dense keeps one entry per non-zero probability and round-trips through to_dense.
+        """
+        TPM, TRM = random_mdp(10, 2, successors=2, seed=2)
+        mdp = SparseMDP.from_dense(TPM, TRM)
+        TPM_back, TRM_back = mdp.to_dense()
+
+        assert mdp.nnz == 10 * 2 * 2
+        assert np.array_equal(TPM_back, TPM)
+        assert np.array_equal(TRM_back[TPM > 0], TRM[TPM > 0])
+
+    def test_sparse_rejects_non_stochastic_row(self):
+        """
+        Tests that a row that does not sum to 1 is rejected.
+        """
+        TPM, TRM = random_mdp(4, 2, seed=3)
+        TPM[1, :, 0] *= 0.5
+        with pytest.raises(ValueError):
+            SparseMDP.from_dense(TPM, TRM).validate_stochastic()
+
+    def test_sparse_rejects_empty_row(self):
+        """
+        Tests that a (state, action) pair without any transitions is rejected.
+        """
+        TPM, TRM = random_mdp(4, 2, seed=4)
+        TPM[3, :, 1] = 0.0
+        with pytest.raises(ValueError):
+            SparseMDP.from_dense(TPM, TRM).validate_stochastic()
+
+
+    def test_sparse_trailing_empty_rows(self):
+        """
+        Tests that empty rows at the end do not take entries from the last non-empty row.
+        """
+        mdp = SparseMDP.from_coo(2, 1, state=[0, 0], next_state=[0, 1], action=[0, 0], prob=[0.5, 0.5], reward=[2.0, 4.0])
+
+        assert np.allclose(mdp.expected_cost, [[3.0], [0.0]])
+        assert np.allclose(mdp.bellman_q(np.array([1.0, 3.0])), [[5.0], [0.0]])
+        with pytest.raises(ValueError, match="state 1, action 0"):
+            mdp.validate_stochastic()
+
+    @pytest.mark.parametrize("field", ["prob", "reward"])
+    @pytest.mark.parametrize("value", [np.nan, np.inf])
+    def test_from_coo_rejects_non_finite(self, field, value):
+        """
+        Tests that NaN or infinite probabilities and rewards are rejected when the model is built.
+        """
+        coo = dict(state=[0, 1], next_state=[1, 0], action=[0, 0], prob=[1.0, 1.0], reward=[2.0, 4.0])
+        coo[field][1] = value
+        with pytest.raises(ValueError, match=f"{field} contains a non-finite value at entry 1"):
+            SparseMDP.from_coo(2, 1, **coo)
+
+class TestBlockedRelativeValueIteration:
+    """
+    Test suite for the BlockedMDP representation and memory-mapped relative value iteration.
+    """
+    @pytest.mark.parametrize("block_size", [1, 7, 64])
+    def test_blocked_matches_dense(self, block_size):
+        """
+        Tests that blocked sweeps produce the same h, g and pi_star as the dense solver for any block size.
+        """
+        TPM, TRM = random_mdp(20, 3, seed=8)
+        dense = relative_value_iteration_average_reward(TPM, TRM, 1, 1e-10)
+        blocked = relative_value_iteration_average_reward_blocked(BlockedMDP(TPM, TRM, block_size), 1, 1e-10)
+
+        assert np.allclose(blocked.h, dense.h, atol=1e-9)
+        assert blocked.g == pytest.approx(dense.g)
+        assert np.array_equal(blocked.pi_star, dense.pi_star)
+
+    def test_blocked_memory_mapped(self, tmp_path):
+        """
+        Tests that a model saved as .npy files is loaded memory-mapped and solved, including reward mode.
+        """
+        TPM, TRM = random_mdp(15, 2, seed=4)
+        np.save(tmp_path / "TPM.npy", TPM)
+        np.save(tmp_path / "TRM.npy", TRM)
+
+        mdp = BlockedMDP.load(tmp_path, block_size=4)
+        assert isinstance(mdp.TPM, np.memmap)
+
+        dense = relative_value_iteration_average_reward(TPM, -TRM, 0, 1e-10)
+        mapped = relative_value_iteration_average_reward_blocked(mdp.negated(), 0, 1e-10)
+        assert mapped.g == pytest.approx(dense.g)
+        assert np.array_equal(mapped.pi_star, dense.pi_star)
+
+    def test_blocked_rejects_non_stochastic_row(self):
+        """
+        Tests that blocked validation reports the global state index of a bad row.
+        """
+        TPM, TRM = random_mdp(10, 2)
+        TPM[7, 0, 1] += 0.5
+        with pytest.raises(ValueError, match="state 7, action 1"):
+            BlockedMDP(TPM, TRM, block_size=3).validate_stochastic()
+
+    @pytest.mark.parametrize("name", ["TPM", "TRM"])
+    def test_blocked_rejects_non_finite(self, name):
+        """
+        Tests that blocked validation rejects a NaN probability or reward and reports its global index.
+        """
+        TPM, TRM = random_mdp(10, 2)
+        {"TPM": TPM, "TRM": TRM}[name][8, 2, 1] = np.nan
+        with pytest.raises(ValueError, match=rf"{name} contains a non-finite value at index \(8, 2, 1\)"):
+            BlockedMDP(TPM, TRM, block_size=3).validate_stochastic()
+
+    def test_model_path_rejects_traversal(self):
+        """
+        Tests that model ids cannot escape the model directory.
+        """
+        with pytest.raises(ValueError):
+            model_path("models", "../secrets")
+
+    @pytest.mark.parametrize("model_id", ["model\n", "model\nname", ".hidden", ""])
+    def test_model_path_rejects_invalid_names(self, model_id):
+        """
+        Tests that model ids must match the pattern as a whole, including no trailing newline.
+        """
+        with pytest.raises(ValueError):
+            model_path("models", model_id)
+
+
+class TestParallelSweeps:
+    """
+    Test suite for Bellman sweeps split across a thread pool.
+    """
+    @pytest.mark.parametrize("workers", [2, 3, 8])
+    def test_parallel_matches_serial(self, workers):
+        """
+        Tests that threaded sweeps reproduce the single-threaded solve exactly, including uneven splits.
+        """
+        TPM, TRM = random_mdp(25, 3, seed=11)
+        serial = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10)
+        parallel = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10, workers=workers)
+
+        assert parallel.iterations == serial.iterations
+        assert np.allclose(parallel.h, serial.h, atol=1e-12)
+        assert np.array_equal(parallel.pi_star, serial.pi_star)
+
+    def test_parallel_blocked(self):
+        """
+        Tests that a BlockedMDP swept by several workers matches the serial blocked solve.
+        """
+        TPM, TRM = random_mdp(30, 2, seed=12)
+        mdp = BlockedMDP(TPM, TRM, block_size=4)
+        serial = relative_value_iteration_average_reward_blocked(mdp, 0, 1e-10)
+        parallel = relative_value_iteration_average_reward_blocked(mdp, 0, 1e-10, workers=4)
+
+        assert np.allclose(parallel.h, serial.h, atol=1e-12)
+        assert parallel.g == pytest.approx(serial.g)
+
+
+class TestBatchRelativeValueIteration:
+    """
+    Test suite for the relative_value_iteration_average_reward_batch function.
+    """
+    def test_batch_matches_individual_solves(self):
+        """
+        Tests that each model in the batch gets the same result as solving it on its own.
+        """
+        models = [random_mdp(12, 3, successors=3, seed=seed) for seed in range(6)]
+        TPM = np.stack([m[0] for m in models])
+        TRM = np.stack([m[1] for m in models])
+        s_ref = [0, 1, 2, 3, 4, 5]
+        h, g, pi_star, iterations, converged, *_ = relative_value_iteration_average_reward_batch(TPM, TRM, s_ref, 1e-10)
+
+        for b, (P, R) in enumerate(models):
+            single = relative_value_iteration_average_reward(P, R, s_ref[b], 1e-10)
+            assert np.allclose(h[b], single[0])
+            assert g[b] == pytest.approx(single[1])
+            assert np.array_equal(pi_star[b], single[2])
+            assert iterations[b] == single[3]
+            assert converged[b]
+
+    def test_batch_per_model_tolerance(self):
+        """
+        Tests that models stop independently according to their own epsilon.
+        """
+        P, R = degradation_mdp(20, p=0.2)
+        TPM = np.stack([P, P])
+        TRM = np.stack([R, R])
+        _, _, _, iterations, converged, *_ = relative_value_iteration_average_reward_batch(TPM, TRM, 0, [1e-3, 1e-10])
+
+        assert converged.all()
+        assert iterations[0] < iterations[1]
+
+    def test_batch_iteration_budget(self):
+        """
+        Tests that models still iterating when the budget runs out are reported as not converged.
+        """
+        P, R = degradation_mdp(20, p=0.2)
+        _, _, _, iterations, converged, *_ = relative_value_iteration_average_reward_batch(
+            np.stack([P, P]), np.stack([R, R]), 0, [1e-2, 1e-10], max_iterations=20
+        )
+
+        assert converged[0] and not converged[1]
+        assert iterations[1] == 20
+
+    def test_batch_per_model_time_budget(self):
+        """
+        Tests that a model whose time budget is spent stops without cutting short the other models.
+        """
+        P, R = degradation_mdp(20, p=0.2)
+        _, _, _, iterations, converged, *_ = relative_value_iteration_average_reward_batch(
+            np.stack([P, P]), np.stack([R, R]), 0, 1e-10, max_time=[0.0, 10.0]
+        )
+
+        assert iterations[0] == 1 and not converged[0]
+        assert converged[1] and iterations[1] > 1
+
+
+class TestPolicyIteration:
+    """
+    Test suite for the policy_iteration_average_reward function.
+    """
+    def test_policy_iteration_matches_rvi(self):
+        """
+        Tests that policy iteration finds the same gain and policy as relative value iteration.
+        """
+        TPM, TRM = random_mdp(20, 3, seed=5)
+        h_rvi, g_rvi, pi_rvi, _, _, *_ = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-12)
+        h, g, pi_star, iterations, converged, *_ = policy_iteration_average_reward(TPM, TRM, 0, 1e-12)
+
+        assert converged
+        assert iterations < 10
+        assert g == pytest.approx(g_rvi)
+        assert np.allclose(h, h_rvi, atol=1e-8)
+        assert np.array_equal(pi_star, pi_rvi)
+
+    def test_evaluate_policy_two_state_chain(self):
+        """
+        Tests the evaluation equations on a two-state chain with a known stationary distribution.
+        """
+        P_pi = np.array([[0.9, 0.1], [0.5, 0.5]])
+        c_pi = np.array([1.0, 4.0])
+        h, g = evaluate_policy_average_reward(P_pi, c_pi, 0)
+
+        assert g == pytest.approx(5 / 6 * 1.0 + 1 / 6 * 4.0)
+        assert h[0] == 0
+        assert np.allclose(h + g, c_pi + P_pi @ h)
+
+    def test_evaluate_policy_multichain(self):
+        """
+        Tests that a policy with two closed classes is rejected.
+        """
+        with pytest.raises(ValueError):
+            evaluate_policy_average_reward(np.eye(3), np.array([1.0, 2.0, 3.0]), 0)
+
+
+def degradation_mdp(n, p=0.3):
+    """
+    Maintenance MDP where action 0 (operate) degrades one state with probability p
+    and action 1 (repair) returns to state 0 at a fixed cost.
+    """
+    TPM = np.zeros((n, n, 2))
+    TRM = np.zeros((n, n, 2))
+    for i in range(n):
+        TPM[i, min(i + 1, n - 1), 0] += p
+        TPM[i, i, 0] += 1 - p
+        TPM[i, 0, 1] = 1.0
+        TRM[i, :, 0] = 0.1 * i
+        TRM[i, :, 1] = 3.0
+    return TPM, TRM
+
+
+def expected_cost_plus_next(TPM, TRM, h):
+    return np.sum(TPM * (TRM + h[None, :, None]), axis=1).min(axis=1)
+
+
+class TestSolverVariants:
+    """
+    Test suite for the Gauss-Seidel, modified policy iteration and aperiodic RVI solvers.
+    """
+    @pytest.mark.parametrize("method", AVERAGE_REWARD_METHODS)
+    def test_methods_agree(self, method):
+        """
+        Tests that every selectable method reaches the RVI gain, bias and policy.
+        """
+        TPM, TRM = random_mdp(25, 3, successors=4, seed=6)
+        h_rvi, g_rvi, pi_rvi, _, _, *_ = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-11)
+        h, g, pi_star, _, converged, *_ = solve_average_reward(TPM, TRM, 0, 1e-11, method=method)
+
+        assert converged
+        assert g == pytest.approx(g_rvi)
+        assert np.allclose(h, h_rvi, atol=1e-7)
+        assert np.array_equal(pi_star, pi_rvi)
+
+    @pytest.mark.parametrize("block_size", [1, 16])
+    def test_gauss_seidel_fewer_sweeps_along_flow(self, block_size):
+        """
+        Tests that Gauss-Seidel needs fewer sweeps than RVI when states are ordered along the flow of the chain.
+        """
+        TPM, TRM = degradation_mdp(50)
+        # Reverse the numbering so transitions point towards already-updated states
+        TPM, TRM = TPM[::-1, ::-1], TRM[::-1, ::-1]
+        rvi = relative_value_iteration_average_reward(TPM, TRM, 49, 1e-10)
+        gs = gauss_seidel_relative_value_iteration_average_reward(TPM, TRM, 49, 1e-10, block_size=block_size)
+
+        assert gs[4]
+        assert gs[1] == pytest.approx(rvi[1])
+        assert gs[3] < rvi[3]
+
+    def test_gauss_seidel_uses_fresh_gain(self):
+        """
+        Tests that Gauss-Seidel stays within a small factor of RVI's sweeps on an unordered dense model.
+        """
+        TPM, TRM = random_mdp(200, 3, seed=3)
+        rvi = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10)
+        gs = gauss_seidel_relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10)
+
+        assert gs.converged
+        assert gs.g == pytest.approx(rvi.g)
+        assert gs.iterations <= 2 * rvi.iterations
+
+    def test_modified_policy_iteration_fewer_sweeps(self):
+        """
+        Tests that partial evaluation sweeps reduce the number of improvement sweeps.
+        """
+        TPM, TRM = degradation_mdp(50)
+        rvi = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10)
+        mpi = modified_policy_iteration_average_reward(TPM, TRM, 0, 1e-10, evaluation_sweeps=10)
+
+        assert mpi[4]
+        assert mpi[1] == pytest.approx(rvi[1])
+        assert mpi[3] < rvi[3]
+
+    def test_aperiodic_rvi_periodic_chain(self):
+        """
+        Tests that the aperiodicity transform converges on a periodic chain where plain RVI oscillates.
+        """
+        n = 4
+        TPM = np.zeros((n, n, 1))
+        TPM[np.arange(n), (np.arange(n) + 1) % n, 0] = 1.0
+        TRM = np.zeros((n, n, 1))
+        TRM[0, 1, 0] = 4.0
+
+        assert not relative_value_iteration_average_reward(TPM, TRM, 0, 1e-8, max_iterations=500)[4]
+        h, g, _, _, converged, *_ = aperiodic_relative_value_iteration_average_reward(TPM, TRM, 0, 1e-8)
+        assert converged
+        assert g == pytest.approx(1.0)
+        assert np.allclose(h + g, expected_cost_plus_next(TPM, TRM, h), atol=1e-6)
+
+    @pytest.mark.parametrize("tau", [0.1, 0.5])
+    def test_aperiodic_rvi_span_gain_gap(self, tau):
+        """
+        Tests that the span rule bounds the gain gap of the original model by epsilon for any tau.
+        """
+        TPM, TRM = random_mdp(20, 3, seed=4)
+        solution = aperiodic_relative_value_iteration_average_reward(TPM, TRM, 0, 1e-3, tau=tau, stopping="span")
+
+        assert solution.converged
+        assert solution.g_upper - solution.g_lower < 1e-3
+
+    def test_unknown_method(self):
+        TPM, TRM = random_mdp(3, 2)
+        with pytest.raises(ValueError):
+            solve_average_reward(TPM, TRM, 0, 1e-8, method="simplex")
+
+
+class TestWarmStart:
+    """
+    Test suite for warm-starting the solvers from a previous bias vector or policy.
+    """
+    def test_warm_start_from_previous_bias(self):
+        """
+        Tests that re-solving slightly perturbed costs from the previous h takes fewer sweeps.
+        """
+        TPM, TRM = degradation_mdp(40, p=0.1)
+        h, g, pi_star, cold_iterations, _, *_ = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10)
+
+        perturbed = TRM * 1.001
+        cold = relative_value_iteration_average_reward(TPM, perturbed, 0, 1e-10)
+        warm = relative_value_iteration_average_reward(TPM, perturbed, 0, 1e-10, h0=h)
+
+        assert warm[4]
+        assert warm[1] == pytest.approx(cold[1])
+        assert np.array_equal(warm[2], cold[2])
+        assert warm[3] < cold[3]
+
+    def test_warm_start_from_policy(self):
+        """
+        Tests that starting from the optimal policy converges almost immediately.
+        """
+        TPM, TRM = degradation_mdp(40, p=0.1)
+        _, g, pi_star, cold_iterations, _, *_ = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10)
+        warm = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10, pi0=pi_star)
+
+        assert warm[4]
+        assert warm[1] == pytest.approx(g)
+        assert warm[3] <= 2
+
+    def test_policy_iteration_warm_start(self):
+        """
+        Tests that policy iteration started from the optimal policy stops after one evaluation.
+        """
+        TPM, TRM = random_mdp(15, 3, seed=7)
+        _, g, pi_star, _, _, *_ = policy_iteration_average_reward(TPM, TRM, 0, 1e-12)
+        warm = policy_iteration_average_reward(TPM, TRM, 0, 1e-12, pi0=pi_star)
+
+        assert warm[3] == 1
+        assert warm[1] == pytest.approx(g)
+
+    @pytest.mark.parametrize("method", AVERAGE_REWARD_METHODS)
+    def test_warm_start_all_methods(self, method):
+        """
+        Tests that every method accepts a warm start and reaches the same solution.
+        """
+        TPM, TRM = random_mdp(20, 2, successors=3, seed=8)
+        h, g, pi_star, _, _, *_ = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-11)
+        warm = solve_average_reward(TPM, TRM, 0, 1e-11, method=method, h0=h + 3.0)
+
+        assert warm[4]
+        assert warm[1] == pytest.approx(g)
+        assert np.allclose(warm[0], h, atol=1e-7)
+
+    def test_sparse_warm_start(self):
+        """
+        Tests that the sparse solver accepts a warm start bias.
+        """
+        TPM, TRM = degradation_mdp(30, p=0.1)
+        mdp = SparseMDP.from_dense(TPM, TRM)
+        h, g, _, cold_iterations, _, *_ = relative_value_iteration_average_reward_sparse(mdp, 0, 1e-10)
+        warm = relative_value_iteration_average_reward_sparse(mdp, 0, 1e-10, h0=h)
+
+        assert warm[3] <= 2
+        assert warm[1] == pytest.approx(g)
+
+
+class TestStoppingAndBounds:
+    """
+    Test suite for the stopping rules, iteration/time budgets and the gain bounds.
+    """
+    @pytest.mark.parametrize("method", AVERAGE_REWARD_METHODS)
+    def test_bounds_bracket_gain(self, method):
+        """
+        Tests that every method reports g_lower <= g* <= g_upper around the optimal gain.
+        """
+        TPM, TRM = random_mdp(12, 3, seed=4)
+        _, g_star, _, _, _, *_ = policy_iteration_average_reward(TPM, TRM, 0, 1e-12)
+        solution = solve_average_reward(TPM, TRM, 0, 1e-6, method=method)
+
+        assert isinstance(solution, AverageRewardSolution)
+        assert solution.converged
+        assert solution.g_lower - 1e-9 <= g_star <= solution.g_upper + 1e-9
+        assert solution.g == pytest.approx(g_star, abs=1e-5)
+
+    def test_span_stopping_certifies_gain(self):
+        """
+        Tests that the span rule stops with g_upper - g_lower below epsilon.
+        """
+        TPM, TRM = degradation_mdp(30, p=0.2)
+        solution = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-4, stopping="span")
+
+        assert solution.converged
+        assert solution.g_upper - solution.g_lower < 1e-4
+
+    def test_sparse_span_stopping(self):
+        """
+        Tests that the sparse solver honours the span rule and reports the same bounds as the dense solver.
+        """
+        TPM, TRM = random_mdp(20, 3, successors=4, seed=2)
+        dense = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-6, stopping="span")
+        sparse = relative_value_iteration_average_reward_sparse(SparseMDP.from_dense(TPM, TRM), 0, 1e-6, stopping="span")
+
+        assert sparse.iterations == dense.iterations
+        assert sparse.g_lower == pytest.approx(dense.g_lower)
+        assert sparse.g_upper == pytest.approx(dense.g_upper)
+
+    def test_budget_returns_latest_iterate(self):
+        """
+        Tests that stopping on the iteration budget returns the bias of the last sweep, consistent with g.
+        """
+        TPM, TRM = degradation_mdp(30, p=0.05)
+        solution = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-12, max_iterations=5)
+        previous = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-12, max_iterations=4)
+
+        assert not solution.converged
+        assert solution.iterations == 5
+        # h and g come from the same sweep: h + g = min_a Q(h_previous)
+        target = expected_cost_plus_next(TPM, TRM, previous.h)
+        assert solution.g == pytest.approx(target[0])
+        assert np.allclose(solution.h, target - solution.g)
+
+    def test_unknown_stopping_rule(self):
+        """
+        Tests that an unknown stopping rule raises ValueError.
+        """
+        TPM, TRM = random_mdp(4, 2)
+        with pytest.raises(ValueError):
+            relative_value_iteration_average_reward(TPM, TRM, 0, 1e-6, stopping="relative")
+
+
+class TestStablePolicySwitch:
+    """
+    Test suite for switching relative value iteration to an exact policy evaluation once the policy is stable.
+    """
+    def test_switch_matches_policy_iteration(self):
+        """
+        Tests that the switch ends with the optimal gain, policy and bias in fewer sweeps than plain RVI.
+        """
+        TPM, TRM = degradation_mdp(30, p=0.05)
+        h_star, g_star, pi_star, *_ = policy_iteration_average_reward(TPM, TRM, 0, 1e-12)
+        plain = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10, max_iterations=100000, max_time=60.0)
+        switched = relative_value_iteration_average_reward(
+            TPM, TRM, 0, 1e-10, max_iterations=100000, max_time=60.0, policy_window=3
+        )
+
+        assert switched.converged
+        assert switched.iterations < plain.iterations
+        assert switched.g == pytest.approx(g_star, abs=1e-9)
+        assert np.array_equal(switched.pi_star, pi_star)
+        assert np.allclose(switched.h, h_star, atol=1e-8)
+        assert switched.g_lower - 1e-9 <= g_star <= switched.g_upper + 1e-9
+
+    def test_reports_stable_iteration_and_time_saved(self):
+        """
+        Tests that the sweep the policy stabilized at and the time saved are reported only after a switch.
+        """
+        TPM, TRM = degradation_mdp(30, p=0.05)
+        plain = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10, max_iterations=100000, max_time=60.0)
+        switched = relative_value_iteration_average_reward(
+            TPM, TRM, 0, 1e-10, max_iterations=100000, max_time=60.0, policy_window=3
+        )
+
+        assert plain.policy_stable_iteration is None and plain.time_saved is None
+        assert 1 <= switched.policy_stable_iteration <= switched.iterations - 3
+        assert isinstance(switched.time_saved, float)
+
+    def test_window_longer_than_solve(self):
+        """
+        Tests that a window the policy never reaches leaves the solve identical to plain RVI.
+        """
+        TPM, TRM = random_mdp(10, 3, seed=5)
+        plain = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-8)
+        windowed = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-8, policy_window=10000)
+
+        assert windowed.iterations == plain.iterations
+        assert np.array_equal(windowed.h, plain.h)
+        assert windowed.policy_stable_iteration is None
+
+    def test_parallel_sweeps_switch(self):
+        """
+        Tests that the switch gives the same result when the sweeps run on a thread pool.
+        """
+        TPM, TRM = degradation_mdp(30, p=0.05)
+        serial = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10, max_time=60.0, policy_window=3)
+        parallel = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-10, max_time=60.0, policy_window=3, workers=3)
+
+        assert parallel.iterations == serial.iterations
+        assert parallel.policy_stable_iteration == serial.policy_stable_iteration
+        assert np.allclose(parallel.h, serial.h)
+
+    def test_ignored_by_other_methods(self):
+        """
+        Tests that solve_average_reward only applies policy_window to rvi.
+        """
+        TPM, TRM = degradation_mdp(20, p=0.1)
+        solution = solve_average_reward(TPM, TRM, 0, 1e-8, method="gauss_seidel", policy_window=2)
+
+        assert solution.converged
+        assert solution.policy_stable_iteration is None
+
+
+class TestDiscountedValueIteration:
+    """
+    Test suite for discounted value iteration with bounds-based stopping.
+    """
+    def test_discounted_matches_policy_evaluation(self):
+        """
+        Tests that v is within epsilon of the exact discounted cost of the returned policy.
+        """
+        TPM, TRM = random_mdp(10, 3, seed=5)
+        discount = 0.95
+        solution = value_iteration_discounted(TPM, TRM, discount, 1e-8)
+
+        states = np.arange(10)
+        P_pi = TPM[states, :, solution.pi_star]
+        c_pi = np.einsum("ij,ij->i", P_pi, TRM[states, :, solution.pi_star])
+        v_pi = np.linalg.solve(np.eye(10) - discount * P_pi, c_pi)
+
+        assert solution.converged
+        assert np.allclose(solution.v, v_pi, atol=1e-8)
+        assert np.all(solution.v_lower - 1e-9 <= v_pi)
+        assert np.all(v_pi <= solution.v_upper + 1e-9)
+        assert np.max(solution.v_upper - solution.v_lower) < 1e-8
+
+    def test_bounds_stop_before_classical_test(self):
+        """
+        Tests that the bounds test stops in far fewer sweeps than the classical max-norm test would need.
+        """
+        TPM, TRM = random_mdp(20, 3, seed=6)
+        discount, epsilon = 0.99, 1e-6
+        solution = value_iteration_discounted(TPM, TRM, discount, epsilon)
+
+        # ||T v - v|| < epsilon (1 - discount) / (2 discount) needs about log(.)/log(discount) sweeps
+        classical = np.log(epsilon * (1 - discount) / (2 * discount * TRM.max())) / np.log(discount)
+        assert solution.converged
+        assert solution.iterations < classical / 10
+
+    def test_sparse_matches_dense(self):
+        """
+        Tests that the sparse solver produces the same v and pi_star as the dense solver.
+        """
+        TPM, TRM = random_mdp(25, 3, successors=4, seed=3)
+        dense = value_iteration_discounted(TPM, TRM, 0.9, 1e-10)
+        sparse = value_iteration_discounted_sparse(SparseMDP.from_dense(TPM, TRM), 0.9, 1e-10)
+
+        assert np.allclose(sparse.v, dense.v)
+        assert np.array_equal(sparse.pi_star, dense.pi_star)
+
+    @pytest.mark.parametrize("discount", [0.0, 1.0, 1.5])
+    def test_invalid_discount(self, discount):
+        """
+        Tests that a discount factor outside (0, 1) raises ValueError.
+        """
+        TPM, TRM = random_mdp(4, 2)
+        with pytest.raises(ValueError):
+            value_iteration_discounted(TPM, TRM, discount, 1e-6)
+
+
+class TestFiniteHorizon:
+    """
+    Test suite for backward induction over a finite horizon.
+    """
+    def test_stages_match_full_table(self):
+        """
+        Tests the streamed stages against backward induction over a stored T x n table.
+        """
+        TPM, TRM = random_mdp(8, 3, seed=9)
+        horizon = 6
+        terminal = np.arange(8, dtype=float)
+
+        v = np.zeros((horizon + 1, 8))
+        v[horizon] = terminal
+        for t in range(horizon - 1, -1, -1):
+            v[t] = expected_cost_plus_next(TPM, TRM, v[t + 1])
+
+        stages = list(backward_induction_finite_horizon(TPM, TRM, horizon, terminal_cost=terminal))
+
+        assert [stage.stage for stage in stages] == list(range(horizon - 1, -1, -1))
+        for stage in stages:
+            assert np.allclose(stage.v, v[stage.stage])
+
+    def test_long_horizon_approaches_gain(self):
+        """
+        Tests that v_0 / T approaches the optimal average cost as the horizon grows.
+        """
+        TPM, TRM = random_mdp(6, 2, seed=2)
+        _, g, _, _, _, *_ = relative_value_iteration_average_reward(TPM, TRM, 0, 1e-12)
+
+        for stage in backward_induction_finite_horizon(TPM, TRM, 2000):
+            pass
+
+        assert stage.stage == 0
+        assert np.allclose(stage.v / 2000, g, atol=1e-3)
+
+    def test_invalid_arguments_raise_on_call(self):
+        """
+        Tests that an invalid horizon or terminal cost raises before any stage is requested.
+        """
+        TPM, TRM = random_mdp(4, 2)
+        with pytest.raises(ValueError):
+            backward_induction_finite_horizon(TPM, TRM, 0)
+        with pytest.raises(ValueError):
+            backward_induction_finite_horizon(TPM, TRM, 5, terminal_cost=[0.0, 1.0])
+
+
+class TestValidateTpmStochastic:
+    def test_validate_tpm_negative(self):
+        """
+        Tests the validate_tpm_stochastic function with a negative probability.
+        """
+        TPM, _ = random_mdp(3, 2)
+        TPM[0, 0, 0] = -0.1
+        with pytest.raises(ValueError):
+            validate_tpm_stochastic(TPM)
+
+    def test_validate_tpm_not_square(self):
+        """
+        Tests the validate_tpm_stochastic function with a non-square TPM.
+        """
+        with pytest.raises(ValueError):
+            validate_tpm_stochastic(np.ones((2, 3, 1)) / 3)
+
+    def test_validate_tpm_row_sum(self):
+        """
+        Tests the validate_tpm_stochastic function with a row that does not sum to 1.
+        """
+        TPM, _ = random_mdp(3, 2)
+        TPM[2, :, 1] *= 2
+        with pytest.raises(ValueError, match="state 2, action 1"):
+            validate_tpm_stochastic(TPM)
+
+    @pytest.mark.parametrize("value", [np.nan, np.inf, -np.inf])
+    def test_validate_tpm_non_finite(self, value):
+        """
+        Tests the validate_tpm_stochastic function with a NaN or infinite probability.
+        """
+        TPM, _ = random_mdp(3, 2)
+        TPM[1, 2, 0] = value
+        with pytest.raises(ValueError, match=r"non-finite value at index \(1, 2, 0\)"):
+            validate_tpm_stochastic(TPM)
@@ -0,0 +1,170 @@
+import numpy as np
+import pytest
+from app.blocked_mdp import BlockedMDP
+from app.markov_decisions import relative_value_iteration_average_reward
+from app.model_registry import ModelRegistry, compact_model, model_nbytes
+from app.sparse_mdp import SparseMDP
+
+
+def dense_model(n, A=2, seed=0):
+    rng = np.random.default_rng(seed)
+    TPM = rng.random((n, n, A))
+    TPM /= TPM.sum(axis=1, keepdims=True)
+    return TPM, rng.random((n, n, A))
+
+
+def sparse_model(n, A=2, seed=0):
+    """Each state moves to itself or its successor."""
+    rng = np.random.default_rng(seed)
+    TPM = np.zeros((n, n, A))
+    p = rng.uniform(0.1, 0.9, size=(n, A))
+    states = np.arange(n)
+    for a in range(A):
+        TPM[states, states, a] = 1 - p[:, a]
+        TPM[states, (states + 1) % n, a] += p[:, a]
+    return TPM, rng.random((n, n, A))
+
+
+class TestCompactModel:
+    """
+    Test suite for the compact storage form of registered models.
+    """
+    def test_sparse_model_stored_sparse(self):
+        """
+        Tests that a sparse TPM is stored as a SparseMDP that takes less memory than the dense tensors.
+        """
+        TPM, TRM = sparse_model(50)
+        mdp = compact_model(TPM, TRM)
+
+        assert isinstance(mdp, SparseMDP)
+        assert model_nbytes(mdp) < TPM.nbytes + TRM.nbytes
+
+    def test_dense_model_stored_dense(self):
+        """
+        Tests that a dense TPM is stored as a BlockedMDP with the same expected cost.
+        """
+        TPM, TRM = dense_model(10)
+        mdp = compact_model(TPM, TRM)
+
+        assert isinstance(mdp, BlockedMDP)
+        assert np.allclose(mdp.expected_cost, np.einsum("ija,ija->ia", TPM, TRM))
+
+
+class TestModelRegistry:
+    """
+    Test suite for the ModelRegistry class.
+    """
+    def test_register_is_idempotent(self):
+        """
+        Tests that the model id is a content hash, so the same model registers once.
+        """
+        registry = ModelRegistry()
+        TPM, TRM = dense_model(5)
+        first = registry.register(TPM, TRM)
+        second = registry.register(TPM.copy(), TRM.copy())
+
+        assert first["model_id"] == second["model_id"]
+        assert registry.stats()["models"] == 1
+        assert first["location"] == "memory"
+
+    def test_get_unknown_model(self):
+        """
+        Tests that an unknown id raises KeyError.
+        """
+        with pytest.raises(KeyError):
+            ModelRegistry().get("missing")
+
+    def test_evicts_least_recently_used_without_spill(self):
+        """
+        Tests that without a spill directory the least recently used model is forgotten.
+        """
+        models = [dense_model(8, seed=s) for s in range(3)]
+        size = model_nbytes(compact_model(*models[0]))
+        registry = ModelRegistry(max_bytes=2 * size)
+
+        a = registry.register(*models[0])["model_id"]
+        b = registry.register(*models[1])["model_id"]
+        registry.get(a)
+        c = registry.register(*models[2])["model_id"]
+
+        with pytest.raises(KeyError):
+            registry.get(b)
+        assert registry.get(a) is not None
+        assert registry.get(c) is not None
+        assert registry.stats()["evictions"] == 1
+
+    def test_rejects_oversized_model_without_spill(self):
+        """
+        Tests that a model larger than the memory bound is rejected when it cannot be spilled.
+        """
+        registry = ModelRegistry(max_bytes=100)
+        with pytest.raises(ValueError):
+            registry.register(*dense_model(8))
+
+    @pytest.mark.parametrize("make_model", [dense_model, sparse_model])
+    def test_spill_and_reload(self, tmp_path, make_model):
+        """
+        Tests that evicted models are spilled to disk and reloaded with the same solution.
+        """
+        first, second = make_model(20, seed=1), make_model(20, seed=2)
+        size = model_nbytes(compact_model(*first))
+        registry = ModelRegistry(max_bytes=size, spill_dir=tmp_path)
+
+        model_id = registry.register(*first)["model_id"]
+        registry.register(*second)
+        assert registry.info(model_id)["location"] == "disk"
+
+        mdp = registry.get(model_id)
+        assert registry.stats()["reloads"] == 1
+        assert np.allclose(mdp.expected_cost, compact_model(*first).expected_cost)
+
+        expected = relative_value_iteration_average_reward(*first, 0, 1e-10)
+        assert np.allclose(mdp.bellman_q(expected.h).min(axis=1) - expected.h, expected.g)
+
+    def test_spilled_dense_model_reloads_memory_mapped(self, tmp_path):
+        """
+        Tests that a spilled dense model is solved from a memory map and only its expected cost counts as memory.
+        """
+        first, second = dense_model(20, seed=1), dense_model(20, seed=2)
+        compact = compact_model(*first)
+        # Room for one model held in memory plus the expected cost of a mapped one
+        registry = ModelRegistry(max_bytes=model_nbytes(compact) + compact.expected_cost.nbytes, spill_dir=tmp_path)
+
+        model_id = registry.register(*first)["model_id"]
+        registry.register(*second)
+        mdp = registry.get(model_id)
+
+        assert isinstance(mdp.TPM, np.memmap) and isinstance(mdp.TRM, np.memmap)
+        assert model_nbytes(mdp) == mdp.expected_cost.nbytes
+        assert registry.info(model_id)["location"] == "disk"
+        # Mapping the spilled model back does not push the other model out of memory
+        assert registry.stats()["in_memory"] == 2
+
+    def test_reloaded_sparse_model_in_memory(self, tmp_path):
+        """
+        Tests that a spilled sparse model is read back into memory.
+        """
+        first, second = sparse_model(20, seed=1), sparse_model(20, seed=2)
+        size = model_nbytes(compact_model(*first))
+        registry = ModelRegistry(max_bytes=2 * size, spill_dir=tmp_path)
+
+        model_id = registry.register(*first)["model_id"]
+        registry.register(*second)
+        registry.register(*sparse_model(20, seed=3))
+        assert registry.info(model_id)["location"] == "disk"
+
+        registry.get(model_id)
+        assert registry.info(model_id)["location"] == "memory"
+
+    def test_delete_removes_spilled_files(self, tmp_path):
+        """
+        Tests that deleting a model frees its memory and removes its spilled copy.
+        """
+        registry = ModelRegistry(max_bytes=1, spill_dir=tmp_path)
+        model_id = registry.register(*dense_model(4))["model_id"]
+        assert (tmp_path / model_id / "TPM.npy").exists()
+
+        assert registry.delete(model_id)
+        assert not (tmp_path / model_id).exists()
+        assert not registry.delete(model_id)
+        assert registry.stats()["bytes"] == 0
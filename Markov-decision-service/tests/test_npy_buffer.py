@@ -0,0 +1,68 @@
+import io
+import numpy as np
+import pytest
+from app.npy_buffer import read_npy, read_npy_arrays
+
+
+def npy_bytes(*arrays, version=None):
+    buffer = io.BytesIO()
+    for array in arrays:
+        if version is None:
+            np.save(buffer, array)
+        else:
+            np.lib.format.write_array(buffer, array, version=version)
+    return buffer.getvalue()
+
+
+class TestReadNpy:
+    """
+    Test suite for reading .npy arrays from an in-memory buffer.
+    """
+    def test_read_npy_round_trip(self):
+        """
+        Tests that arrays written with np.save read back equal, as read-only views into the buffer.
+        """
+        TPM = np.random.default_rng(0).random((4, 4, 2))
+        TRM = np.arange(32.0).reshape(4, 4, 2)
+        body = npy_bytes(TPM, TRM)
+
+        tpm, trm = read_npy_arrays(body, 2)
+
+        assert np.array_equal(tpm, TPM)
+        assert np.array_equal(trm, TRM)
+        assert not tpm.flags.writeable
+        assert np.shares_memory(tpm, np.frombuffer(body, dtype=np.uint8))
+
+    @pytest.mark.parametrize("version", [(1, 0), (2, 0)])
+    def test_read_npy_format_versions(self, version):
+        """
+        Tests that format versions 1.0 and 2.0 are both supported.
+        """
+        array = np.arange(6, dtype=np.int32).reshape(2, 3)
+        result, end = read_npy(npy_bytes(array, version=version))
+        assert np.array_equal(result, array)
+        assert end == len(npy_bytes(array, version=version))
+
+    def test_read_npy_fortran_order(self):
+        """
+        Tests that Fortran-ordered arrays keep their logical layout.
+        """
+        array = np.asfortranarray(np.arange(12.0).reshape(3, 4))
+        result, _ = read_npy(npy_bytes(array))
+        assert np.array_equal(result, array)
+
+    def test_read_npy_rejects_invalid_input(self):
+        """
+        Tests that bad magic bytes, truncated data, object dtypes and trailing bytes raise ValueError.
+        """
+        body = npy_bytes(np.zeros(4))
+        with pytest.raises(ValueError):
+            read_npy(b"not an npy file")
+        with pytest.raises(ValueError):
+            read_npy(body[:-1])
+        with pytest.raises(ValueError):
+            read_npy(npy_bytes(np.array(["a", "b"])))
+        with pytest.raises(ValueError):
+            read_npy_arrays(body + b"\x00", 1)
+        with pytest.raises(ValueError):
+            read_npy_arrays(body, 2)
@@ -0,0 +1,95 @@
+import gzip
+import numpy as np
+import orjson
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app.responses import CompressionMiddleware, NumpyJSONResponse, accepted_encodings, dumps
+
+
+def compression_app():
+    app = FastAPI(default_response_class=NumpyJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    def large():
+        return NumpyJSONResponse({"h": np.linspace(0, 1, 500)})
+
+    @app.get("/small")
+    def small():
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((b"x" * 200 for _ in range(3)), media_type="application/x-ndjson")
+
+    return app
+
+
+class TestNumpyJSON:
+    """
+    Test suite for orjson rendering of NumPy values.
+    """
+    def test_dumps_numpy_values(self):
+        """
+        Tests that arrays, NumPy scalars and non-contiguous views serialize like their Python equivalents.
+        """
+        content = {
+            "h": np.array([0.0, 1.5]),
+            "pi": np.array([1, 0]),
+            "g": np.float64(2.5),
+            "converged": np.bool_(True),
+            "column": np.arange(6.0).reshape(2, 3)[:, 1],
+        }
+        assert orjson.loads(dumps(content)) == {
+            "h": [0.0, 1.5], "pi": [1, 0], "g": 2.5, "converged": True, "column": [1.0, 4.0]
+        }
+
+    def test_accepted_encodings(self):
+        """
+        Tests Accept-Encoding parsing, including q-values that refuse a coding.
+        """
+        assert accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+        assert accepted_encodings("zstd;q=0, gzip;q=0.5") == {"gzip"}
+        assert accepted_encodings("") == set()
+
+
+class TestCompressionMiddleware:
+    """
+    Test suite for Accept-Encoding negotiated response compression.
+    """
+    def test_gzip_large_response(self):
+        """
+        Tests that a large body is gzipped when the client accepts gzip, and decodes to the original JSON.
+        """
+        client = TestClient(compression_app())
+        response = client.get("/large", headers={"accept-encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in response.headers["vary"].lower()
+        assert len(response.json()["h"]) == 500
+
+    def test_no_compression_when_not_accepted(self):
+        """
+        Tests that identity clients and small bodies are served uncompressed.
+        """
+        client = TestClient(compression_app())
+        assert "content-encoding" not in client.get("/large", headers={"accept-encoding": "identity"}).headers
+        assert "content-encoding" not in client.get("/small", headers={"accept-encoding": "gzip"}).headers
+
+    def test_streaming_passthrough(self):
+        """
+        Tests that streamed bodies are passed through chunk by chunk without compression.
+        """
+        client = TestClient(compression_app())
+        response = client.get("/stream", headers={"accept-encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.content == b"x" * 600
+
+    def test_compress_round_trip(self):
+        """
+        Tests that gzip output decompresses to the original body.
+        """
+        middleware = CompressionMiddleware(None)
+        body = b'{"h": [0.0, 1.0]}' * 100
+        assert gzip.decompress(middleware.compress(body, "gzip")) == body
@@ -0,0 +1,86 @@
+import time
+import numpy as np
+from app.solution_cache import SolutionCache, solution_key
+
+
+def solution(n):
+    return (np.zeros(n), 0.5, np.zeros(n, dtype=int), 10, True)
+
+
+class TestSolutionKey:
+    """
+    Test suite for the solution_key function.
+    """
+    def test_solution_key_identical_content(self):
+        """
+        Tests that equal tensors and parameters hash to the same key regardless of dtype or layout.
+        """
+        TPM = np.full((2, 2, 1), 0.5)
+        key_a = solution_key(TPM, s_ref=0, epsilon=1e-6)
+        key_b = solution_key(np.asfortranarray(TPM.tolist()), epsilon=1e-6, s_ref=0)
+        assert key_a == key_b
+
+    def test_solution_key_parameter_change(self):
+        """
+        Tests that changing a parameter or a single tensor entry changes the key.
+        """
+        TPM = np.full((2, 2, 1), 0.5)
+        other = TPM.copy()
+        other[0, 0, 0] = 0.4
+        assert solution_key(TPM, s_ref=0) != solution_key(TPM, s_ref=1)
+        assert solution_key(TPM, s_ref=0) != solution_key(other, s_ref=0)
+
+    def test_solution_key_shape(self):
+        """
+        Tests that tensors with the same bytes but different shapes hash differently.
+        """
+        data = np.arange(4.0)
+        assert solution_key(data.reshape(2, 2)) != solution_key(data.reshape(4, 1))
+
+
+class TestSolutionCache:
+    """
+    Test suite for the SolutionCache class.
+    """
+    def test_cache_hit_and_miss_counters(self):
+        cache = SolutionCache()
+        assert cache.get("a") is None
+        cache.put("a", solution(3))
+        assert cache.get("a") is not None
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = SolutionCache(max_entries=2)
+        cache.put("a", solution(3))
+        cache.put("b", solution(3))
+        cache.get("a")
+        cache.put("c", solution(3))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_cache_memory_bound(self):
+        cache = SolutionCache(max_bytes=2 * solution(100)[0].nbytes * 2)
+        cache.put("a", solution(100))
+        cache.put("b", solution(100))
+        cache.put("c", solution(100))
+
+        assert cache.stats()["entries"] == 2
+        assert cache.stats()["bytes"] <= cache.max_bytes
+
+    def test_cache_skips_oversized_value(self):
+        cache = SolutionCache(max_bytes=10)
+        cache.put("a", solution(100))
+        assert cache.stats()["entries"] == 0
+
+    def test_cache_ttl_expiry(self):
+        cache = SolutionCache(ttl_seconds=0.01)
+        cache.put("a", solution(3))
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert cache.stats()["entries"] == 0
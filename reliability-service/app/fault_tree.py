@@ -0,0 +1,441 @@
+from typing import Optional
+
+import numpy as np
+
+GATE_TYPES = ("and", "or", "kofn")
+
+# Terminal node ids of every BDD
+FALSE, TRUE = 0, 1
+
+
+class BDD:
+    """
+    Reduced ordered binary decision diagram over variables 0..n_vars-1, tested in that order.
+
+    Nodes are integers: 0 and 1 are the terminals, every other node is the
+    triple (var[node], low[node], high[node]) read as "if var then high else
+    low". The unique table maps each triple to its node, so equal functions
+    are the same node; the computed table caches the results of apply so that
+    each pair of nodes is combined once per operation. Children are always
+    created before their parents, so node ids are a topological order.
+    """
+
+    def __init__(self, n_vars: int):
+        self.n_vars = n_vars
+        # Terminals sit below every variable
+        self.var = [n_vars, n_vars]
+        self.low = [FALSE, TRUE]
+        self.high = [FALSE, TRUE]
+        self._unique: dict[tuple[int, int, int], int] = {}
+        self._computed: dict[tuple[str, int, int], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.var)
+
+    def variable(self, v: int) -> int:
+        """The function that is true exactly when variable v is."""
+        return self.node(v, FALSE, TRUE)
+
+    def node(self, v: int, low: int, high: int) -> int:
+        """The node (v, low, high), reduced and shared through the unique table."""
+        if low == high:
+            return low
+        key = (v, low, high)
+        node = self._unique.get(key)
+        if node is None:
+            node = self._unique[key] = len(self.var)
+            self.var.append(v)
+            self.low.append(low)
+            self.high.append(high)
+        return node
+
+    def apply(self, op: str, f: int, g: int) -> int:
+        """
+        f AND g (op "and") or f OR g (op "or").
+
+        The Shannon expansion is evaluated with an explicit stack instead of
+        recursion, so the depth of the diagram is not limited by the Python
+        recursion limit.
+        """
+        result = self._lookup(op, f, g)
+        if result is not None:
+            return result
+
+        stack = [(f, g)]
+        while stack:
+            f, g = stack[-1]
+            if self._lookup(op, f, g) is not None:
+                stack.pop()
+                continue
+
+            v = min(self.var[f], self.var[g])
+            f0, f1 = (self.low[f], self.high[f]) if self.var[f] == v else (f, f)
+            g0, g1 = (self.low[g], self.high[g]) if self.var[g] == v else (g, g)
+            low = self._lookup(op, f0, g0)
+            high = self._lookup(op, f1, g1)
+            if low is None or high is None:
+                if low is None:
+                    stack.append((f0, g0))
+                if high is None:
+                    stack.append((f1, g1))
+                continue
+
+            self._computed[(op, *sorted((f, g)))] = self.node(v, low, high)
+            stack.pop()
+
+        return self._lookup(op, f, g)
+
+    def apply_all(self, op: str, nodes: list[int]) -> int:
+        """Combine many nodes with op, pairwise as a balanced tree to keep intermediate diagrams small."""
+        nodes = list(nodes)
+        while len(nodes) > 1:
+            paired = [self.apply(op, nodes[i], nodes[i + 1]) for i in range(0, len(nodes) - 1, 2)]
+            nodes = paired + nodes[len(nodes) - len(nodes) % 2:]
+        return nodes[0]
+
+    def at_least(self, k: int, nodes: list[int]) -> int:
+        """
+        True when at least k of the functions are. Built with the recurrence
+        T(j, i) = T(j, i - 1) OR (f_i AND T(j - 1, i - 1)) in O(k n) applies.
+        """
+        # at_least[j] = at least j of the functions seen so far
+        at_least = [TRUE] + [FALSE] * k
+        for f in nodes:
+            for j in range(k, 0, -1):
+                at_least[j] = self.apply("or", at_least[j], self.apply("and", f, at_least[j - 1]))
+        return at_least[k]
+
+    def reachable(self, root: int) -> list[int]:
+        """Non-terminal nodes reachable from root, children before parents."""
+        seen = set()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node > TRUE and node not in seen:
+                seen.add(node)
+                stack.extend((self.low[node], self.high[node]))
+        return sorted(seen)
+
+    def _lookup(self, op: str, f: int, g: int) -> Optional[int]:
+        """Result of a terminal case or of an earlier apply, or None if it must be computed."""
+        if op == "and":
+            if f == FALSE or g == FALSE:
+                return FALSE
+            if f == TRUE:
+                return g
+            if g == TRUE:
+                return f
+        else:
+            if f == TRUE or g == TRUE:
+                return TRUE
+            if f == FALSE:
+                return g
+            if g == FALSE:
+                return f
+        if f == g:
+            return f
+        return self._computed.get((op, *sorted((f, g))))
+
+
+class ZDD:
+    """
+    Zero-suppressed decision diagram representing a family of sets of
+    variables 0..n_vars-1, used for the minimal cut sets of a fault tree.
+
+    Node 0 is the empty family and node 1 the family holding only the empty
+    set; every other node (var, low, high) is the sets of low together with
+    {var} added to each set of high. A node whose high branch is the empty
+    family is never created, so families of small sets stay small however
+    many variables there are.
+    """
+
+    def __init__(self, n_vars: int):
+        self.n_vars = n_vars
+        self.var = [n_vars, n_vars]
+        self.low = [FALSE, TRUE]
+        self.high = [FALSE, TRUE]
+        # Whether the family holds the empty set, i.e. the low chain ends at node 1
+        self.has_empty_set = [False, True]
+        self._unique: dict[tuple[int, int, int], int] = {}
+        self._without: dict[tuple[int, int], int] = {}
+
+    def node(self, v: int, low: int, high: int) -> int:
+        if high == FALSE:
+            return low
+        key = (v, low, high)
+        node = self._unique.get(key)
+        if node is None:
+            node = self._unique[key] = len(self.var)
+            self.var.append(v)
+            self.low.append(low)
+            self.high.append(high)
+            self.has_empty_set.append(self.has_empty_set[low])
+        return node
+
+    def without(self, f: int, g: int) -> int:
+        """
+        The sets of f that contain no set of g, evaluated with an explicit
+        stack like BDD.apply.
+        """
+        result = self._without_lookup(f, g)
+        if result is not None:
+            return result
+
+        var, low, high = self.var, self.low, self.high
+        stack = [(f, g)]
+        while stack:
+            f, g = stack[-1]
+            if self._without_lookup(f, g) is not None:
+                stack.pop()
+                continue
+
+            if var[f] > var[g]:
+                # No set of f holds g's variable, so only the sets of g without it matter
+                needed = [(f, low[g])]
+            elif var[f] < var[g]:
+                needed = [(low[f], g), (high[f], g)]
+            else:
+                needed = [(low[f], low[g]), (high[f], low[g])]
+                inner = self._without_lookup(high[f], low[g])
+                if inner is not None:
+                    # {v} + s contains a set of g if s contains one without v or one with v removed
+                    needed.append((inner, high[g]))
+
+            missing = [pair for pair in needed if self._without_lookup(*pair) is None]
+            if missing:
+                stack.extend(missing)
+                continue
+
+            if var[f] > var[g]:
+                result = self._without_lookup(f, low[g])
+            elif var[f] < var[g]:
+                result = self.node(var[f], self._without_lookup(low[f], g), self._without_lookup(high[f], g))
+            else:
+                result = self.node(var[f], self._without_lookup(*needed[0]), self._without_lookup(*needed[2]))
+            self._without[(f, g)] = result
+            stack.pop()
+
+        return self._without_lookup(f, g)
+
+    def sets(self, root: int, max_order: Optional[int] = None, max_sets: Optional[int] = None) -> list[tuple[int, ...]]:
+        """
+        The sets of the family, skipping those with more than max_order elements.
+
+        Raises:
+        ValueError: if there are more than max_sets of them.
+        """
+        found = []
+        stack = [(root, ())]
+        while stack:
+            node, prefix = stack.pop()
+            if node == TRUE:
+                found.append(prefix)
+                if max_sets is not None and len(found) > max_sets:
+                    raise ValueError(f"The family has more than {max_sets} sets.")
+            elif node > TRUE:
+                stack.append((self.low[node], prefix))
+                if max_order is None or len(prefix) < max_order:
+                    stack.append((self.high[node], prefix + (self.var[node],)))
+        return found
+
+    def _without_lookup(self, f: int, g: int) -> Optional[int]:
+        if g == FALSE or f == FALSE:
+            return f
+        if f == g:
+            return FALSE
+        if self.has_empty_set[g]:
+            return FALSE
+        if f == TRUE:
+            return TRUE
+        return self._without.get((f, g))
+
+
+class FaultTree:
+    """
+    Fault tree compiled into a binary decision diagram (BDD).
+
+    The tree is given as named basic events with their probabilities and
+    named gates ("and", "or" or "kofn" with min_required) whose inputs are
+    basic events or other gates. Inputs may be shared between gates, so the
+    tree is a directed acyclic graph. Each gate is compiled once.
+
+    The BDD represents the top event exactly. Repeated basic events are
+    handled correctly, and the cost grows with the size of the diagram
+    rather than with the number of cut sets, as it would for
+    inclusion-exclusion. Variables are ordered by first appearance in a
+    depth-first walk from the top gate, which keeps related events adjacent.
+    Basic events and gates that the top event does not depend on are ignored.
+
+    Ground Rules, Assumptions, and Limitations:
+    1. Basic events are independent.
+    2. The tree is coherent (no NOT gates), which minimal cut sets and the importance measures assume.
+
+    Raises:
+    ValueError: if a probability is outside [0, 1], an input is unknown, a
+        kofn gate's min_required is out of range, or the gates form a cycle.
+    """
+
+    def __init__(self, basic_events: dict[str, float], gates: dict[str, dict], top: str):
+        for name, probability in basic_events.items():
+            if not 0 <= probability <= 1:
+                raise ValueError(f"Probability of basic event {name!r} must be between 0 and 1.")
+        for name in gates:
+            if name in basic_events:
+                raise ValueError(f"{name!r} is both a basic event and a gate.")
+        if top not in gates and top not in basic_events:
+            raise ValueError(f"Top event {top!r} is not a gate or basic event.")
+
+        order = _gate_order(gates, basic_events, top)
+        self.events = [name for name in order if name in basic_events]
+        self.probabilities = np.array([basic_events[name] for name in self.events], dtype=float)
+
+        self.bdd = BDD(len(self.events))
+        compiled = {name: self.bdd.variable(v) for v, name in enumerate(self.events)}
+        for name in order:
+            if name in gates:
+                compiled[name] = self._compile_gate(name, gates[name], compiled)
+        self.top = compiled[top]
+
+        # The diagram of the top event, children before parents; it does not change after compilation
+        self.nodes = self.bdd.reachable(self.top)
+        self._probability: Optional[np.ndarray] = None
+
+    def _compile_gate(self, name: str, gate: dict, compiled: dict[str, int]) -> int:
+        inputs = [compiled[child] for child in gate["inputs"]]
+        if gate["type"] == "kofn":
+            k = gate.get("min_required")
+            if not isinstance(k, int) or not 1 <= k <= len(inputs):
+                raise ValueError(f"Gate {name!r}: min_required must be between 1 and the number of inputs.")
+            return self.bdd.at_least(k, inputs)
+        return self.bdd.apply_all(gate["type"], inputs)
+
+    def top_event_probability(self) -> float:
+        """Exact probability of the top event."""
+        return float(self._node_probabilities()[self.top])
+
+    def birnbaum_importance(self) -> dict[str, float]:
+        """
+        Birnbaum importance of every basic event,
+        I_B(i) = P(top | i occurs) - P(top | i does not occur) = dP(top)/dp_i.
+
+        One pass down the diagram accumulates the probability of reaching each
+        node; then dP/dp_i sums, over the nodes testing i, the probability
+        of reaching the node times P(high) - P(low).
+        """
+        probability = self._node_probabilities()
+        reach = {node: 0.0 for node in self.nodes}
+        if self.top in reach:
+            reach[self.top] = 1.0
+
+        birnbaum = np.zeros(len(self.events))
+        var, low, high = self.bdd.var, self.bdd.low, self.bdd.high
+        # Parents have larger ids than their children
+        for node in sorted(reach, reverse=True):
+            v = var[node]
+            p = self.probabilities[v]
+            birnbaum[v] += reach[node] * (probability[high[node]] - probability[low[node]])
+            if low[node] in reach:
+                reach[low[node]] += reach[node] * (1 - p)
+            if high[node] in reach:
+                reach[high[node]] += reach[node] * p
+        return dict(zip(self.events, birnbaum.tolist()))
+
+    def fussell_vesely_importance(self, birnbaum: Optional[dict[str, float]] = None) -> dict[str, float]:
+        """
+        Fussell-Vesely importance of every basic event: the fraction of the
+        top event probability removed when the event cannot occur,
+        (P(top) - P(top | p_i = 0)) / P(top) = p_i * I_B(i) / P(top).
+        All zeros when the top event cannot occur.
+
+        Pass the result of birnbaum_importance when it is already known to
+        avoid another pass over the diagram.
+        """
+        top = self.top_event_probability()
+        if birnbaum is None:
+            birnbaum = self.birnbaum_importance()
+        return {
+            name: (p * birnbaum[name] / top if top > 0 else 0.0)
+            for name, p in zip(self.events, self.probabilities.tolist())
+        }
+
+    def minimal_cut_sets(self, max_order: Optional[int] = None, max_cut_sets: int = 100_000) -> list[tuple[str, ...]]:
+        """
+        Minimal cut sets of the top event, sorted by order and then by name.
+
+        The minimal cut sets are built as a ZDD bottom-up over the BDD
+        (Rauzy's algorithm): for a node testing event v they are those of the
+        low branch, plus {v} added to each minimal cut set of the high branch
+        that contains none of the low branch. Cut sets with more than
+        max_order events are dropped.
+
+        Raises:
+        ValueError: if there are more than max_cut_sets minimal cut sets.
+        """
+        var, low, high = self.bdd.var, self.bdd.low, self.bdd.high
+        zdd = ZDD(len(self.events))
+        minimal = {FALSE: FALSE, TRUE: TRUE}
+        for node in self.nodes:
+            without_low = minimal[low[node]]
+            minimal[node] = zdd.node(var[node], without_low, zdd.without(minimal[high[node]], without_low))
+
+        try:
+            cut_sets = zdd.sets(minimal[self.top], max_order, max_cut_sets)
+        except ValueError:
+            raise ValueError(f"The top event has more than {max_cut_sets} minimal cut sets; set a max_order.")
+        named = [tuple(sorted(self.events[v] for v in c)) for c in cut_sets]
+        return sorted(named, key=lambda c: (len(c), c))
+
+    def _node_probabilities(self) -> np.ndarray:
+        """P(function of node is true) for every node, terminals included, computed once per tree."""
+        if self._probability is None:
+            var, low, high = self.bdd.var, self.bdd.low, self.bdd.high
+            probability = np.zeros(len(self.bdd))
+            probability[TRUE] = 1.0
+            for node in self.nodes:
+                p = self.probabilities[var[node]]
+                probability[node] = p * probability[high[node]] + (1 - p) * probability[low[node]]
+            self._probability = probability
+        return self._probability
+
+
+def _gate_order(gates: dict[str, dict], basic_events: dict[str, float], top: str) -> list[str]:
+    """
+    Basic events and gates reachable from top, inputs before the gates that
+    use them (depth-first post-order), found without recursion.
+
+    Raises:
+    ValueError: on unknown inputs, gates without inputs or cycles.
+    """
+    order = []
+    state: dict[str, str] = {}
+    stack = [(top, False)]
+    while stack:
+        name, expanded = stack.pop()
+        if expanded:
+            state[name] = "done"
+            order.append(name)
+            continue
+        if state.get(name) == "done":
+            continue
+        if state.get(name) == "active":
+            # Only the gates on the current path are active, so name is its own input
+            raise ValueError(f"Gate {name!r} is part of a cycle.")
+
+        if name in basic_events:
+            state[name] = "done"
+            order.append(name)
+            continue
+        if name not in gates:
+            raise ValueError(f"Unknown gate or basic event {name!r}.")
+
+        gate = gates[name]
+        if gate.get("type") not in GATE_TYPES:
+            raise ValueError(f"Gate {name!r} must have a type in {GATE_TYPES}.")
+        if not gate.get("inputs"):
+            raise ValueError(f"Gate {name!r} needs at least one input.")
+
+        state[name] = "active"
+        stack.append((name, True))
+        for child in reversed(gate["inputs"]):
+            stack.append((child, False))
+    return order
@@ -1,25 +1,43 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from logging import getLogger
+import numpy as np
 
 from app.models import (
     ExponentialReliabilityRequest,
     ExponentialReliabilityResponse,
+    ExponentialReliabilityBatchRequest,
+    ExponentialReliabilityBatchResponse,
     MtbfConversionRequest,
     MtbfConversionResponse,
+    MtbfConversionBatchRequest,
+    MtbfConversionBatchResponse,
     SeriesSystemRequest,
     SeriesSystemResponse,
     KofNSystemRequest,
     KofNSystemResponse,
+    KofNSystemBatchRequest,
+    KofNSystemBatchResponse,
+    RBDRequest,
+    RBDResponse,
+    FaultTreeRequest,
+    FaultTreeResponse,
 )
 
 from app.reliability import (
     exponential_reliability,
+    exponential_reliability_batch,
     mtbf_failure_rate_convert,
+    mtbf_failure_rate_convert_batch,
     series_system_reliability,
     kofn_system_reliability,
+    kofn_system_reliabilities,
 )
 
+from app.rbd import evaluate_rbd
+from app.fault_tree import FaultTree
+
 from app.logging_config import setup_logging
+from app.responses import CompressionMiddleware, NumpyJSONResponse
 
 
 # -----------------------------
@@ -33,8 +51,12 @@ app = FastAPI(
     title="Reliability Service",
     description="A microservice providing reliability engineering calculations.",
     version="0.1.0",
+    default_response_class=NumpyJSONResponse,
 )
 
+# gzip (or zstd when available) for large complete responses, negotiated by Accept-Encoding
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 
 # -----------------------------
 # Health Check
@@ -63,6 +85,27 @@ def convert_mtbf(req: MtbfConversionRequest):
     return MtbfConversionResponse(converted_value=result)
 
 
+@app.post("/reliability/exponential/batch", response_model=ExponentialReliabilityBatchResponse)
+def compute_exponential_batch(req: ExponentialReliabilityBatchRequest):
+    logger.info(f"Computing exponential reliability surface: {len(req.failure_rates)} x {len(req.mission_times)}")
+    try:
+        result = exponential_reliability_batch(req.failure_rates, req.mission_times)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    # Returning the response directly lets orjson serialize the array without .tolist()
+    return NumpyJSONResponse({"reliability": result})
+
+
+@app.post("/reliability/mtbf-convert/batch", response_model=MtbfConversionBatchResponse)
+def convert_mtbf_batch(req: MtbfConversionBatchRequest):
+    logger.info(f"Converting {len(req.values)} MTBF/failure rate values")
+    try:
+        result = mtbf_failure_rate_convert_batch(req.values)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return NumpyJSONResponse({"converted_values": result})
+
+
 @app.post("/reliability/series", response_model=SeriesSystemResponse)
 def compute_series(req: SeriesSystemRequest):
     logger.info("Computing series system reliability")
@@ -76,6 +119,59 @@ def compute_kofn(req: KofNSystemRequest):
     result = kofn_system_reliability(req.component_reliabilities, req.min_required)
     return KofNSystemResponse(reliability=result)
 
+
+@app.post("/reliability/kofn/batch", response_model=KofNSystemBatchResponse)
+def compute_kofn_batch(req: KofNSystemBatchRequest):
+    n = len(req.component_reliabilities)
+    logger.info(f"Computing k-of-n system reliability for n={n}")
+    min_required = np.arange(1, n + 1) if req.min_required is None else np.asarray(req.min_required)
+    try:
+        result = kofn_system_reliabilities(req.component_reliabilities, min_required)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return NumpyJSONResponse({"min_required": min_required, "reliability": result})
+
+
+@app.post("/reliability/rbd", response_model=RBDResponse)
+def compute_rbd(req: RBDRequest):
+    logger.info("Evaluating reliability block diagram")
+    try:
+        result = evaluate_rbd(req.root.model_dump(exclude_none=True))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    response = {"reliability": result.reliability, "unique_blocks": result.unique_blocks}
+    if req.include_blocks:
+        response["blocks"] = result.blocks
+    return NumpyJSONResponse(response)
+
+
+@app.post("/reliability/fault-tree", response_model=FaultTreeResponse)
+def compute_fault_tree(req: FaultTreeRequest):
+    logger.info(f"Analyzing fault tree: {len(req.gates)} gates, {len(req.basic_events)} basic events")
+    try:
+        tree = FaultTree(req.basic_events, {name: gate.model_dump() for name, gate in req.gates.items()}, req.top)
+        cut_sets = tree.minimal_cut_sets(req.max_cut_set_order) if req.include_cut_sets else None
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    birnbaum = tree.birnbaum_importance()
+    fussell_vesely = tree.fussell_vesely_importance(birnbaum)
+    importance = [
+        {"event": name, "probability": req.basic_events[name], "birnbaum": birnbaum[name], "fussell_vesely": fussell_vesely[name]}
+        for name in sorted(tree.events, key=lambda name: -fussell_vesely[name])
+    ]
+
+    response = {
+        "top_event_probability": tree.top_event_probability(),
+        "bdd_nodes": len(tree.nodes),
+        "importance": importance,
+    }
+    if cut_sets is not None:
+        response["minimal_cut_sets"] = cut_sets
+    return NumpyJSONResponse(response)
+
+
 @app.get("/health") 
 def health(): 
     return {"status": "ok"}
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, TypeAlias, Annotated
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Literal, Optional, TypeAlias, Annotated, Union
 
 # Constrained float: > 0 and ≤ 1
 ReliabilityValue = Annotated[float, Field(gt=0, le=1)]
@@ -27,6 +27,23 @@ class ExponentialReliabilityResponse(BaseModel):
     reliability: float
 
 
+class ExponentialReliabilityBatchRequest(BaseModel):
+    failure_rates: List[Annotated[float, Field(ge=0)]] = Field(
+        min_length=1,
+        description="Failure rates λ (each must be ≥ 0)"
+    )
+    mission_times: List[Annotated[float, Field(ge=0)]] = Field(
+        min_length=1,
+        description="Mission times t (each must be ≥ 0)"
+    )
+
+
+class ExponentialReliabilityBatchResponse(BaseModel):
+    reliability: List[List[float]] = Field(
+        description="reliability[i][j] = exp(-failure_rates[i] * mission_times[j])"
+    )
+
+
 # -----------------------------
 # MTBF / Failure Rate Conversion
 # -----------------------------
@@ -42,6 +59,17 @@ class MtbfConversionResponse(BaseModel):
     converted_value: float
 
 
+class MtbfConversionBatchRequest(BaseModel):
+    values: List[Annotated[float, Field(gt=0)]] = Field(
+        min_length=1,
+        description="MTBFs or failure rates (each must be > 0)"
+    )
+
+
+class MtbfConversionBatchResponse(BaseModel):
+    converted_values: List[float]
+
+
 # -----------------------------
 # Series System Reliability
 # -----------------------------
@@ -69,4 +97,124 @@ class KofNSystemRequest(BaseModel):
 
 
 class KofNSystemResponse(BaseModel):
-    reliability: float
\ No newline at end of file
+    reliability: float
+
+
+class KofNSystemBatchRequest(BaseModel):
+    component_reliabilities: ReliabilityList = Field( description="List of component reliabilities (each > 0 and ≤ 1)")
+
+    min_required: Optional[List[Annotated[int, Field(ge=1)]]] = Field(
+        None,
+        min_length=1,
+        description="Values of k to evaluate (each between 1 and n); all k = 1..n when omitted"
+    )
+
+
+class KofNSystemBatchResponse(BaseModel):
+    min_required: List[int]
+    reliability: List[float] = Field(description="reliability[m] = P(at least min_required[m] components work)")
+
+
+# -----------------------------
+# Reliability Block Diagrams
+# -----------------------------
+
+class RBDComponent(BaseModel):
+    type: Literal["component"]
+    id: Optional[str] = Field(None, description="Name echoed in the per-block results")
+    reliability: Optional[float] = Field(None, ge=0, le=1, description="Component reliability (0 ≤ R ≤ 1)")
+    failure_rate: Optional[float] = Field(None, ge=0, description="Failure rate λ, used with mission_time instead of reliability")
+    mission_time: Optional[float] = Field(None, ge=0, description="Mission time t for the exponential reliability exp(-λt)")
+
+    @model_validator(mode="after")
+    def validate_parameters(self):
+        if self.reliability is None and (self.failure_rate is None or self.mission_time is None):
+            raise ValueError("A component needs a reliability or a failure_rate and mission_time")
+        return self
+
+
+class RBDSeries(BaseModel):
+    type: Literal["series"]
+    id: Optional[str] = Field(None, description="Name echoed in the per-block results")
+    blocks: List["RBDBlock"] = Field(min_length=1, description="Blocks that must all work")
+
+
+class RBDParallel(BaseModel):
+    type: Literal["parallel"]
+    id: Optional[str] = Field(None, description="Name echoed in the per-block results")
+    blocks: List["RBDBlock"] = Field(min_length=1, description="Blocks of which at least one must work")
+
+
+class RBDKofN(BaseModel):
+    type: Literal["kofn"]
+    id: Optional[str] = Field(None, description="Name echoed in the per-block results")
+    min_required: int = Field(gt=0, description="Minimum number of blocks required for success")
+    blocks: List["RBDBlock"] = Field(min_length=1, description="Redundant blocks")
+
+    @model_validator(mode="after")
+    def validate_min_required(self):
+        if self.min_required > len(self.blocks):
+            raise ValueError(f"min_required must be at most the number of blocks ({len(self.blocks)})")
+        return self
+
+
+RBDBlock = Annotated[Union[RBDComponent, RBDSeries, RBDParallel, RBDKofN], Field(discriminator="type")]
+
+
+class RBDRequest(BaseModel):
+    root: RBDBlock = Field(description="Top block of the diagram")
+    include_blocks: bool = Field(True, description="Return the reliability of every block, not only the system")
+
+
+class RBDBlockResult(BaseModel):
+    path: str = Field(description="Child indices from the root, e.g. 0.2.1")
+    id: Optional[str]
+    type: Literal["component", "series", "parallel", "kofn"]
+    reliability: float
+
+
+class RBDResponse(BaseModel):
+    reliability: float
+    unique_blocks: int = Field(description="Distinct subtrees evaluated; identical subtrees are evaluated once")
+    blocks: Optional[List[RBDBlockResult]] = None
+
+
+# -----------------------------
+# Fault Tree Analysis
+# -----------------------------
+
+class FaultTreeGate(BaseModel):
+    type: Literal["and", "or", "kofn"]
+    inputs: List[str] = Field(min_length=1, description="Names of basic events or other gates")
+    min_required: Optional[int] = Field(None, gt=0, description="Inputs that must occur for the gate to occur (kofn only)")
+
+    @model_validator(mode="after")
+    def validate_min_required(self):
+        if self.type == "kofn" and (self.min_required is None or self.min_required > len(self.inputs)):
+            raise ValueError(f"A kofn gate needs min_required between 1 and the number of inputs ({len(self.inputs)})")
+        return self
+
+
+class FaultTreeRequest(BaseModel):
+    basic_events: Dict[str, Annotated[float, Field(ge=0, le=1)]] = Field(
+        min_length=1,
+        description="Probability of each basic event (each 0 ≤ p ≤ 1)"
+    )
+    gates: Dict[str, FaultTreeGate] = Field(description="Gates by name; inputs may be shared between gates")
+    top: str = Field(description="Name of the top event gate")
+    max_cut_set_order: Optional[int] = Field(None, gt=0, description="Drop minimal cut sets with more events than this")
+    include_cut_sets: bool = Field(True, description="Return the minimal cut sets")
+
+
+class FaultTreeImportance(BaseModel):
+    event: str
+    probability: float
+    birnbaum: float = Field(description="P(top | event occurs) - P(top | event does not occur)")
+    fussell_vesely: float = Field(description="Fraction of the top event probability that involves the event")
+
+
+class FaultTreeResponse(BaseModel):
+    top_event_probability: float
+    bdd_nodes: int = Field(description="Nodes of the binary decision diagram of the top event")
+    importance: List[FaultTreeImportance] = Field(description="Basic events by decreasing Fussell-Vesely importance")
+    minimal_cut_sets: Optional[List[List[str]]] = None
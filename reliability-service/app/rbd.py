@@ -0,0 +1,140 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from app.reliability import exponential_reliability, kofn_system_reliabilities
+
+BLOCK_TYPES = ("component", "series", "parallel", "kofn")
+
+
+class RBDResult(NamedTuple):
+    """
+    Result of a reliability block diagram evaluation.
+
+    blocks lists every block of the tree in pre-order as a dict with its
+    path ("0" for the root, "0.2" for the root's third child, ...), its id
+    (None when not given), its type and its reliability. unique_blocks is
+    the number of distinct subtrees that were actually evaluated.
+    """
+    reliability: float
+    blocks: list[dict]
+    unique_blocks: int
+
+
+def evaluate_rbd(root: dict) -> RBDResult:
+    """
+    Evaluate a reliability block diagram given as a nested block tree.
+
+    Parameters:
+    root (dict): The top block. Every block has a "type":
+        - "component": a leaf with either "reliability" or "failure_rate" and "mission_time"
+        - "series": all of its "blocks" must work
+        - "parallel": at least one of its "blocks" must work
+        - "kofn": at least "min_required" of its "blocks" must work
+      and may carry an "id" that is echoed in the per-block results.
+
+    Returns:
+    RBDResult: the system reliability and the reliability of every block.
+
+    Identical subtrees (the same structure and parameters, in any child
+    order) are evaluated once and reused. The tree is walked iteratively, so
+    its depth is not limited by the Python recursion limit.
+
+    Ground Rules, Assumptions, and Limitations:
+    1. All blocks fail independently; identical subtrees are treated as
+       independent copies (shared basic events need a fault tree instead).
+    2. Component reliabilities must be between 0 and 1; failure rates and mission times must be non-negative.
+    3. Switching between redundant blocks is perfect.
+
+    Raises:
+    ValueError: if a block is malformed; the message names the block's path.
+    """
+    # Canonical key of each distinct subtree -> its index in `unique`, which holds their reliabilities
+    interned: dict[tuple, int] = {}
+    unique: list[float] = []
+    # Block path -> index of its distinct subtree in `unique`
+    node_ids: dict[str, int] = {}
+
+    # Blocks are recorded in pre-order on the way down and combined on the
+    # way back up, once all of their children have been evaluated
+    entries = []
+    stack = [(root, "0", False)]
+    while stack:
+        block, path, expanded = stack.pop()
+        if not expanded:
+            children = _validate_block(block, path)
+            entries.append((path, block))
+            stack.append((block, path, True))
+            for index in reversed(range(len(children))):
+                stack.append((children[index], f"{path}.{index}", False))
+            continue
+
+        key = _canonical_key(block, path, node_ids)
+        node = interned.get(key)
+        if node is None:
+            node = interned[key] = len(unique)
+            unique.append(_block_reliability(block, key, unique))
+        node_ids[path] = node
+
+    blocks = [
+        {"path": path, "id": block.get("id"), "type": block["type"], "reliability": unique[node_ids[path]]}
+        for path, block in entries
+    ]
+    return RBDResult(unique[node_ids["0"]], blocks, len(unique))
+
+
+def _validate_block(block, path: str) -> list:
+    """Check one block's own fields and return its children."""
+    if not isinstance(block, dict) or block.get("type") not in BLOCK_TYPES:
+        raise ValueError(f"Block {path} must have a type in {BLOCK_TYPES}.")
+
+    if block["type"] == "component":
+        if block.get("reliability") is not None:
+            if not 0 <= block["reliability"] <= 1:
+                raise ValueError(f"Block {path}: reliability must be between 0 and 1.")
+        elif block.get("failure_rate") is None or block.get("mission_time") is None:
+            raise ValueError(f"Block {path}: a component needs a reliability or a failure_rate and mission_time.")
+        return []
+
+    children = block.get("blocks") or []
+    if not children:
+        raise ValueError(f"Block {path}: a {block['type']} block needs at least one child block.")
+    if block["type"] == "kofn":
+        k = block.get("min_required")
+        if not isinstance(k, int) or not 1 <= k <= len(children):
+            raise ValueError(f"Block {path}: min_required must be between 1 and the number of child blocks.")
+    return children
+
+
+def _canonical_key(block: dict, path: str, node_ids: dict[str, int]) -> tuple:
+    """
+    Key identifying a subtree up to the order of its children, built from the
+    interned ids of the children so that hashing it is O(children).
+    """
+    if block["type"] == "component":
+        if block.get("reliability") is not None:
+            return ("component", float(block["reliability"]))
+        try:
+            return ("component", exponential_reliability(block["failure_rate"], block["mission_time"]))
+        except ValueError as e:
+            raise ValueError(f"Block {path}: {e}")
+
+    children = tuple(sorted(node_ids[f"{path}.{index}"] for index in range(len(block["blocks"]))))
+    return (block["type"], block.get("min_required"), children)
+
+
+def _block_reliability(block: dict, key: tuple, unique: list[float]) -> float:
+    if block["type"] == "component":
+        return key[1]
+
+    reliabilities = np.array([unique[child] for child in key[2]])
+    if block["type"] == "series":
+        return float(np.prod(reliabilities))
+    if block["type"] == "parallel":
+        return float(1.0 - np.prod(1.0 - reliabilities))
+
+    # kofn_system_reliabilities requires reliabilities > 0; failed blocks never count as working
+    working = reliabilities[reliabilities > 0]
+    if working.size < block["min_required"]:
+        return 0.0
+    return float(kofn_system_reliabilities(working, [block["min_required"]])[0])
@@ -1,4 +1,6 @@
-from math import exp, comb
+from math import exp, lgamma
+
+import numpy as np
 
 def exponential_reliability(failure_rate: float, time: float) -> float:
     """
@@ -44,6 +46,49 @@ def mtbf_failure_rate_convert(value: float) -> float:
     
     return 1.0 / value
 
+def exponential_reliability_batch(failure_rates, times) -> np.ndarray:
+    """
+    Calculate exponential reliabilities for every combination of failure rate and time.
+
+    Parameters:
+    failure_rates (array-like): Failure rates (λ) of the elements, shape (m,).
+    times (array-like): Mission times, shape (k,).
+
+    Returns:
+    np.ndarray: Reliability surface of shape (m, k) with R[i, j] = exp(-failure_rates[i] * times[j]).
+
+    Ground Rules, Assumptions, and Limitations:
+    1. Same as exponential_reliability, applied element-wise.
+    2. Both inputs must be non-empty one-dimensional sequences.
+    """
+    failure_rates = _as_vector(failure_rates, "Failure rates")
+    times = _as_vector(times, "Times")
+    if np.any(failure_rates < 0):
+        raise ValueError("Failure rate must be non-negative.")
+    if np.any(times < 0):
+        raise ValueError("Time must be non-negative.")
+
+    return np.exp(-np.multiply.outer(failure_rates, times))
+
+def mtbf_failure_rate_convert_batch(values) -> np.ndarray:
+    """
+    Convert many MTBFs to failure rates or failure rates to MTBFs at once.
+
+    Parameters:
+    values (array-like): MTBFs or failure rates, shape (m,).
+
+    Returns:
+    np.ndarray: The reciprocal of each value, shape (m,).
+
+    Ground Rules, Assumptions, and Limitations:
+    1. Same as mtbf_failure_rate_convert, applied element-wise.
+    """
+    values = _as_vector(values, "Values")
+    if np.any(values <= 0):
+        raise ValueError("Value must be positive.")
+
+    return 1.0 / values
+
 def series_system_reliability(component_reliabilities: list[float]) -> float:
     """
     Calculate the reliability of a series system.
@@ -91,30 +136,114 @@ def kofn_system_reliability(component_reliabilities: list[float], min_required:
     if min_required < 1 or min_required > len(component_reliabilities):
         raise ValueError("min_required must be between 1 and the number of components.")
     
-    n = len(component_reliabilities)
-    k = min_required
-    
-    if len(set(component_reliabilities)) == 1:
-        # All reliabilities are the same, use simplified formula
-        r = component_reliabilities[0]
-        system_reliability = 0
-
-        system_reliability = sum(comb(n, i) * (r ** i) * ((1 - r) ** (n - i)) for i in range(k, n + 1))
-        
-        
-    else: 
-        # General case for dissimilar reliabilities
-
-        r_vector = [0] * (n + 1)
-        r_vector[0] = 1.0 # Reliability with 0 working components
-
-        for reliability in component_reliabilities:
-            for j in range(n, 0, -1):
-                r_vector[j] = r_vector[j] * (1 - reliability) + r_vector[j - 1] * reliability
-            r_vector[0] *= (1 - reliability)
-        system_reliability = sum(r_vector[i] for i in range(k, n + 1))
+    return float(kofn_system_reliabilities(component_reliabilities, [min_required])[0])
 
-    return system_reliability
+def kofn_system_reliabilities(component_reliabilities, min_required) -> np.ndarray:
+    """
+    Calculate the reliability of a k-of-n system for many values of k at once.
+
+    Parameters:
+    component_reliabilities (array-like): Reliabilities of the n components.
+    min_required (array-like of int): Values of k (each between 1 and n).
+
+    Returns:
+    np.ndarray: reliability[m] = P(at least min_required[m] components work).
+
+    The distribution of the number of working components is computed once
+    (see working_components_distribution) and every k is read off its upper
+    tail, so evaluating all n values of k costs the same as evaluating one.
+
+    Ground Rules, Assumptions, and Limitations:
+    1. Same as kofn_system_reliability.
+    """
+    reliabilities = _as_vector(component_reliabilities, "Component reliabilities")
+    if np.any((reliabilities <= 0) | (reliabilities > 1)):
+        raise ValueError("All component reliabilities must be between 0 and 1.")
+
+    n = reliabilities.size
+    k = np.asarray(min_required)
+    if k.ndim != 1 or k.size == 0 or k.dtype.kind not in "iu":
+        raise ValueError("min_required must be a non-empty sequence of integers.")
+    if np.any((k < 1) | (k > n)):
+        raise ValueError("min_required must be between 1 and the number of components.")
+
+    if np.all(reliabilities == reliabilities[0]):
+        # Identical components: binomial upper tail, summed in log space
+        return np.exp(_log_binomial_survival(n, reliabilities[0])[k])
+
+    # Upper tail P(at least k work) for k = 0..n
+    survival = np.cumsum(working_components_distribution(reliabilities)[::-1])[::-1]
+    return np.minimum(survival[k], 1.0)
+
+def working_components_distribution(component_reliabilities) -> np.ndarray:
+    """
+    Calculate the distribution of the number of working components (Poisson binomial).
+
+    Parameters:
+    component_reliabilities (array-like): Reliabilities of the n independent components.
+
+    Returns:
+    np.ndarray: pmf of shape (n + 1,), pmf[i] = P(exactly i components work).
+
+    The pmf is the coefficient vector of the product of the polynomials
+    (1 - r_i) + r_i x. The product is formed as a balanced tree, multiplying
+    all pairs of one level together, with direct convolution while the
+    polynomials are short and FFT convolution once they are long. This costs
+    O(n log^2 n) instead of the O(n^2) of adding one component at a time.
+    Entries carry an absolute rounding error of about 1e-16 * log n.
+    """
+    reliabilities = _as_vector(component_reliabilities, "Component reliabilities")
+    n = reliabilities.size
+
+    # Pad to a power of two with components of reliability 0, whose polynomial is 1
+    size = 1 << max(n - 1, 0).bit_length()
+    polys = np.zeros((size, 2))
+    polys[:, 0] = 1.0
+    polys[:n, 0] = 1.0 - reliabilities
+    polys[:n, 1] = reliabilities
+
+    while polys.shape[0] > 1:
+        polys = _multiply_pairs(polys[0::2], polys[1::2])
+
+    return polys[0, :n + 1]
+
+# Polynomials of at most this many coefficients are multiplied by direct convolution
+_DIRECT_CONVOLUTION_MAX_LENGTH = 64
+
+def _multiply_pairs(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Row-wise products of two stacks of polynomials of shape (m, L), giving shape (m, 2L - 1).
+    """
+    m, length = a.shape
+    if length <= _DIRECT_CONVOLUTION_MAX_LENGTH:
+        product = np.zeros((m, 2 * length - 1))
+        for i in range(length):
+            product[:, i:i + length] += a[:, i:i + 1] * b
+        return product
+
+    size = 1 << (2 * length - 2).bit_length()
+    product = np.fft.irfft(np.fft.rfft(a, size, axis=1) * np.fft.rfft(b, size, axis=1), size, axis=1)
+    # Round-off can make probabilities that are (close to) zero slightly negative
+    return np.maximum(product[:, :2 * length - 1], 0.0)
+
+_log_gamma = np.vectorize(lgamma, otypes=[float])
+
+def _log_binomial_survival(n: int, r: float) -> np.ndarray:
+    """
+    Logarithm of P(at least k of n identical components work) for k = 0..n.
+
+    The binomial terms are formed as log C(n, i) + i log r + (n - i) log(1 - r)
+    and accumulated with logaddexp, so terms far below the float range do not
+    underflow and large binomial coefficients do not overflow.
+    """
+    if r == 1.0:
+        # Every component works; avoids 0 * log(0) below
+        return np.zeros(n + 1)
+
+    i = np.arange(n + 1)
+    log_factorial = _log_gamma(i + 1.0)
+    log_terms = log_factorial[n] - log_factorial - log_factorial[::-1] + i * np.log(r) + (n - i) * np.log1p(-r)
+    return np.logaddexp.accumulate(log_terms[::-1])[::-1]
 
 def validate_reliability_list(reliabilities: list[float]) -> None:
     """
@@ -126,4 +255,15 @@ def validate_reliability_list(reliabilities: list[float]) -> None:
     if not reliabilities:
         raise ValueError("Component reliabilities list cannot be empty.")
     if any(r <= 0 or r > 1 for r in reliabilities):
-        raise ValueError("All component reliabilities must be between 0 and 1.")    
\ No newline at end of file
+        raise ValueError("All component reliabilities must be between 0 and 1.")
+
+def _as_vector(values, name: str) -> np.ndarray:
+    """
+    Convert a sequence of numbers to a non-empty, finite one-dimensional float array.
+    """
+    array = np.asarray(values, dtype=float)
+    if array.ndim != 1 or array.size == 0:
+        raise ValueError(f"{name} must be a non-empty one-dimensional sequence.")
+    if not np.all(np.isfinite(array)):
+        raise ValueError(f"{name} must be finite.")
+    return array
@@ -43,6 +43,46 @@ class TestMtbfConversionAPI:
         )
         assert response.status_code == 422
 
+class TestBatchReliabilityAPI:
+    """
+    Test suite for the batch Exponential Reliability and MTBF Conversion API endpoints.
+    """
+    def test_exponential_reliability_batch_api_nominal(self):
+        response = client.post(
+            "/reliability/exponential/batch",
+            json={"failure_rates": [0.001, 0.01], "mission_times": [0, 100, 1000]}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["reliability"]) == 2
+        assert len(data["reliability"][0]) == 3
+        assert data["reliability"][0][0] == 1.0
+
+    def test_exponential_reliability_batch_api_negative_time(self):
+        response = client.post(
+            "/reliability/exponential/batch",
+            json={"failure_rates": [0.001], "mission_times": [100, -5]}
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][1] == "mission_times"
+
+    def test_mtbf_conversion_batch_api_nominal(self):
+        response = client.post(
+            "/reliability/mtbf-convert/batch",
+            json={"values": [1000, 0.5]}
+        )
+        assert response.status_code == 200
+        assert response.json()["converted_values"] == [0.001, 2.0]
+
+    def test_mtbf_conversion_batch_api_invalid(self):
+        for values in [[], [1000, -1000], [0]]:
+            response = client.post(
+                "/reliability/mtbf-convert/batch",
+                json={"values": values}
+            )
+            assert response.status_code == 422
+            assert response.json()["detail"][0]["loc"][1] == "values"
+
 class TestSeriesSystemAPI:
     """
     Test suite for the Series System Reliability API endpoint.
@@ -81,4 +121,103 @@ class TestKofNSystemAPI:
             "/reliability/kofn",
             json={"component_reliabilities": [0.9, 0.9, 0.9], "min_required": 0}
         )
-        assert response.status_code == 422
\ No newline at end of file
+        assert response.status_code == 422
+
+    def test_kofn_system_batch_api_all_k(self):
+        response = client.post(
+            "/reliability/kofn/batch",
+            json={"component_reliabilities": [0.9, 0.8, 0.7]}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["min_required"] == [1, 2, 3]
+        assert len(data["reliability"]) == 3
+        assert data["reliability"][0] >= data["reliability"][1] >= data["reliability"][2]
+
+    def test_kofn_system_batch_api_invalid_min_required(self):
+        response = client.post(
+            "/reliability/kofn/batch",
+            json={"component_reliabilities": [0.9, 0.8, 0.7], "min_required": [2, 4]}
+        )
+        assert response.status_code == 422
+
+    def test_kofn_system_batch_api_validation_errors(self):
+        for body, field in [
+            ({"component_reliabilities": [0.9, 1.5]}, "component_reliabilities"),
+            ({"component_reliabilities": [0.9, 0.0]}, "component_reliabilities"),
+            ({"component_reliabilities": [0.9, 0.8], "min_required": [0]}, "min_required"),
+        ]:
+            response = client.post("/reliability/kofn/batch", json=body)
+            assert response.status_code == 422
+            assert response.json()["detail"][0]["loc"][1] == field
+
+class TestRBDAPI:
+    """
+    Test suite for the Reliability Block Diagram API endpoint.
+    """
+    def test_rbd_api_nominal(self):
+        train = {"type": "series", "blocks": [
+            {"type": "component", "failure_rate": 0.0001, "mission_time": 1000},
+            {"type": "component", "reliability": 0.99},
+        ]}
+        response = client.post(
+            "/reliability/rbd",
+            json={"root": {"type": "kofn", "id": "pumps", "min_required": 2, "blocks": [train, train, train]}}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert 0 < data["reliability"] < 1
+        assert data["unique_blocks"] == 4
+        assert data["blocks"][0]["id"] == "pumps"
+        assert len(data["blocks"]) == 10
+
+    def test_rbd_api_without_blocks(self):
+        response = client.post(
+            "/reliability/rbd",
+            json={"root": {"type": "component", "reliability": 0.9}, "include_blocks": False}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"reliability": 0.9, "unique_blocks": 1}
+
+    def test_rbd_api_invalid_tree(self):
+        for root in [
+            {"type": "component"},
+            {"type": "series", "blocks": []},
+            {"type": "kofn", "min_required": 3, "blocks": [{"type": "component", "reliability": 0.9}]},
+        ]:
+            response = client.post("/reliability/rbd", json={"root": root})
+            assert response.status_code == 422
+
+class TestFaultTreeAPI:
+    """
+    Test suite for the Fault Tree Analysis API endpoint.
+    """
+    def test_fault_tree_api_shared_event(self):
+        response = client.post(
+            "/reliability/fault-tree",
+            json={
+                "basic_events": {"pump_a": 0.1, "pump_b": 0.2, "valve": 0.3},
+                "gates": {
+                    "top": {"type": "or", "inputs": ["pumps", "feed"]},
+                    "pumps": {"type": "and", "inputs": ["pump_a", "pump_b"]},
+                    "feed": {"type": "and", "inputs": ["pump_a", "valve"]},
+                },
+                "top": "top",
+            }
+        )
+        assert response.status_code == 200
+        data = response.json()
+        # P(pump_a and (pump_b or valve)), not the independent-gate 1 - (1 - 0.02)(1 - 0.03)
+        assert abs(data["top_event_probability"] - 0.1 * (1 - 0.8 * 0.7)) < 1e-12
+        assert data["minimal_cut_sets"] == [["pump_a", "pump_b"], ["pump_a", "valve"]]
+        assert data["importance"][0]["event"] == "pump_a"
+        assert abs(data["importance"][0]["fussell_vesely"] - 1.0) < 1e-12
+
+    def test_fault_tree_api_invalid_tree(self):
+        for body in [
+            {"basic_events": {"a": 0.1}, "gates": {"top": {"type": "or", "inputs": ["b"]}}, "top": "top"},
+            {"basic_events": {"a": 0.1}, "gates": {"top": {"type": "kofn", "inputs": ["a"]}}, "top": "top"},
+            {"basic_events": {"a": 1.1}, "gates": {"top": {"type": "or", "inputs": ["a"]}}, "top": "top"},
+        ]:
+            response = client.post("/reliability/fault-tree", json=body)
+            assert response.status_code == 422
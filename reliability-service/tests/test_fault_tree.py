@@ -0,0 +1,167 @@
+import itertools
+import pytest
+from app.fault_tree import BDD, FaultTree
+
+# Pump A is shared by both AND gates, so the gates are not independent
+EVENTS = {"pump_a": 0.1, "pump_b": 0.2, "valve": 0.3, "power": 0.05}
+GATES = {
+    "top": {"type": "or", "inputs": ["both_pumps", "pump_and_valve", "two_of_three"]},
+    "both_pumps": {"type": "and", "inputs": ["pump_a", "pump_b"]},
+    "pump_and_valve": {"type": "and", "inputs": ["pump_a", "valve"]},
+    "two_of_three": {"type": "kofn", "min_required": 2, "inputs": ["pump_b", "valve", "power"]},
+}
+
+
+def top_occurs(state):
+    return (
+        (state["pump_a"] and state["pump_b"])
+        or (state["pump_a"] and state["valve"])
+        or state["pump_b"] + state["valve"] + state["power"] >= 2
+    )
+
+
+def enumerate_probability(fixed=None):
+    """P(top) by summing over every combination of basic event states."""
+    fixed = fixed or {}
+    free = [name for name in EVENTS if name not in fixed]
+    total = 0.0
+    for values in itertools.product([0, 1], repeat=len(free)):
+        state = {**fixed, **dict(zip(free, values))}
+        weight = 1.0
+        for name, value in zip(free, values):
+            weight *= EVENTS[name] if value else 1 - EVENTS[name]
+        if top_occurs(state):
+            total += weight
+    return total
+
+
+class TestBDD:
+    """
+    Test suite for the BDD class.
+    """
+    def test_unique_table_shares_equal_functions(self):
+        """
+        Tests that equal functions built in different ways are the same node.
+        """
+        bdd = BDD(3)
+        x, y, z = (bdd.variable(v) for v in range(3))
+        left = bdd.apply("and", x, bdd.apply("or", y, z))
+        right = bdd.apply("or", bdd.apply("and", x, z), bdd.apply("and", y, x))
+        assert left == right
+
+    def test_at_least_matches_enumeration(self):
+        """
+        Tests the k-of-n construction against every assignment of the variables.
+        """
+        bdd = BDD(4)
+        node = bdd.at_least(2, [bdd.variable(v) for v in range(4)])
+        for values in itertools.product([0, 1], repeat=4):
+            current = node
+            while current > 1:
+                current = bdd.high[current] if values[bdd.var[current]] else bdd.low[current]
+            assert current == int(sum(values) >= 2)
+
+    def test_deep_apply(self):
+        """
+        Tests that apply handles diagrams deeper than the Python recursion limit.
+        """
+        n = 3000
+        bdd = BDD(n)
+        chain = bdd.apply_all("and", [bdd.variable(v) for v in range(n)])
+        assert len(bdd.reachable(chain)) == n
+
+
+class TestFaultTree:
+    """
+    Test suite for the FaultTree class.
+    """
+    def test_top_event_probability_with_shared_events(self):
+        """
+        Tests the exact top event probability against enumeration when a basic event is shared.
+        """
+        tree = FaultTree(EVENTS, GATES, "top")
+        assert tree.top_event_probability() == pytest.approx(enumerate_probability())
+
+    def test_minimal_cut_sets(self):
+        """
+        Tests the minimal cut sets, sorted by order and name.
+        """
+        tree = FaultTree(EVENTS, GATES, "top")
+        assert tree.minimal_cut_sets() == [
+            ("power", "pump_b"), ("power", "valve"), ("pump_a", "pump_b"), ("pump_a", "valve"), ("pump_b", "valve"),
+        ]
+        assert tree.minimal_cut_sets(max_order=1) == []
+
+    def test_minimal_cut_sets_drop_supersets(self):
+        """
+        Tests that a cut set absorbed by a smaller one is not reported.
+        """
+        gates = {"top": {"type": "or", "inputs": ["pump_a", "g"]}, "g": {"type": "and", "inputs": ["pump_a", "valve"]}}
+        assert FaultTree(EVENTS, gates, "top").minimal_cut_sets() == [("pump_a",)]
+
+    def test_birnbaum_importance(self):
+        """
+        Tests Birnbaum importance against P(top | event occurs) - P(top | event does not occur).
+        """
+        birnbaum = FaultTree(EVENTS, GATES, "top").birnbaum_importance()
+        for name in EVENTS:
+            expected = enumerate_probability({name: 1}) - enumerate_probability({name: 0})
+            assert birnbaum[name] == pytest.approx(expected)
+
+    def test_fussell_vesely_importance(self):
+        """
+        Tests Fussell-Vesely importance against the relative drop in P(top) when the event cannot occur.
+        """
+        fussell_vesely = FaultTree(EVENTS, GATES, "top").fussell_vesely_importance()
+        top = enumerate_probability()
+        for name in EVENTS:
+            assert fussell_vesely[name] == pytest.approx((top - enumerate_probability({name: 0})) / top)
+
+    def test_fussell_vesely_reuses_birnbaum(self):
+        """
+        Tests that Fussell-Vesely importance uses a given Birnbaum importance instead of another pass over the BDD.
+        """
+        tree = FaultTree(EVENTS, GATES, "top")
+        expected = tree.fussell_vesely_importance()
+        birnbaum = tree.birnbaum_importance()
+
+        def no_second_pass():
+            raise AssertionError("Birnbaum importance recomputed")
+
+        tree.birnbaum_importance = no_second_pass
+        assert tree.fussell_vesely_importance(birnbaum) == expected
+
+    def test_large_tree(self):
+        """
+        Tests a tree of thousands of gates sharing basic events, far beyond inclusion-exclusion.
+        """
+        # 1000 trains of two pumps in parallel, each pump also failed by the power bus it shares with its neighbour
+        events = {}
+        gates = {}
+        for i in range(1000):
+            events[f"pump{i}a"] = events[f"pump{i}b"] = 0.01
+            events[f"bus{i}"] = 0.001
+            gates[f"side{i}a"] = {"type": "or", "inputs": [f"pump{i}a", f"bus{i}"]}
+            gates[f"side{i}b"] = {"type": "or", "inputs": [f"pump{i}b", f"bus{(i + 1) % 1000}"]}
+            gates[f"train{i}"] = {"type": "and", "inputs": [f"side{i}a", f"side{i}b"]}
+        gates["top"] = {"type": "or", "inputs": [f"train{i}" for i in range(1000)]}
+        tree = FaultTree(events, gates, "top")
+
+        # Each train fails through both pumps, a pump and the next bus, the first bus and a pump, or both buses
+        assert len(tree.minimal_cut_sets()) == 4000
+        assert 0 < tree.top_event_probability() < 1
+
+    def test_invalid_trees(self):
+        """
+        Tests that unknown inputs, cycles, bad probabilities and bad k raise ValueError.
+        """
+        invalid = [
+            (EVENTS, {"top": {"type": "or", "inputs": ["missing"]}}, "top"),
+            (EVENTS, {"top": {"type": "or", "inputs": ["g"]}, "g": {"type": "and", "inputs": ["top", "valve"]}}, "top"),
+            ({"a": 1.5}, {"top": {"type": "or", "inputs": ["a"]}}, "top"),
+            (EVENTS, {"top": {"type": "kofn", "min_required": 3, "inputs": ["valve", "power"]}}, "top"),
+            (EVENTS, GATES, "missing"),
+        ]
+        for events, gates, top in invalid:
+            with pytest.raises(ValueError):
+                FaultTree(events, gates, top)
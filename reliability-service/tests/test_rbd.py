@@ -0,0 +1,95 @@
+from math import exp
+import pytest
+from app.rbd import evaluate_rbd
+from app.reliability import kofn_system_reliability, series_system_reliability
+
+
+def component(reliability, id=None):
+    return {"type": "component", "reliability": reliability, "id": id}
+
+
+class TestEvaluateRBD:
+    """
+    Test suite for the evaluate_rbd function.
+    """
+    def test_series_parallel_composition(self):
+        """
+        Tests a parallel pair in series with a single component against the closed form.
+        """
+        root = {"type": "series", "blocks": [
+            {"type": "parallel", "blocks": [component(0.9), component(0.8)]},
+            component(0.95),
+        ]}
+        result = evaluate_rbd(root)
+        assert result.reliability == pytest.approx((1 - 0.1 * 0.2) * 0.95)
+
+    def test_kofn_matches_flat_function(self):
+        """
+        Tests that a k-of-n block of components matches kofn_system_reliability.
+        """
+        reliabilities = [0.9, 0.8, 0.7, 0.6]
+        root = {"type": "kofn", "min_required": 2, "blocks": [component(r) for r in reliabilities]}
+        assert evaluate_rbd(root).reliability == pytest.approx(kofn_system_reliability(reliabilities, 2))
+
+    def test_failure_rate_component(self):
+        """
+        Tests a component given by failure rate and mission time.
+        """
+        root = {"type": "series", "blocks": [{"type": "component", "failure_rate": 1e-3, "mission_time": 100}, component(0.9)]}
+        assert evaluate_rbd(root).reliability == pytest.approx(series_system_reliability([exp(-0.1), 0.9]))
+
+    def test_per_block_results(self):
+        """
+        Tests that every block is reported in pre-order with its path, id and reliability.
+        """
+        root = {"type": "parallel", "id": "top", "blocks": [component(0.5, "a"), {"type": "series", "blocks": [component(0.5)]}]}
+        blocks = evaluate_rbd(root).blocks
+        assert [b["path"] for b in blocks] == ["0", "0.0", "0.1", "0.1.0"]
+        assert [b["id"] for b in blocks] == ["top", "a", None, None]
+        assert blocks[2]["reliability"] == 0.5
+        assert blocks[0]["reliability"] == pytest.approx(0.75)
+
+    def test_identical_subtrees_evaluated_once(self):
+        """
+        Tests that identical subtrees, in any child order, are evaluated once.
+        """
+        train = lambda a, b: {"type": "series", "blocks": [component(a), component(b)]}
+        root = {"type": "kofn", "min_required": 2, "blocks": [train(0.9, 0.99), train(0.99, 0.9), train(0.9, 0.99)]}
+        result = evaluate_rbd(root)
+        # 0.9, 0.99, one train and the k-of-n block
+        assert result.unique_blocks == 4
+        assert len(result.blocks) == 10
+        assert result.reliability == pytest.approx(kofn_system_reliability([0.9 * 0.99] * 3, 2))
+
+    def test_failed_blocks_in_kofn(self):
+        """
+        Tests that blocks of reliability 0 never count towards k.
+        """
+        root = {"type": "kofn", "min_required": 2, "blocks": [component(0.0), component(0.9), component(0.8)]}
+        assert evaluate_rbd(root).reliability == pytest.approx(0.72)
+        root["min_required"] = 3
+        assert evaluate_rbd(root).reliability == 0.0
+
+    def test_deep_tree(self):
+        """
+        Tests that trees deeper than the Python recursion limit are evaluated.
+        """
+        root = component(0.9)
+        for _ in range(3000):
+            root = {"type": "series", "blocks": [root]}
+        assert evaluate_rbd(root).reliability == pytest.approx(0.9)
+
+    def test_invalid_blocks(self):
+        """
+        Tests that malformed blocks raise ValueError naming their path.
+        """
+        invalid = [
+            {"type": "bridge", "blocks": [component(0.9)]},
+            {"type": "series", "blocks": []},
+            {"type": "series", "blocks": [component(1.5)]},
+            {"type": "series", "blocks": [{"type": "component", "failure_rate": 1e-3}]},
+            {"type": "kofn", "min_required": 3, "blocks": [component(0.9), component(0.9)]},
+        ]
+        for root in invalid:
+            with pytest.raises(ValueError, match="Block 0"):
+                evaluate_rbd(root)
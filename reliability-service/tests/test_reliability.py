@@ -1,10 +1,15 @@
 from math import exp, comb
+import numpy as np
 import pytest
 from app.reliability import (
     exponential_reliability,
+    exponential_reliability_batch,
     mtbf_failure_rate_convert,
+    mtbf_failure_rate_convert_batch,
     series_system_reliability,
     kofn_system_reliability,
+    kofn_system_reliabilities,
+    working_components_distribution,
     validate_reliability_list
 )
 
@@ -84,6 +89,59 @@ class TestMtbfFailureRateConvert:
         with pytest.raises(ValueError):
             mtbf_failure_rate_convert(mtbf)
 
+class TestExponentialReliabilityBatch:
+    """
+    Test suite for the exponential_reliability_batch function.
+    """
+    def test_exponential_reliability_batch_surface(self):
+        """
+        Tests that the batch function returns the failure rate x time surface of exponential_reliability.
+        """
+        failure_rates = [0.0, 0.001, 0.01]
+        times = [0, 10, 100, 1000]
+        result = exponential_reliability_batch(failure_rates, times)
+        assert result.shape == (3, 4)
+        for i, rate in enumerate(failure_rates):
+            for j, time in enumerate(times):
+                assert result[i, j] == pytest.approx(exponential_reliability(rate, time))
+
+    def test_exponential_reliability_batch_negative(self):
+        """
+        Tests the exponential_reliability_batch function with a negative failure rate or time.
+        """
+        with pytest.raises(ValueError):
+            exponential_reliability_batch([0.1, -0.1], [10])
+        with pytest.raises(ValueError):
+            exponential_reliability_batch([0.1], [10, -5])
+
+    def test_exponential_reliability_batch_empty(self):
+        """
+        Tests the exponential_reliability_batch function with an empty or nested input.
+        """
+        with pytest.raises(ValueError):
+            exponential_reliability_batch([], [10])
+        with pytest.raises(ValueError):
+            exponential_reliability_batch([[0.1]], [10])
+
+class TestMtbfFailureRateConvertBatch:
+    """
+    Test suite for the mtbf_failure_rate_convert_batch function.
+    """
+    def test_mtbf_failure_rate_convert_batch_nominal(self):
+        """
+        Tests that the batch conversion matches mtbf_failure_rate_convert element-wise.
+        """
+        values = [0.5, 1000, 2.5e6]
+        result = mtbf_failure_rate_convert_batch(values)
+        assert np.allclose(result, [mtbf_failure_rate_convert(v) for v in values])
+
+    def test_mtbf_failure_rate_convert_batch_zero(self):
+        """
+        Tests the mtbf_failure_rate_convert_batch function with a zero value.
+        """
+        with pytest.raises(ValueError):
+            mtbf_failure_rate_convert_batch([1000, 0])
+
 class TestSeriesSystemReliability:
     """
     Test suite for the series_system_reliability function.
@@ -242,3 +300,52 @@ class TestValidateReliabilityList:
         with pytest.raises(ValueError):
             validate_reliability_list(component_reliabilities)
 
+class TestKofNSystemReliabilities:
+    """
+    Test suite for the vectorized kofn_system_reliabilities function and its distribution engine.
+    """
+    def test_working_components_distribution_matches_recurrence(self):
+        """
+        Tests that the divide-and-conquer product matches the one-component-at-a-time recurrence, FFT levels included.
+        """
+        reliabilities = np.random.default_rng(0).uniform(0.5, 1.0, size=300)
+        expected = [1.0]
+        for r in reliabilities:
+            expected = [a * (1 - r) + b * r for a, b in zip(expected + [0.0], [0.0] + expected)]
+
+        pmf = working_components_distribution(reliabilities)
+        assert pmf.shape == (301,)
+        assert np.allclose(pmf, expected, rtol=0, atol=1e-14)
+        assert pmf.sum() == pytest.approx(1.0)
+
+    def test_kofn_system_reliabilities_all_k(self):
+        """
+        Tests that every k evaluated at once matches kofn_system_reliability.
+        """
+        reliabilities = [0.9, 0.8, 0.7, 0.95, 0.6]
+        result = kofn_system_reliabilities(reliabilities, [1, 2, 3, 4, 5])
+        assert result == pytest.approx([kofn_system_reliability(reliabilities, k) for k in range(1, 6)])
+        assert result[-1] == pytest.approx(series_system_reliability(reliabilities))
+
+    def test_kofn_system_reliabilities_identical_large_n(self):
+        """
+        Tests the identical-component case for large n, where the terms of the direct formula underflow.
+        """
+        n, r, k = 2000, 0.3, 1000
+        expected = sum(comb(n, i) * 3**i * 7**(n - i) for i in range(k, n + 1)) / 10**n
+        result = kofn_system_reliabilities([r] * n, [k])
+        assert result[0] == pytest.approx(expected, rel=1e-9)
+
+    def test_kofn_system_reliabilities_perfect_components(self):
+        """
+        Tests identical components of reliability 1.
+        """
+        assert np.array_equal(kofn_system_reliabilities([1.0] * 4, [1, 4]), [1.0, 1.0])
+
+    def test_kofn_system_reliabilities_invalid_k(self):
+        """
+        Tests that k outside 1..n or a non-integer k is rejected.
+        """
+        for k in [[0], [4], [1.5], []]:
+            with pytest.raises(ValueError):
+                kofn_system_reliabilities([0.9, 0.8, 0.7], k)